@@ -1,8 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends, status
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
-from app.database import get_db
+from database import get_async_db
 from app.models.schemas import (
     ComparisonRequest,
     ComparisonResponse, 
@@ -18,7 +18,7 @@ router = APIRouter()
 @router.post("/compare", response_model=ComparisonResponse)
 async def compare_resume_job(
     request: ComparisonRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     comparison_service: ComparisonService = Depends(get_comparison_service)
 ):
     """Compare resume against job description"""
@@ -40,12 +40,18 @@ async def compare_resume_job(
 async def get_comparison_history(
     limit: int = 10,
     offset: int = 0,
-    db: Session = Depends(get_db),
+    before: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     comparison_service: ComparisonService = Depends(get_comparison_service)
 ):
     """Get comparison history"""
     try:
-        return comparison_service.get_comparison_history(db, limit, offset)
+        return await comparison_service.get_comparison_history(db, limit, offset, before=before)
+    except ValidationException as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except ComparisonException as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -56,12 +62,12 @@ async def get_comparison_history(
 @router.get("/comparison/{comparison_id}", response_model=ComparisonResponse)
 async def get_comparison_details(
     comparison_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     comparison_service: ComparisonService = Depends(get_comparison_service)
 ):
     """Get detailed comparison results by ID"""
     try:
-        return comparison_service.get_comparison_details(comparison_id, db)
+        return await comparison_service.get_comparison_details(comparison_id, db)
     except ComparisonException as e:
         if "not found" in str(e).lower():
             raise HTTPException(
@@ -77,12 +83,12 @@ async def get_comparison_details(
 @router.delete("/comparison/{comparison_id}")
 async def delete_comparison(
     comparison_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     comparison_service: ComparisonService = Depends(get_comparison_service)
 ):
     """Delete a comparison record"""
     try:
-        comparison_service.delete_comparison(comparison_id, db)
+        await comparison_service.delete_comparison(comparison_id, db)
         return {"message": "Comparison deleted successfully"}
     except ComparisonException as e:
         if "not found" in str(e).lower():
@@ -10,8 +10,15 @@ class Settings(BaseSettings):
     testing: bool = False
     test_database_url: str = "sqlite:///./test.db"
     
+    # Connection pool (ignored for SQLite)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30
+    db_pool_pre_ping: bool = True
+    
     # API Keys
     huggingface_api_token: Optional[str] = None
+    admin_token: Optional[str] = None
     
     # API Configuration
     api_title: str = "AI Resume Comparison API"
@@ -21,9 +28,86 @@ class Settings(BaseSettings):
     # CORS
     allowed_origins: list = ["http://localhost:3000", "http://localhost:3001"]
     
+    # Write-behind persistence: queue comparison rows and bulk insert them
+    # every write_behind_max_rows rows or write_behind_flush_ms milliseconds
+    write_behind_enabled: bool = False
+    write_behind_max_rows: int = 100
+    write_behind_flush_ms: int = 50
+    write_behind_max_queue: int = 10000
+    
+    # Micro-batching: /compare calls arriving within micro_batch_window_ms of
+    # each other (up to micro_batch_max_size pairs) are scored as one batch.
+    # Only scorers with a fixed model are batched: tfidf needs tfidf_model_path,
+    # otherwise its requests are scored one by one and a warning is logged
+    micro_batch_enabled: bool = False
+    micro_batch_window_ms: float = 3.0
+    micro_batch_max_size: int = 64
+    
     # Text Processing
     min_text_length: int = 500
     max_text_length: int = 20000
+    # Per document, for uploads to /compare/stream; analysed as they arrive
+    max_stream_text_length: int = 5_000_000
+    
+    # File uploads to /compare/upload: spooled to upload_spool_dir (system
+    # temp dir when unset), extracted by extraction_workers processes (0 runs
+    # extraction in a thread) and cached by content hash
+    upload_max_bytes: int = 10 * 1024 * 1024
+    upload_spool_dir: Optional[str] = None
+    extraction_workers: int = 2
+    extraction_timeout_seconds: float = 30.0
+    extraction_cache_max_bytes: int = 32 * 1024 * 1024
+    
+    # Skill taxonomy artifact built with `python -m app.services.skill_taxonomy`
+    skill_taxonomy_path: Optional[str] = None
+    
+    # Where scoring runs: "inline" on the event loop, or a "thread"/"process"
+    # pool with nlp_workers workers (None lets the pool pick from CPU count)
+    nlp_executor: str = "inline"
+    nlp_workers: Optional[int] = None
+    
+    # Per-document analysis cache (0 bytes disables it)
+    document_cache_max_bytes: int = 64 * 1024 * 1024
+    document_cache_ttl_seconds: int = 3600
+    
+    # Pre-fitted TF-IDF model built with `python -m app.services.tfidf_model`
+    tfidf_model_path: Optional[str] = None
+    
+    # Similarity scorer used when a request does not name one: "tfidf", or
+    # "lsa"/"embedding" once their model files below are configured
+    similarity_scorer: str = "tfidf"
+    # LSA projection fitted with `python -m app.services.tfidf_model --model lsa`
+    lsa_model_path: Optional[str] = None
+    # Static word vectors in the GloVe/word2vec text format
+    embedding_table_path: Optional[str] = None
+    # Per-document embedding cache shared by the semantic scorers
+    embedding_cache_max_bytes: int = 32 * 1024 * 1024
+    
+    # Remote inference service behind the "remote" scorer: a feature-extraction
+    # endpoint taking POST {"inputs": [...]} (huggingface_api_token is sent as
+    # a bearer token). Documents are sent in batches of up to
+    # inference_batch_size, waiting at most inference_batch_wait_ms to fill
+    # one; after inference_breaker_failures failed calls in a row, scoring
+    # falls back to TF-IDF for inference_breaker_reset_seconds.
+    inference_url: Optional[str] = None
+    inference_model: str = "default"
+    inference_max_connections: int = 20
+    inference_keepalive_seconds: float = 30.0
+    inference_timeout_seconds: float = 10.0
+    inference_connect_timeout_seconds: float = 2.0
+    inference_batch_size: int = 32
+    inference_batch_wait_ms: float = 5.0
+    inference_breaker_failures: int = 5
+    inference_breaker_reset_seconds: float = 30.0
+    
+    # Request profiling: admins can ask for a profile with the X-Profile header;
+    # a profile_sample_rate share of /compare requests is also profiled and
+    # kept when it took at least profile_threshold_ms. The newest
+    # profile_max_profiles profiles are kept in profile_dir.
+    profile_dir: str = "profiles"
+    profile_max_profiles: int = 50
+    profile_sample_rate: float = 0.0
+    profile_threshold_ms: float = 1000.0
     
     class Config:
         env_file = ".env"
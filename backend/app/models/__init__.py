@@ -2,18 +2,42 @@ from database import ComparisonHistory
 from .schemas import (
     ComparisonRequest,
     ComparisonResponse,
+    BatchComparisonRequest,
+    BatchComparisonResponse,
     ComparisonHistoryResponse,
     SkillMatch,
     HealthResponse,
-    ErrorResponse
+    ErrorResponse,
+    TaxonomyReloadResponse,
+    JobMatchRequest,
+    JobMatch,
+    JobMatchResponse,
+    DailyVolume,
+    ScoreBucket,
+    SkillFrequency,
+    AnalyticsResponse,
+    ProfileInfo,
+    ProbeResponse
 )
 
 __all__ = [
     "ComparisonHistory",
     "ComparisonRequest", 
     "ComparisonResponse",
+    "BatchComparisonRequest",
+    "BatchComparisonResponse",
     "ComparisonHistoryResponse",
     "SkillMatch",
     "HealthResponse",
-    "ErrorResponse"
+    "ErrorResponse",
+    "TaxonomyReloadResponse",
+    "JobMatchRequest",
+    "JobMatch",
+    "JobMatchResponse",
+    "DailyVolume",
+    "ScoreBucket",
+    "SkillFrequency",
+    "AnalyticsResponse",
+    "ProfileInfo",
+    "ProbeResponse"
 ]
\ No newline at end of file
@@ -1,21 +1,52 @@
 from pydantic import BaseModel, Field, validator
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import date, datetime
 
 class ErrorResponse(BaseModel):
     detail: str
 
+MAX_BATCH_SIZE = 200
+
+def _validate_comparison_text(v: str) -> str:
+    if len(v.strip()) < 500:
+        raise ValueError('Text must be at least 500 characters long')
+    if len(v.strip()) > 20000:
+        raise ValueError('Text must be at most 20000 characters long')
+    return v.strip()
+
 class ComparisonRequest(BaseModel):
     resume_text: str = Field(..., min_length=500, max_length=20000)
     job_description: str = Field(..., min_length=500, max_length=20000)
+    force_recompute: bool = False
+    scorer: Optional[str] = None
     
     @validator('resume_text', 'job_description')
     def validate_text(cls, v):
-        if len(v.strip()) < 500:
-            raise ValueError('Text must be at least 500 characters long')
-        if len(v.strip()) > 20000:
-            raise ValueError('Text must be at most 20000 characters long')
-        return v.strip()
+        return _validate_comparison_text(v)
+
+class BatchComparisonRequest(BaseModel):
+    """One resume against many job descriptions, or many resumes against one"""
+    resume_texts: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+    job_descriptions: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+    force_recompute: bool = False
+    scorer: Optional[str] = None
+    
+    @validator('resume_texts', 'job_descriptions', each_item=True)
+    def validate_text(cls, v):
+        return _validate_comparison_text(v)
+    
+    @validator('job_descriptions')
+    def validate_shape(cls, v, values):
+        resume_texts = values.get('resume_texts')
+        if resume_texts is not None and len(resume_texts) > 1 and len(v) > 1:
+            raise ValueError('Either resume_texts or job_descriptions must have exactly one entry')
+        return v
+    
+    def pairs(self) -> List[Tuple[str, str]]:
+        """Return (resume, job description) pairs in input order"""
+        if len(self.resume_texts) == 1:
+            return [(self.resume_texts[0], job) for job in self.job_descriptions]
+        return [(resume, self.job_descriptions[0]) for resume in self.resume_texts]
 
 class SkillMatch(BaseModel):
     skill: str
@@ -30,6 +61,60 @@ class ComparisonResponse(BaseModel):
     missing_keywords: List[str] = []
     suggestions: List[str] = []
     similarity_details: Dict[str, Any] = {}
+    cached: bool = False
+
+class BatchComparisonResponse(BaseModel):
+    results: List[ComparisonResponse]
+
+class JobMatchRequest(BaseModel):
+    resume_text: str = Field(..., min_length=500, max_length=20000)
+    
+    @validator('resume_text')
+    def validate_text(cls, v):
+        return _validate_comparison_text(v)
+
+class JobMatch(BaseModel):
+    comparison_id: int
+    job_hash: str
+    score: float = Field(..., ge=0, le=100)
+    matched_skills: List[str] = []
+    job_description: str
+
+class JobMatchResponse(BaseModel):
+    matches: List[JobMatch]
+    indexed_jobs: int
+
+class DailyVolume(BaseModel):
+    day: date
+    comparisons: int
+    average_score: float
+
+class ScoreBucket(BaseModel):
+    min_score: int
+    max_score: int
+    comparisons: int
+
+class SkillFrequency(BaseModel):
+    skill: str
+    found: int
+    missing: int
+
+class AnalyticsResponse(BaseModel):
+    total_comparisons: int
+    daily: List[DailyVolume]
+    score_histogram: List[ScoreBucket]
+    most_missing_skills: List[SkillFrequency]
+    most_found_skills: List[SkillFrequency]
+
+class ProfileInfo(BaseModel):
+    id: str
+    created_at: datetime
+    reason: str
+    duration_ms: float
+    route: Optional[str] = None
+    resume_chars: Optional[int] = None
+    job_chars: Optional[int] = None
+    error: Optional[str] = None
 
 class ComparisonHistoryResponse(BaseModel):
     id: int
@@ -44,4 +129,18 @@ class ComparisonHistoryResponse(BaseModel):
 class HealthResponse(BaseModel):
     status: str
     nlp_ready: bool
-    version: str
\ No newline at end of file
+    version: str
+    document_cache: Optional[Dict[str, Any]] = None
+    write_behind: Optional[Dict[str, Any]] = None
+    micro_batch: Optional[Dict[str, Any]] = None
+    extraction: Optional[Dict[str, Any]] = None
+    scorers: Optional[Dict[str, Dict[str, Any]]] = None
+
+class ProbeResponse(BaseModel):
+    status: str
+    checks: Dict[str, Any] = {}
+
+class TaxonomyReloadResponse(BaseModel):
+    version: str
+    tech_skills: int
+    soft_skills: int
@@ -0,0 +1,199 @@
+import asyncio
+import logging
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import ComparisonHistory, DailyRollup, ScoreBucketRollup, SkillRollup
+
+logger = logging.getLogger(__name__)
+
+SCORE_BUCKET_WIDTH = 10
+
+# Columns of comparison_history that feed the rollups
+ROLLUP_COLUMNS = ("created_at", "match_score", "found_keywords", "missing_keywords")
+
+_UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert
+}
+
+
+def score_bucket(score: float) -> int:
+    """Lower bound of the histogram bucket holding score; 100 joins the top bucket"""
+    top = 100 - SCORE_BUCKET_WIDTH
+    return min(top, max(0, int(score // SCORE_BUCKET_WIDTH) * SCORE_BUCKET_WIDTH))
+
+
+def _day(created_at: Optional[datetime]) -> date:
+    if created_at is None:
+        return datetime.now(timezone.utc).date()
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc)
+    return created_at.date()
+
+
+def rollup_values(comparison: ComparisonHistory) -> Dict[str, Any]:
+    return {column: getattr(comparison, column) for column in ROLLUP_COLUMNS}
+
+
+async def load_previous(db: AsyncSession, ids: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+    """Current rollup inputs of rows about to be updated, by id"""
+    if not ids:
+        return {}
+    rows = await db.execute(
+        select(ComparisonHistory.id, *(getattr(ComparisonHistory, column) for column in ROLLUP_COLUMNS))
+        .where(ComparisonHistory.id.in_(ids))
+    )
+    return {row[0]: dict(zip(ROLLUP_COLUMNS, row[1:])) for row in rows}
+
+
+def updated_rows(updates: Iterable[Mapping[str, Any]],
+                 previous: Dict[int, Dict[str, Any]]) -> Tuple[List[Dict], List[Dict]]:
+    """Split updates into the (added, removed) rollup contributions"""
+    added, removed = [], []
+    for row in updates:
+        old = previous.get(row["id"])
+        if old is not None:
+            added.append({**old, **row})
+            removed.append(old)
+    return added, removed
+
+
+async def _upsert(db: AsyncSession, model, key: str, rows: List[Dict[str, Any]]):
+    """Add each row's counters onto the stored ones, creating missing rows"""
+    if not rows:
+        return
+    table = model.__table__
+    counters = [column for column in rows[0] if column != key]
+    insert = _UPSERT_INSERTS.get(db.bind.dialect.name)
+
+    if insert is not None:
+        statement = insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[key],
+            set_={column: table.c[column] + statement.excluded[column] for column in counters}
+        )
+        await db.execute(statement, rows)
+        return
+
+    for row in rows:
+        result = await db.execute(
+            update(table)
+            .where(table.c[key] == row[key])
+            .values({column: table.c[column] + row[column] for column in counters})
+        )
+        if result.rowcount == 0:
+            await db.execute(table.insert().values(**row))
+
+
+async def apply_rollups(db: AsyncSession, added: Iterable[Mapping[str, Any]] = (),
+                        removed: Iterable[Mapping[str, Any]] = ()):
+    """Fold comparisons into (or out of) the rollup tables.
+
+    Runs inside the caller's transaction, so the rollups commit or roll back
+    together with the comparison_history rows they describe.
+    """
+    daily: Dict[date, List[float]] = defaultdict(lambda: [0, 0.0])
+    buckets: Counter = Counter()
+    skills: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+
+    for sign, rows in ((1, added), (-1, removed)):
+        for row in rows:
+            score = row["match_score"]
+            totals = daily[_day(row.get("created_at"))]
+            totals[0] += sign
+            totals[1] += sign * score
+            buckets[score_bucket(score)] += sign
+            for skill in set(row.get("found_keywords") or ()):
+                skills[skill][0] += sign
+            for skill in set(row.get("missing_keywords") or ()):
+                skills[skill][1] += sign
+
+    # Sorted keys give concurrent writers a consistent lock order
+    await _upsert(db, DailyRollup, "day", [
+        {"day": day, "comparisons": count, "score_total": total}
+        for day, (count, total) in sorted(daily.items()) if count or total
+    ])
+    await _upsert(db, ScoreBucketRollup, "bucket", [
+        {"bucket": bucket, "comparisons": count}
+        for bucket, count in sorted(buckets.items()) if count
+    ])
+    await _upsert(db, SkillRollup, "skill", [
+        {"skill": skill, "found_count": found, "missing_count": missing}
+        for skill, (found, missing) in sorted(skills.items()) if found or missing
+    ])
+
+
+async def fetch_analytics(db: AsyncSession, days: int = 30, top_skills: int = 20) -> Dict[str, Any]:
+    """Read the dashboard stats straight from the rollup tables"""
+    since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    daily = await db.execute(
+        select(DailyRollup.day, DailyRollup.comparisons, DailyRollup.score_total)
+        .where(DailyRollup.day >= since, DailyRollup.comparisons > 0)
+        .order_by(DailyRollup.day)
+    )
+    buckets = dict((await db.execute(
+        select(ScoreBucketRollup.bucket, ScoreBucketRollup.comparisons)
+    )).all())
+
+    async def skill_ranking(column):
+        rows = await db.execute(
+            select(SkillRollup.skill, SkillRollup.found_count, SkillRollup.missing_count)
+            .where(column > 0)
+            .order_by(column.desc(), SkillRollup.skill)
+            .limit(top_skills)
+        )
+        return [{"skill": skill, "found": found, "missing": missing} for skill, found, missing in rows]
+
+    return {
+        "total_comparisons": sum(buckets.values()),
+        "daily": [
+            {"day": day, "comparisons": count, "average_score": round(total / count, 2)}
+            for day, count, total in daily
+        ],
+        "score_histogram": [
+            {
+                "min_score": bucket,
+                "max_score": bucket + SCORE_BUCKET_WIDTH,
+                "comparisons": buckets.get(bucket, 0)
+            }
+            for bucket in range(0, 100, SCORE_BUCKET_WIDTH)
+        ],
+        "most_missing_skills": await skill_ranking(SkillRollup.missing_count),
+        "most_found_skills": await skill_ranking(SkillRollup.found_count)
+    }
+
+
+async def rebuild_rollups(db: AsyncSession, batch_size: int = 1000) -> int:
+    """Recompute every rollup from comparison_history; returns the rows folded in"""
+    for model in (DailyRollup, ScoreBucketRollup, SkillRollup):
+        await db.execute(delete(model))
+
+    total = 0
+    result = await db.stream(
+        select(*(getattr(ComparisonHistory, column) for column in ROLLUP_COLUMNS))
+        .execution_options(yield_per=batch_size)
+    )
+    async for partition in result.partitions():
+        await apply_rollups(db, [dict(zip(ROLLUP_COLUMNS, row)) for row in partition])
+        total += len(partition)
+    await db.commit()
+    return total
+
+
+async def _rebuild():
+    from database import AsyncSessionLocal, async_engine
+
+    async with AsyncSessionLocal() as db:
+        total = await rebuild_rollups(db)
+    await async_engine.dispose()
+    print(f"Rebuilt analytics rollups from {total} comparisons")
+
+
+if __name__ == "__main__":
+    asyncio.run(_rebuild())
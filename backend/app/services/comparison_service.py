@@ -1,95 +1,118 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import List, Optional, Tuple
 import logging
 from database import ComparisonHistory
 from app.models.schemas import ComparisonRequest, ComparisonResponse, ComparisonHistoryResponse
+from .analytics import apply_rollups, rollup_values
 from .nlp_service import NLPProcessor
+from app.utils.metrics import STAGE_ERRORS, stage_timer
 from app.utils.text_utils import validate_text_input
 from app.exceptions import ComparisonException, ValidationException
 
 logger = logging.getLogger(__name__)
 
 
+def encode_history_cursor(item: ComparisonHistoryResponse) -> str:
+    """Cursor for the page after this row, formatted <created_at>,<id>"""
+    return f"{item.created_at.isoformat()},{item.id}"
+
+
+def decode_history_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, comparison_id = cursor.rsplit(",", 1)
+        # An unescaped "+" in a UTC offset arrives as a space
+        return datetime.fromisoformat(created_at.strip().replace(" ", "+")), int(comparison_id)
+    except ValueError:
+        raise ValidationException(f"Invalid history cursor: {cursor!r}")
+
+
+async def fetch_history_page(db: AsyncSession, limit: int = 10, before: Optional[str] = None,
+                             offset: int = 0) -> List[ComparisonHistoryResponse]:
+    """Newest-first history rows, optionally starting after a cursor.
+    
+    Only the summary columns are selected, and the keyset condition walks
+    the (created_at, id) index instead of skipping offset rows.
+    """
+    query = select(
+        ComparisonHistory.id,
+        ComparisonHistory.match_score,
+        ComparisonHistory.created_at,
+        func.coalesce(ComparisonHistory.missing_count, 0),
+        func.coalesce(ComparisonHistory.found_count, 0)
+    ).order_by(ComparisonHistory.created_at.desc(), ComparisonHistory.id.desc())
+    
+    if before:
+        created_at, comparison_id = decode_history_cursor(before)
+        # A row comparison, unlike the equivalent OR, is an index range on PostgreSQL too
+        query = query.where(
+            tuple_(ComparisonHistory.created_at, ComparisonHistory.id) < (created_at, comparison_id)
+        )
+    elif offset:
+        query = query.offset(offset)
+    
+    rows = await db.execute(query.limit(limit))
+    return [
+        ComparisonHistoryResponse(
+            id=comparison_id,
+            match_score=match_score,
+            created_at=created_at,
+            missing_keywords_count=missing_count,
+            found_keywords_count=found_count
+        )
+        for comparison_id, match_score, created_at, missing_count, found_count in rows
+    ]
+
+
 class ComparisonService:
     """Service for handling resume comparisons"""
     
     def __init__(self, nlp_service: NLPProcessor):
         self.nlp_service = nlp_service
     
-    async def compare_resume_job(self, request: ComparisonRequest, db: Session) -> ComparisonResponse:
+    async def compare_resume_job(self, request: ComparisonRequest, db: AsyncSession) -> ComparisonResponse:
         """Compare resume against job description"""
         try:
             # Validate inputs
-            if not validate_text_input(request.resume_text):
-                raise ValidationException("Resume text is too short or invalid")
+            with stage_timer("comparison_service", "validate"):
+                if not validate_text_input(request.resume_text):
+                    raise ValidationException("Resume text is too short or invalid")
+                
+                if not validate_text_input(request.job_description):
+                    raise ValidationException("Job description is too short or invalid")
             
-            if not validate_text_input(request.job_description):
-                raise ValidationException("Job description is too short or invalid")
-            
-            # Process with NLP
-            comparison_result = await self.nlp_service.compare_texts(
-                request.resume_text,
-                request.job_description
-            )
-            
-            # Save to database
-            db_comparison = ComparisonHistory(
-                resume_text=request.resume_text[:1000],
-                job_description=request.job_description[:1000],
-                match_score=comparison_result["match_score"],
-                missing_keywords=comparison_result["missing_keywords"],
-                found_keywords=comparison_result["found_keywords"],
-                suggestions=comparison_result["suggestions"]
-            )
-            
-            db.add(db_comparison)
-            db.commit()
-            db.refresh(db_comparison)
-            
-            return ComparisonResponse(
-                id=db_comparison.id,
-                match_score=comparison_result["match_score"],
-                required_skills=comparison_result["required_skills"],
-                found_keywords=comparison_result["found_keywords"],
-                missing_keywords=comparison_result["missing_keywords"],
-                suggestions=comparison_result["suggestions"],
-                similarity_details=comparison_result.get("similarity_details", {})
-            )
+            # Scored, deduplicated and stored the same way as /compare
+            with stage_timer("comparison_service", "score"):
+                return await self.nlp_service.compare_resume_to_job(
+                    request.resume_text,
+                    request.job_description,
+                    db,
+                    force_recompute=request.force_recompute,
+                    scorer=request.scorer
+                )
             
         except (ValidationException, Exception) as e:
+            STAGE_ERRORS.labels("comparison_service").inc()
             logger.error(f"Error in comparison: {str(e)}")
             raise ComparisonException(f"Comparison failed: {str(e)}")
     
-    def get_comparison_history(self, db: Session, limit: int = 10, offset: int = 0) -> List[ComparisonHistoryResponse]:
+    async def get_comparison_history(self, db: AsyncSession, limit: int = 10, offset: int = 0,
+                                     before: Optional[str] = None) -> List[ComparisonHistoryResponse]:
         """Get comparison history"""
         try:
-            comparisons = db.query(ComparisonHistory)\
-                .order_by(ComparisonHistory.created_at.desc())\
-                .offset(offset)\
-                .limit(limit)\
-                .all()
-            
-            return [
-                ComparisonHistoryResponse(
-                    id=comp.id,
-                    match_score=comp.match_score,
-                    created_at=comp.created_at,
-                    missing_keywords_count=len(comp.missing_keywords) if comp.missing_keywords else 0,
-                    found_keywords_count=len(comp.found_keywords) if comp.found_keywords else 0
-                )
-                for comp in comparisons
-            ]
+            return await fetch_history_page(db, limit, before=before, offset=offset)
             
+        except ValidationException:
+            raise
         except Exception as e:
             logger.error(f"Error fetching history: {str(e)}")
             raise ComparisonException(f"Failed to fetch history: {str(e)}")
     
-    def get_comparison_details(self, comparison_id: int, db: Session) -> ComparisonResponse:
+    async def get_comparison_details(self, comparison_id: int, db: AsyncSession) -> ComparisonResponse:
         """Get detailed comparison results by ID"""
         try:
-            comparison = db.query(ComparisonHistory)\
-                .filter(ComparisonHistory.id == comparison_id)\
-                .first()
+            comparison = await db.get(ComparisonHistory, comparison_id)
             
             if not comparison:
                 raise ComparisonException("Comparison not found")
@@ -116,18 +139,17 @@ class ComparisonService:
             logger.error(f"Error fetching comparison details: {str(e)}")
             raise ComparisonException(f"Failed to fetch comparison details: {str(e)}")
     
-    def delete_comparison(self, comparison_id: int, db: Session) -> bool:
+    async def delete_comparison(self, comparison_id: int, db: AsyncSession) -> bool:
         """Delete a comparison record"""
         try:
-            comparison = db.query(ComparisonHistory)\
-                .filter(ComparisonHistory.id == comparison_id)\
-                .first()
+            comparison = await db.get(ComparisonHistory, comparison_id)
             
             if not comparison:
                 raise ComparisonException("Comparison not found")
             
-            db.delete(comparison)
-            db.commit()
+            await apply_rollups(db, removed=[rollup_values(comparison)])
+            await db.delete(comparison)
+            await db.commit()
             return True
             
         except ComparisonException:
@@ -0,0 +1,125 @@
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+
+def document_key(text: str) -> str:
+    """Hash of the text with case and whitespace normalised away"""
+    return hashlib.sha256(" ".join(text.lower().split()).encode("utf-8")).hexdigest()
+
+
+def pair_key(resume_text: str, job_description: str) -> str:
+    """Hash identifying a normalised (resume, job description) pair"""
+    return pair_key_from_keys(document_key(resume_text), document_key(job_description))
+
+
+def pair_key_from_keys(resume_key: str, job_key: str) -> str:
+    """pair_key from the two documents' document_key hashes"""
+    return hashlib.sha256(f"{resume_key}:{job_key}".encode("ascii")).hexdigest()
+
+
+class DocumentAnalysis:
+    """Everything the scorer derives from a single document"""
+
+    __slots__ = ("processed_text", "token_set", "tech_skills", "soft_skills",
+                 "tfidf_vector", "key", "size")
+
+    def __init__(self, processed_text: str, token_set: FrozenSet[str],
+                 tech_skills: List[str], soft_skills: List[str], tfidf_vector=None,
+                 key: str = ""):
+        self.processed_text = processed_text
+        self.token_set = token_set
+        self.tech_skills = tech_skills
+        self.soft_skills = soft_skills
+        self.tfidf_vector = tfidf_vector
+        # document_key of the text, so per-scorer caches can share the hash
+        self.key = key
+        self.size = self._estimate_size()
+
+    @property
+    def skills(self) -> Tuple[List[str], List[str]]:
+        return self.tech_skills, self.soft_skills
+
+    def _estimate_size(self) -> int:
+        size = sys.getsizeof(self.processed_text) + sys.getsizeof(self.token_set)
+        size += sum(sys.getsizeof(token) for token in self.token_set)
+        if self.tfidf_vector is not None:
+            size += self.tfidf_vector.data.nbytes + self.tfidf_vector.indices.nbytes
+        return size
+
+
+class DocumentCache:
+    """Bounded LRU cache of DocumentAnalysis with a TTL.
+
+    Entries are keyed by the normalised text hash together with the skill
+    index and TF-IDF model versions, so a reload never serves stale results.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[float, DocumentAnalysis]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _evict(self, key: Tuple):
+        _, analysis = self._entries.pop(key)
+        self.current_bytes -= analysis.size
+        self.evictions += 1
+
+    def get(self, key: Tuple) -> Optional[DocumentAnalysis]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl_seconds:
+                self._evict(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Tuple, analysis: DocumentAnalysis):
+        if analysis.size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._evict(key)
+                self.evictions -= 1
+            self._entries[key] = (time.monotonic(), analysis)
+            self.current_bytes += analysis.size
+            while self.current_bytes > self.max_bytes:
+                self._evict(next(iter(self._entries)))
+
+    def get_or_compute(self, key: Tuple,
+                       compute: Callable[[], DocumentAnalysis]) -> DocumentAnalysis:
+        analysis = self.get(key)
+        if analysis is None:
+            analysis = compute()
+            self.put(key, analysis)
+        return analysis
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,257 @@
+import asyncio
+import hashlib
+import os
+import signal
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from app.utils.metrics import REGISTRY, Counter, stage_timer
+from .document_cache import DocumentCache
+from .streaming import StreamTooLarge
+
+FILE_EXTRACTIONS = REGISTRY.register(Counter(
+    "file_extractions_total", "Uploaded files turned into text, by outcome",
+    ("outcome",)
+))
+
+# Formats are told apart by their first bytes, not by what the client claims
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"
+
+
+class ExtractionError(ValueError):
+    """An uploaded file is not a readable PDF, DOCX or text file"""
+
+
+class ExtractionTimeout(ExtractionError):
+    """Extracting an uploaded file took longer than the configured timeout"""
+
+
+class SpooledUpload:
+    """A multipart file part written to disk as it arrives, hashing it on the way"""
+
+    def __init__(self, max_bytes: int, directory: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._file = tempfile.NamedTemporaryFile(
+            prefix="upload-", dir=directory, delete=False
+        )
+        self.path = self._file.name
+
+    def feed(self, data: bytes):
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise StreamTooLarge(f"File is larger than {self.max_bytes} bytes")
+        self._hash.update(data)
+        self._file.write(data)
+
+    def close(self):
+        self._file.close()
+
+    @property
+    def content_hash(self) -> str:
+        return self._hash.hexdigest()
+
+    def discard(self):
+        """Close and delete the spooled file"""
+        self._file.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class TextPart:
+    """A small multipart form field collected in memory up to max_bytes"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._data = bytearray()
+
+    def feed(self, data: bytes):
+        if len(self._data) + len(data) > self.max_bytes:
+            raise StreamTooLarge(f"Field is larger than {self.max_bytes} bytes")
+        self._data += data
+
+    def close(self):
+        pass
+
+    @property
+    def text(self) -> str:
+        return self._data.decode("utf-8", errors="replace")
+
+
+def _extract_pdf(path: str) -> str:
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def _extract_docx(path: str) -> str:
+    import docx
+
+    document = docx.Document(path)
+    lines = [paragraph.text for paragraph in document.paragraphs]
+    for table in document.tables:
+        for row in table.rows:
+            lines.append(" ".join(cell.text for cell in row.cells))
+    return "\n".join(lines)
+
+
+def extract_text(path: str) -> str:
+    """Text of a PDF, DOCX or UTF-8 text file; runs in the extraction pool"""
+    with open(path, "rb") as f:
+        head = f.read(len(PDF_MAGIC))
+    try:
+        if head.startswith(PDF_MAGIC):
+            return _extract_pdf(path)
+        if head.startswith(ZIP_MAGIC):
+            return _extract_docx(path)
+        with open(path, "rb") as f:
+            data = f.read()
+    except ExtractionError:
+        raise
+    except Exception as e:
+        raise ExtractionError(f"Could not read the uploaded file: {e}") from e
+    if b"\x00" in data:
+        raise ExtractionError("Unsupported file type, expected PDF, DOCX or text")
+    return data.decode("utf-8", errors="replace")
+
+
+class _Deadline:
+    """Raises ExtractionError in this process once seconds have passed.
+
+    Set up in pool workers, which run tasks on their main thread, so a
+    document that takes too long stops being parsed instead of holding a
+    worker after the request gave up on it.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def _expired(self, signum, frame):
+        raise ExtractionTimeout(f"Extraction took longer than {self.seconds}s")
+
+    def __enter__(self):
+        signal.signal(signal.SIGALRM, self._expired)
+        signal.setitimer(signal.ITIMER_REAL, self.seconds)
+
+    def __exit__(self, *exc_info):
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, signal.SIG_DFL)
+
+
+def _extract_in_worker(path: str, timeout_seconds: float) -> str:
+    if not hasattr(signal, "setitimer"):
+        return extract_text(path)
+    with _Deadline(timeout_seconds):
+        return extract_text(path)
+
+
+class _ExtractedText:
+    """Extracted text sized for DocumentCache"""
+
+    __slots__ = ("text", "size")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.size = sys.getsizeof(text) + sys.getsizeof(self)
+
+
+class TextExtractor:
+    """Extracts uploaded files in a process pool, caching text by content hash.
+
+    Parsing a PDF or DOCX is CPU-bound, so it never runs on the event loop:
+    with workers > 0 it goes to a process pool, otherwise to a thread. Each
+    extraction runs as its own task that callers only wait on, so
+    concurrent uploads of the same file share it and a caller going away
+    does not cancel it for the others.
+    """
+
+    # Time a worker gets past its own deadline before the pool is replaced
+    GRACE_SECONDS = 5.0
+
+    def __init__(self, workers: int, cache_max_bytes: int, ttl_seconds: float,
+                 timeout_seconds: float):
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+        # One slot per worker, so the pool's timer starts when a worker is free
+        self._slots = asyncio.Semaphore(max(1, workers))
+        self.cache = DocumentCache(max_bytes=cache_max_bytes, ttl_seconds=ttl_seconds)
+        self.timeout_seconds = timeout_seconds
+        self._in_flight: Dict[str, "asyncio.Task"] = {}
+
+    async def extract(self, upload: SpooledUpload) -> Tuple[str, bool]:
+        """Text of a closed upload, and whether it came from the cache.
+
+        Takes ownership of the upload: its file is deleted once it is no
+        longer needed.
+        """
+        content_hash = upload.content_hash
+        entry = self.cache.get((content_hash,))
+        if entry is not None:
+            upload.discard()
+            FILE_EXTRACTIONS.labels("cached").inc()
+            return entry.text, True
+
+        task = self._in_flight.get(content_hash)
+        if task is not None:
+            upload.discard()
+            FILE_EXTRACTIONS.labels("shared").inc()
+        else:
+            task = self._in_flight[content_hash] = asyncio.ensure_future(self._extract(upload))
+            task.add_done_callback(lambda _: self._in_flight.pop(content_hash, None))
+        return await asyncio.shield(task), False
+
+    async def _extract(self, upload: SpooledUpload) -> str:
+        try:
+            with stage_timer("extraction", "extract"):
+                text = await self._run(upload.path)
+        except Exception:
+            FILE_EXTRACTIONS.labels("error").inc()
+            raise
+        finally:
+            upload.discard()
+        FILE_EXTRACTIONS.labels("extracted").inc()
+        self.cache.put((upload.content_hash,), _ExtractedText(text))
+        return text
+
+    async def _run(self, path: str) -> str:
+        if self.executor is None:
+            # A thread cannot be interrupted; it finishes in the background
+            try:
+                return await asyncio.wait_for(
+                    asyncio.to_thread(extract_text, path), self.timeout_seconds
+                )
+            except asyncio.TimeoutError:
+                raise ExtractionTimeout(f"Extraction took longer than {self.timeout_seconds}s")
+
+        # Waiting for a slot is not timed; the worker's own deadline bounds
+        # the run, and the grace timer only catches a worker that ignores it
+        async with self._slots:
+            executor = self.executor
+            try:
+                return await asyncio.wait_for(
+                    asyncio.get_running_loop().run_in_executor(
+                        executor, _extract_in_worker, path, self.timeout_seconds
+                    ),
+                    self.timeout_seconds + self.GRACE_SECONDS
+                )
+            except asyncio.TimeoutError:
+                # The worker is stuck outside Python code; new uploads go to
+                # a fresh pool instead of queueing behind it
+                if self.executor is executor:
+                    self.executor = ProcessPoolExecutor(max_workers=self.workers)
+                    executor.shutdown(wait=False, cancel_futures=True)
+                raise ExtractionTimeout(f"Extraction took longer than {self.timeout_seconds}s")
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.cache.stats(), "in_flight": len(self._in_flight)}
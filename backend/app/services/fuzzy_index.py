@@ -0,0 +1,121 @@
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+GRAM_SIZE = 3
+
+
+def _grams(term: str) -> Set[str]:
+    padded = f"  {term}  "
+    return {padded[i:i + GRAM_SIZE] for i in range(len(padded) - GRAM_SIZE + 1)}
+
+
+class FuzzySkillIndex:
+    """Character-trigram inverted index over a skill vocabulary.
+
+    A lookup only verifies (with ``fuzz.ratio``) the skills that share enough
+    trigrams with the token to possibly clear the threshold. Each edit
+    destroys at most three trigrams, so the count filter never drops a skill
+    whose ratio would have passed.
+    """
+
+    def __init__(self, terms: Iterable[Tuple[str, str, str]] = (), threshold: int = 85,
+                 cache_size: int = 65536):
+        """Build the index from (term, skill, category) triples"""
+        from fuzzywuzzy import fuzz
+        
+        self._ratio = fuzz.ratio
+        self.threshold = threshold
+        self._terms: List[str] = []
+        self._skills: List[Tuple[str, str]] = []
+        self._gram_counts: List[int] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+
+        for term, skill, category in terms:
+            term = term.lower()
+            grams = _grams(term)
+            term_id = len(self._terms)
+            self._terms.append(term)
+            self._skills.append((skill, category))
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._postings[gram].append(term_id)
+
+        # Postings are ordered by term length so a lookup only has to count
+        # the slice of terms whose length is compatible with the token.
+        self._posting_lengths: Dict[str, List[int]] = {}
+        for gram, term_ids in self._postings.items():
+            term_ids.sort(key=lambda term_id: len(self._terms[term_id]))
+            self._posting_lengths[gram] = [len(self._terms[t]) for t in term_ids]
+        self._postings = dict(self._postings)
+        # Upper bound on the indel distance, as a fraction of the combined
+        # length, of any pair whose ratio exceeds the threshold.
+        self._max_edit_fraction = 1 - threshold / 100
+        self.lookup = lru_cache(maxsize=cache_size)(self._lookup)
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def _posting(self, gram: str) -> Optional[Tuple[Sequence[int], Sequence[int]]]:
+        """Term ids containing gram and their lengths, ordered by length"""
+        term_ids = self._postings.get(gram)
+        if term_ids is None:
+            return None
+        return term_ids, self._posting_lengths[gram]
+
+    def _term_shape(self, term_id: int) -> Tuple[int, int]:
+        """Length and trigram count of a term, enough to filter candidates"""
+        return len(self._terms[term_id]), self._gram_counts[term_id]
+
+    def _term(self, term_id: int) -> str:
+        return self._terms[term_id]
+
+    def _skill(self, term_id: int) -> Tuple[str, str]:
+        """(skill, category) of a term"""
+        return self._skills[term_id]
+
+    def _lookup(self, token: str) -> Tuple[Tuple[str, str], ...]:
+        """Return (skill, category) of the terms whose ratio against token exceeds the threshold"""
+        grams = _grams(token)
+        token_length = len(token)
+        # |a - b| <= f * (a + b) bounds the lengths worth considering
+        fraction = self._max_edit_fraction
+        min_length = token_length * (1 - fraction) / (1 + fraction)
+        max_length = token_length * (1 + fraction) / (1 - fraction)
+
+        slices = []
+        for gram in grams:
+            posting = self._posting(gram)
+            if posting is None:
+                continue
+            term_ids, lengths = posting
+            start = bisect_left(lengths, min_length)
+            end = bisect_right(lengths, max_length)
+            if start < end:
+                slices.append(term_ids[start:end])
+        shared = Counter(chain.from_iterable(slices))
+
+        matches = []
+        for term_id, count in shared.items():
+            term_length, gram_count = self._term_shape(term_id)
+            max_edits = int((token_length + term_length) * self._max_edit_fraction)
+            if abs(token_length - term_length) > max_edits:
+                continue
+            if count < max(len(grams), gram_count) - GRAM_SIZE * max_edits:
+                continue
+            if self._ratio(self._term(term_id), token) > self.threshold:
+                matches.append(self._skill(term_id))
+        return tuple(matches)
+
+    def match_categories(self, tokens: Iterable[str]) -> Dict[str, str]:
+        """Return {skill: category} for every skill fuzzily matched by the distinct tokens"""
+        found: Dict[str, str] = {}
+        for token in set(tokens):
+            found.update(self.lookup(token))
+        return found
+
+    def match_tokens(self, tokens: Iterable[str]) -> Set[str]:
+        """Return every skill fuzzily matched by any of the distinct tokens"""
+        return set(self.match_categories(tokens))
@@ -0,0 +1,91 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import ComparisonHistory
+
+EXPORT_COLUMNS = (
+    "id", "created_at", "match_score", "found_count", "missing_count",
+    "found_keywords", "missing_keywords", "suggestions", "required_skills",
+    "similarity_details", "pair_hash", "model_version", "resume_text", "job_description"
+)
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+# Encoded rows are gathered into chunks of roughly this size before being sent
+CHUNK_BYTES = 64 * 1024
+
+
+def _json_default(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialise {type(value).__name__}")
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class _CsvEncoder:
+    def __init__(self):
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+
+    def encode(self, values) -> str:
+        self.writer.writerow([_csv_value(value) for value in values])
+        line = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return line
+
+
+async def export_history(db: AsyncSession, fmt: str = "ndjson",
+                         start: Optional[datetime] = None, end: Optional[datetime] = None,
+                         batch_size: int = 1000) -> AsyncIterator[str]:
+    """Stream comparison history in [start, end) oldest first.
+
+    Rows are fetched through a server-side cursor batch_size at a time, so
+    memory stays flat regardless of how many rows match.
+    """
+    if fmt not in EXPORT_MEDIA_TYPES:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    query = select(*(getattr(ComparisonHistory, column) for column in EXPORT_COLUMNS))
+    if start is not None:
+        query = query.where(ComparisonHistory.created_at >= start)
+    if end is not None:
+        query = query.where(ComparisonHistory.created_at < end)
+    query = query.order_by(ComparisonHistory.created_at, ComparisonHistory.id)
+
+    csv_encoder = _CsvEncoder() if fmt == "csv" else None
+    chunk = [csv_encoder.encode(EXPORT_COLUMNS)] if csv_encoder else []
+    chunk_size = 0
+
+    result = await db.stream(query.execution_options(yield_per=batch_size))
+    async for partition in result.partitions():
+        for row in partition:
+            if csv_encoder:
+                line = csv_encoder.encode(row)
+            else:
+                record: Dict[str, Any] = dict(zip(EXPORT_COLUMNS, row))
+                line = json.dumps(record, default=_json_default) + "\n"
+            chunk.append(line)
+            chunk_size += len(line)
+            if chunk_size >= CHUNK_BYTES:
+                yield "".join(chunk)
+                chunk, chunk_size = [], 0
+
+    if chunk:
+        yield "".join(chunk)
@@ -0,0 +1,275 @@
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+from app.config import settings
+from app.utils.metrics import REGISTRY, Counter, Histogram
+from .document_cache import document_key
+from .scorers import SimilarityScorer, TfidfScorer
+
+if TYPE_CHECKING:
+    import aiohttp
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_CALLS = REGISTRY.register(Counter(
+    "inference_requests_total", "Calls to the remote inference service, by outcome",
+    ("outcome",)
+))
+INFERENCE_BATCH_SIZE = REGISTRY.register(Histogram(
+    "inference_batch_size", "Distinct documents sent in one inference call",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+))
+
+
+class InferenceError(Exception):
+    """The inference service could not embed a batch"""
+
+
+class CircuitOpenError(InferenceError):
+    """Calls are being rejected until the breaker's reset timeout passes"""
+
+
+class CircuitBreaker:
+    """Opens after failure_threshold consecutive failures.
+
+    While open every call is rejected; after reset_seconds one trial call
+    is let through (half-open), which closes the breaker on success and
+    opens it again on failure.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def before_call(self):
+        state = self.state
+        if state == "open" or (state == "half_open" and self._trial_running):
+            raise CircuitOpenError("Inference circuit breaker is open")
+        if state == "half_open":
+            self._trial_running = True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._trial_running or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._trial_running = False
+
+
+class InferenceClient:
+    """Embeds documents through a remote feature-extraction endpoint.
+
+    Concurrent embed() calls are coalesced: documents wait up to
+    batch_wait_ms (or until max_batch_size are queued) and go out in one
+    POST {"inputs": [...]}. A document already queued or in flight is not
+    sent again; its callers share the same future.
+    """
+
+    def __init__(self, session: "aiohttp.ClientSession", url: str, token: Optional[str] = None,
+                 max_batch_size: int = 32, batch_wait_ms: float = 5.0,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.session = session
+        self.url = url
+        self.headers = {"Authorization": f"Bearer {token}"} if token else {}
+        self.max_batch_size = max_batch_size
+        self.batch_wait_ms = batch_wait_ms
+        self.breaker = breaker or CircuitBreaker()
+        self._in_flight: Dict[str, "asyncio.Future"] = {}
+        self._queue: List[Tuple[str, str]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+    async def embed(self, texts: Sequence[str]) -> List["np.ndarray"]:
+        """One embedding per text, in order; InferenceError if they cannot be fetched"""
+        # Fail fast instead of queueing behind a breaker that is open
+        if self.breaker.state == "open":
+            INFERENCE_CALLS.labels("rejected").inc()
+            raise CircuitOpenError("Inference circuit breaker is open")
+
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            key = document_key(text)
+            future = self._in_flight.get(key)
+            if future is None:
+                future = self._in_flight[key] = loop.create_future()
+                # Marks a failure as retrieved even if every caller went away
+                future.add_done_callback(lambda f: f.cancelled() or f.exception())
+                self._queue.append((key, text))
+            futures.append(future)
+
+        if len(self._queue) >= self.max_batch_size:
+            self._flush()
+        elif self._queue and self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_wait_ms / 1000, self._flush)
+        # Shielded: one cancelled caller must not cancel a document others await
+        return list(await asyncio.gather(*(asyncio.shield(future) for future in futures)))
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        while self._queue:
+            batch = self._queue[:self.max_batch_size]
+            del self._queue[:self.max_batch_size]
+            task = asyncio.ensure_future(self._send(batch))
+            # Keep a reference so the task is not collected mid-flight
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: List[Tuple[str, str]]):
+        try:
+            vectors = await self._post([text for _, text in batch])
+        except Exception as e:
+            error = e if isinstance(e, InferenceError) else InferenceError(str(e))
+            for key, _ in batch:
+                self._settle(key, error=error)
+            return
+        for (key, _), vector in zip(batch, vectors):
+            self._settle(key, vector)
+
+    def _settle(self, key: str, vector=None, error: Optional[Exception] = None):
+        future = self._in_flight.pop(key, None)
+        if future is None or future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(vector)
+
+    async def _post(self, texts: List[str]) -> List["np.ndarray"]:
+        import numpy as np
+
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            INFERENCE_CALLS.labels("rejected").inc()
+            raise
+
+        INFERENCE_BATCH_SIZE.observe(len(texts))
+        try:
+            async with self.session.post(
+                self.url, json={"inputs": texts}, headers=self.headers
+            ) as response:
+                if response.status != 200:
+                    raise InferenceError(
+                        f"Inference service returned {response.status}: "
+                        f"{(await response.text())[:200]}"
+                    )
+                payload = await response.json()
+            if not isinstance(payload, list) or len(payload) != len(texts):
+                raise InferenceError("Inference response does not match the request")
+            vectors = []
+            for item in payload:
+                vector = np.asarray(item, dtype="float32")
+                # Token-level models return one row per token; mean-pool them
+                if vector.ndim == 2:
+                    vector = vector.mean(axis=0)
+                vectors.append(vector)
+        except Exception:
+            self.breaker.record_failure()
+            INFERENCE_CALLS.labels("error").inc()
+            raise
+
+        self.breaker.record_success()
+        INFERENCE_CALLS.labels("ok").inc()
+        return vectors
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "in_flight": len(self._in_flight)
+        }
+
+
+class RemoteScorer(SimilarityScorer):
+    """Similarity of embeddings from the inference service.
+
+    Remote scoring is asynchronous, so NLPProcessor.compare_batch handles
+    it; the synchronous similarities() is the local TF-IDF fallback.
+    """
+
+    name = "remote"
+
+    def __init__(self, client: InferenceClient, model: str, fallback: TfidfScorer):
+        self.client = client
+        self.model = model
+        self.fallback = fallback
+
+    @property
+    def version(self) -> str:
+        return f"remote:{self.model}"
+
+    @property
+    def batch_independent(self) -> bool:
+        # Failed calls are answered by the TF-IDF fallback
+        return self.fallback.batch_independent
+
+    def similarities(self, analyses, left, right):
+        return self.fallback.similarities(analyses, left, right)
+
+    async def remote_similarities(self, texts: List[str], left: List[int],
+                                  right: List[int]) -> "np.ndarray":
+        import numpy as np
+
+        vectors = np.vstack(await self.client.embed(texts))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+        return np.einsum("ij,ij->i", vectors[left], vectors[right])
+
+    def stats(self) -> Dict[str, Any]:
+        return self.client.stats()
+
+
+def create_session() -> "aiohttp.ClientSession":
+    """Client session with the connection pool and timeouts from Settings"""
+    import aiohttp
+
+    connector = aiohttp.TCPConnector(
+        limit=settings.inference_max_connections,
+        limit_per_host=settings.inference_max_connections,
+        keepalive_timeout=settings.inference_keepalive_seconds,
+        ttl_dns_cache=300
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=settings.inference_timeout_seconds,
+        connect=settings.inference_connect_timeout_seconds
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+
+def build_remote_scorer(session: "aiohttp.ClientSession",
+                        fallback: TfidfScorer) -> Optional[RemoteScorer]:
+    """The remote scorer when inference_url is configured"""
+    if not settings.inference_url:
+        return None
+    client = InferenceClient(
+        session,
+        settings.inference_url,
+        token=settings.huggingface_api_token,
+        max_batch_size=settings.inference_batch_size,
+        batch_wait_ms=settings.inference_batch_wait_ms,
+        breaker=CircuitBreaker(
+            settings.inference_breaker_failures, settings.inference_breaker_reset_seconds
+        )
+    )
+    return RemoteScorer(client, settings.inference_model, fallback)
@@ -0,0 +1,191 @@
+import hashlib
+import logging
+import threading
+from collections import Counter, defaultdict
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple, Union
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from database import ComparisonHistory
+from app.utils.document import AnalyzedDocument
+from .tfidf_model import TfidfModel
+
+if TYPE_CHECKING:
+    import scipy.sparse as sp
+
+logger = logging.getLogger(__name__)
+
+
+def job_hash(job_description: str) -> str:
+    return hashlib.sha256(job_description.encode("utf-8")).hexdigest()
+
+
+class JobIndex:
+    """Searchable index of the distinct job descriptions seen so far.
+
+    Candidates are the jobs sharing the most skills with the resume, found
+    through a skill -> jobs inverted index; only those are re-ranked by
+    exact TF-IDF cosine. Jobs are vectorized with the processor's
+    pre-fitted model when one is configured. Otherwise a model is fitted
+    on the indexed jobs and refitted, outside the index lock, once their
+    number has grown by refit_growth; jobs added in between are
+    transformed with the current model and appended as rows.
+    """
+
+    def __init__(self, nlp_processor, candidate_pool: int = 200, refit_growth: float = 2.0):
+        self.nlp_processor = nlp_processor
+        self.candidate_pool = candidate_pool
+        self.refit_growth = refit_growth
+        self._lock = threading.Lock()
+        self._refit_lock = threading.Lock()
+        self._model: Optional[TfidfModel] = nlp_processor.tfidf_model
+        self._fit_locally = self._model is None
+        self._fitted_count = 0
+        self._positions: Dict[str, int] = {}
+        self._comparison_ids: List[int] = []
+        self._texts: List[str] = []
+        self._skills: List[Set[str]] = []
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        # Rows of the jobs past the end of _matrix; None until vectorized
+        self._pending: List[Optional["sp.csr_matrix"]] = []
+        self._matrix: Optional["sp.csr_matrix"] = None
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def _vectorize(self, texts: List[Union[str, AnalyzedDocument]],
+                   model: TfidfModel) -> "sp.csr_matrix":
+        processed = [self.nlp_processor._preprocess_text(text) for text in texts]
+        return model.transform(processed)
+
+    def _skill_set(self, text: Union[str, AnalyzedDocument]) -> Set[str]:
+        tech_skills, soft_skills = self.nlp_processor._extract_skills(text)
+        return set(tech_skills) | set(soft_skills)
+
+    def build(self, db: Session, batch_size: int = 1000):
+        """Index the latest comparison of every stored job description"""
+        rows = db.query(
+            func.max(ComparisonHistory.id), ComparisonHistory.job_description
+        ).group_by(ComparisonHistory.job_description).yield_per(batch_size)
+
+        for comparison_id, job_description in rows:
+            self.add(comparison_id, job_description)
+        if self._texts:
+            # Fit and stack now so the first search does not pay for it
+            self._ensure_matrix()
+        logger.info(f"Indexed {len(self)} job descriptions")
+
+    def add(self, comparison_id: int, job_description: str):
+        """Add a job description, or point an existing one at a newer comparison"""
+        key = job_hash(job_description)
+        with self._lock:
+            position = self._positions.get(key)
+            if position is not None:
+                self._comparison_ids[position] = max(self._comparison_ids[position], comparison_id)
+                return
+            model = self._model
+
+        document = AnalyzedDocument(job_description)
+        skills = self._skill_set(document)
+        row = self._vectorize([document], model) if model is not None else None
+
+        with self._lock:
+            if key in self._positions:
+                return
+            position = len(self._texts)
+            self._positions[key] = position
+            self._comparison_ids.append(comparison_id)
+            self._texts.append(job_description)
+            self._skills.append(skills)
+            # A refit may have swapped the model while this row was computed
+            self._pending.append(row if model is self._model else None)
+            for skill in skills:
+                self._postings[skill].add(position)
+
+    def add_many(self, comparisons: List[Tuple[int, str]]):
+        for comparison_id, job_description in comparisons:
+            self.add(comparison_id, job_description)
+
+    def _refit_due(self) -> bool:
+        return (self._fit_locally
+                and len(self._texts) >= max(1, self._fitted_count * self.refit_growth))
+
+    def _refit(self):
+        """Fit the ad-hoc model on the jobs indexed so far and rebuild the matrix"""
+        with self._refit_lock:
+            with self._lock:
+                if not self._refit_due():
+                    return
+                texts = list(self._texts)
+
+            # The slow part runs unlocked, so adds and searches carry on meanwhile
+            model = TfidfModel.fit(texts)
+            matrix = self._vectorize(texts, model)
+
+            with self._lock:
+                self._model = model
+                self._fitted_count = len(texts)
+                self._matrix = matrix
+                self._pending = [None] * (len(self._texts) - len(texts))
+
+    def _ensure_matrix(self) -> Tuple[TfidfModel, "sp.csr_matrix"]:
+        """The current model and the matrix of every indexed job under it"""
+        import scipy.sparse as sp
+        
+        if self._refit_due():
+            self._refit()
+        with self._lock:
+            if self._pending:
+                missing = [offset for offset, row in enumerate(self._pending) if row is None]
+                if missing:
+                    start = len(self._texts) - len(self._pending)
+                    vectors = self._vectorize(
+                        [self._texts[start + offset] for offset in missing], self._model
+                    )
+                    for vector_row, offset in enumerate(missing):
+                        self._pending[offset] = vectors[vector_row]
+                # Only the jobs added since the last search are stacked on
+                blocks = self._pending if self._matrix is None else [self._matrix] + self._pending
+                self._matrix = sp.vstack(blocks, format="csr")
+                self._pending = []
+            return self._model, self._matrix
+
+    def _candidates(self, resume_skills: Set[str], job_count: int) -> List[int]:
+        overlap = Counter()
+        with self._lock:
+            for skill in resume_skills:
+                overlap.update(self._postings.get(skill, ()))
+        candidates = [
+            position for position, _ in overlap.most_common(self.candidate_pool)
+            if position < job_count
+        ]
+        return candidates or list(range(job_count))
+
+    def search(self, resume_text: str, top_k: int = 10) -> List[Dict]:
+        """Return the top_k indexed jobs for a resume, best first"""
+        import numpy as np
+        
+        if not self._texts:
+            return []
+
+        model, matrix = self._ensure_matrix()
+        resume = AnalyzedDocument(resume_text)
+        resume_skills = self._skill_set(resume)
+        candidates = self._candidates(resume_skills, matrix.shape[0])
+        resume_vector = self._vectorize([resume], model)
+
+        # Rows are L2-normalised, so the product is the cosine similarity
+        scores = np.asarray((matrix[candidates] @ resume_vector.T).todense()).ravel()
+        order = np.argsort(-scores)[:top_k]
+
+        return [
+            {
+                "comparison_id": self._comparison_ids[candidates[i]],
+                "job_hash": job_hash(self._texts[candidates[i]]),
+                "score": max(0.0, min(100.0, float(scores[i] * 100))),
+                "matched_skills": sorted(resume_skills & self._skills[candidates[i]]),
+                "job_description": self._texts[candidates[i]][:200]
+            }
+            for i in order
+        ]
@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from app.utils.metrics import REGISTRY, Histogram
+
+if TYPE_CHECKING:
+    from .nlp_service import NLPProcessor
+
+logger = logging.getLogger(__name__)
+
+MICRO_BATCH_SIZE = REGISTRY.register(Histogram(
+    "comparison_micro_batch_size", "Pairs scored together in one micro-batch",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256)
+))
+MICRO_BATCH_WAIT = REGISTRY.register(Histogram(
+    "comparison_micro_batch_wait_seconds", "Time a comparison waited for its micro-batch to start",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+))
+
+
+class _Waiting:
+    __slots__ = ("pairs", "future", "queued_at")
+
+    def __init__(self, pairs: List[Tuple[str, str]], future: "asyncio.Future"):
+        self.pairs = pairs
+        self.future = future
+        self.queued_at = time.perf_counter()
+
+
+class MicroBatcher:
+    """Scores comparisons from concurrent requests together.
+
+    Pairs submitted within window_ms of the first waiting one (or until
+    max_batch_size pairs are waiting) go through one compare_batch call,
+    so documents are analysed and vectorized together and every pair's
+    similarity comes from the same matrix product. Requests naming
+    different scorers are batched separately. Only scorers with a fixed
+    model are batched: the ad-hoc TF-IDF vectorizer is fitted on every
+    document of its call, so its requests are scored on their own.
+    """
+
+    def __init__(self, processor: "NLPProcessor", window_ms: float = 3.0,
+                 max_batch_size: int = 64):
+        self.processor = processor
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._waiting: Dict[str, List[_Waiting]] = {}
+        self._sizes: Dict[str, int] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._tasks: set = set()
+
+        self.batches = 0
+        self.pairs = 0
+        self.max_batch = 0
+        self.unbatched = 0
+
+        default = processor.get_scorer()
+        if not default.batch_independent:
+            logger.warning(
+                f"Micro-batching is enabled but the default {default.name!r} scorer has no "
+                "fixed model, so requests using it are not batched; set tfidf_model_path "
+                "or pick a fixed-model similarity_scorer"
+            )
+
+    async def submit(self, pairs: List[Tuple[str, str]],
+                     scorer: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Results for pairs, scored in whichever batch they land in"""
+        # Resolved now so an unknown scorer fails this caller, not the batch
+        resolved = self.processor.get_scorer(scorer)
+        name = resolved.name
+        if not resolved.batch_independent:
+            self.unbatched += 1
+            return await self.processor.compare_batch(pairs, name)
+        if len(pairs) >= self.max_batch_size:
+            return await self.processor.compare_batch(pairs, name)
+
+        loop = asyncio.get_running_loop()
+        waiting = _Waiting(pairs, loop.create_future())
+        self._waiting.setdefault(name, []).append(waiting)
+        self._sizes[name] = self._sizes.get(name, 0) + len(pairs)
+
+        if self._sizes[name] >= self.max_batch_size:
+            self._flush(name)
+        elif name not in self._timers:
+            self._timers[name] = loop.call_later(self.window, self._flush, name)
+        return await waiting.future
+
+    def _flush(self, name: str):
+        timer = self._timers.pop(name, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._waiting.pop(name, [])
+        self._sizes.pop(name, None)
+        if batch:
+            task = asyncio.ensure_future(self._run(name, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, name: str, batch: List[_Waiting]):
+        started = time.perf_counter()
+        pairs = []
+        for waiting in batch:
+            MICRO_BATCH_WAIT.observe(started - waiting.queued_at)
+            pairs.extend(waiting.pairs)
+        MICRO_BATCH_SIZE.observe(len(pairs))
+        self.batches += 1
+        self.pairs += len(pairs)
+        self.max_batch = max(self.max_batch, len(pairs))
+
+        try:
+            results = await self.processor.compare_batch(pairs, name)
+        except Exception as e:
+            logger.error(f"Micro-batch of {len(pairs)} pairs failed: {e}")
+            for waiting in batch:
+                if not waiting.future.done():
+                    waiting.future.set_exception(e)
+            return
+
+        offset = 0
+        for waiting in batch:
+            if not waiting.future.done():
+                waiting.future.set_result(results[offset:offset + len(waiting.pairs)])
+            offset += len(waiting.pairs)
+
+    async def stop(self):
+        """Score everything still waiting and wait for the running batches"""
+        for name in list(self._waiting):
+            self._flush(name)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "pairs": self.pairs,
+            "mean_batch_size": round(self.pairs / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch,
+            "unbatched_requests": self.unbatched,
+            "waiting": sum(self._sizes.values())
+        }
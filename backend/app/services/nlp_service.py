@@ -1,42 +1,258 @@
-import re
+import os
 import asyncio
-import aiohttp
-from typing import List, Dict, Tuple, Optional
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
-from fuzzywuzzy import fuzz
-from sqlalchemy.orm import Session
+import logging
+import time
+from datetime import datetime, timezone
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, List, Dict, Tuple, Optional, Union
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
 from database import ComparisonHistory
 from app.models.schemas import ComparisonResponse, SkillMatch
+from app.utils.metrics import INPUT_CHARS, STAGE_ERRORS, STAGE_SECONDS, stage_timer
+from app.utils.document import AnalyzedDocument, as_document
+from app.utils.profiling import active_profile
+from .analytics import apply_rollups, load_previous, updated_rows
+from .skill_taxonomy import SkillIndex, TECH, SOFT
+from .inference_client import RemoteScorer, build_remote_scorer, create_session
+from .scorers import SimilarityScorer, build_scorers
+from .tfidf_model import TfidfModel
+from .streaming import StreamingDocument, streaming_analyzer, streaming_similarity
+from .document_cache import (
+    DocumentAnalysis, DocumentCache, document_key, pair_key, pair_key_from_keys
+)
+
+if TYPE_CHECKING:
+    import aiohttp
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_BACKENDS = ("inline", "thread", "process")
+
+# Bump when a change to the scoring pipeline should invalidate stored results
+SCORING_VERSION = "1"
+
+# Scored at start-up so the first real request finds everything loaded;
+# the typo exercises the fuzzy matcher
+WARM_UP_PAIR = (
+    "Python developer with Django, PostgreSQL and Dockr experience. "
+    "Strong communication and teamwork.",
+    "We need a Python engineer who knows Django, Docker and AWS, "
+    "with leadership and problem solving skills."
+)
+
+# comparison_history columns written from a scoring result
+RESULT_COLUMNS = (
+    "match_score", "found_keywords", "missing_keywords", "suggestions",
+    "found_count", "missing_count", "required_skills", "similarity_details",
+    "model_version"
+)
 
 class NLPProcessor:
-    def __init__(self):
-        self.session: Optional[aiohttp.ClientSession] = None
-        self.tech_skills = self._load_tech_skills()
-        self.soft_skills = self._load_soft_skills()
-        self.tfidf = TfidfVectorizer(
-            max_features=1000,
-            stop_words='english',
-            ngram_range=(1, 2)
+    def __init__(self, taxonomy_path: Optional[str] = None):
+        self.session: Optional["aiohttp.ClientSession"] = None
+        self.executor: Optional[Executor] = None
+        self.taxonomy_path = taxonomy_path or settings.skill_taxonomy_path
+        self.skill_index = self._load_skill_index()
+        self.tfidf_model = self._load_tfidf_model()
+        self.scorers = build_scorers(self.tfidf_model)
+        self.default_scorer = self._default_scorer()
+        self.write_behind = None
+        self.micro_batcher = None
+        self._streaming_analyzer = None
+        self.document_cache = DocumentCache(
+            max_bytes=settings.document_cache_max_bytes,
+            ttl_seconds=settings.document_cache_ttl_seconds
         )
         self.initialized = False
         
     async def initialize(self):
-        """Initialize async session"""
+        """Initialize async session and scoring executor"""
         if not self.initialized:
-            self.session = aiohttp.ClientSession()
+            self.session = create_session()
+            remote = build_remote_scorer(self.session, self.scorers["tfidf"])
+            if remote is not None:
+                self.scorers["remote"] = remote
+                self.default_scorer = self._default_scorer()
+            self.executor = self._create_executor()
             self.initialized = True
     
+    def streaming_document(self) -> StreamingDocument:
+        """A document to feed an upload into, analysed like the TF-IDF scorer's input"""
+        if self._streaming_analyzer is None or self._streaming_analyzer[0] is not self.tfidf_model:
+            self._streaming_analyzer = (self.tfidf_model, streaming_analyzer(self.tfidf_model))
+        stop_words, vocabulary = self._streaming_analyzer[1]
+        return StreamingDocument(
+            self.skill_index, stop_words, vocabulary, settings.max_stream_text_length
+        )
+    
+    async def compare_streamed(self, resume: StreamingDocument, job: StreamingDocument,
+                               db: AsyncSession,
+                               force_recompute: bool = False) -> ComparisonResponse:
+        """Score and persist a pair analysed while it was uploaded.
+        
+        The pair is keyed like compare_batch_to_db's, so re-uploading the same
+        documents is answered from comparison_history. Streamed documents are
+        reduced to term counts as they arrive, so they are always scored with
+        TF-IDF; only their first 1000 characters are stored.
+        """
+        model_version = self.scorer_model_version("tfidf")
+        INPUT_CHARS.labels("resume").observe(resume.characters)
+        INPUT_CHARS.labels("job_description").observe(job.characters)
+        pair_hash = pair_key_from_keys(resume.key, job.key)
+        with stage_timer("nlp", "db_lookup"):
+            stored = await self._stored_comparisons(db, [pair_hash])
+        
+        rows: Dict[str, Dict[str, Any]] = {}
+        row = stored.get(pair_hash)
+        if force_recompute or row is None or row["model_version"] != model_version:
+            with stage_timer("nlp", "tfidf_similarity"):
+                similarity, details = streaming_similarity(
+                    resume.terms, job.terms, self.tfidf_model
+                )
+            score = similarity * 100
+            result = self._build_result(
+                resume.skills.skills, job.skills.skills, max(0.0, min(100.0, score)),
+                {**details, "score": score, "streamed": True}
+            )
+            rows[pair_hash] = {
+                "pair_hash": pair_hash,
+                "resume_text": resume.head,
+                "job_description": job.head,
+                **self._result_values(result, model_version)
+            }
+        
+        return (await self._persist_rows(db, [pair_hash], stored, rows))[0]
+    
     async def close(self):
-        """Close async session"""
+        """Close async session and scoring executor"""
+        if self.executor:
+            self.executor.shutdown(wait=True)
+            self.executor = None
         if self.session:
             await self.session.close()
             self.session = None
             self.initialized = False
     
+    def _create_executor(self) -> Optional[Executor]:
+        backend = settings.nlp_executor
+        if backend not in EXECUTOR_BACKENDS:
+            raise ValueError(
+                f"Unknown NLP executor {backend!r}, expected one of {EXECUTOR_BACKENDS}"
+            )
+        if backend == "thread":
+            return ThreadPoolExecutor(
+                max_workers=settings.nlp_workers, thread_name_prefix="nlp"
+            )
+        if backend == "process":
+            return ProcessPoolExecutor(
+                max_workers=settings.nlp_workers,
+                initializer=_init_worker,
+                initargs=(self.taxonomy_path,)
+            )
+        return None
+    
+    async def warm_up(self) -> float:
+        """Score WARM_UP_PAIR here and on every executor worker; returns milliseconds"""
+        started = time.perf_counter()
+        # Off the event loop: this is where sklearn and numpy get imported
+        await asyncio.to_thread(self.score_pairs, [WARM_UP_PAIR])
+        if self.executor is not None:
+            # One job per worker makes a process pool start (and load) all of them
+            workers = getattr(self.executor, "_max_workers", 1)
+            await asyncio.gather(*(self.compare_batch([WARM_UP_PAIR]) for _ in range(workers)))
+        return (time.perf_counter() - started) * 1000
+    
+    @property
+    def tech_skills(self) -> List[str]:
+        return self.skill_index.tech_skills
+    
+    @property
+    def soft_skills(self) -> List[str]:
+        return self.skill_index.soft_skills
+    
+    def _load_skill_index(self, taxonomy_path: Optional[str] = None,
+                          fallback: bool = True) -> SkillIndex:
+        taxonomy_path = taxonomy_path or self.taxonomy_path
+        if taxonomy_path and os.path.exists(taxonomy_path):
+            return SkillIndex.from_taxonomy(taxonomy_path)
+        if taxonomy_path:
+            if not fallback:
+                raise FileNotFoundError(f"Skill taxonomy {taxonomy_path} not found")
+            logger.warning(f"Skill taxonomy {taxonomy_path} not found, using built-in skills")
+        return SkillIndex.from_skill_lists(
+            self._load_tech_skills(), self._load_soft_skills()
+        )
+    
+    def reload_taxonomy(self, taxonomy_path: Optional[str] = None) -> SkillIndex:
+        """Load a new skill index and swap it in for subsequent requests.
+        
+        Raises, keeping the current index, when the configured taxonomy
+        cannot be read; only start-up falls back to the built-in skills.
+        """
+        taxonomy_path = taxonomy_path or self.taxonomy_path
+        skill_index = self._load_skill_index(taxonomy_path, fallback=False)
+        self.taxonomy_path = taxonomy_path
+        # Requests in flight keep the index they started with.
+        self.skill_index = skill_index
+        
+        if isinstance(self.executor, ProcessPoolExecutor):
+            # Workers load the index at start-up, so replace the pool and let
+            # the old one finish the comparisons it already accepted.
+            previous = self.executor
+            self.executor = self._create_executor()
+            previous.shutdown(wait=False)
+        logger.info(f"Loaded skill index version {skill_index.version}")
+        return skill_index
+    
+    def _load_tfidf_model(self) -> Optional[TfidfModel]:
+        model_path = settings.tfidf_model_path
+        if not model_path:
+            return None
+        if not os.path.exists(model_path):
+            logger.warning(f"TF-IDF model {model_path} not found, fitting per request")
+            return None
+        model = TfidfModel.load(model_path)
+        logger.info(f"Loaded TF-IDF model version {model.version}")
+        return model
+    
+    def _default_scorer(self) -> str:
+        name = settings.similarity_scorer
+        if name == "remote" and settings.inference_url and name not in self.scorers:
+            # Registered by initialize(), which needs the HTTP session
+            return "tfidf"
+        if name not in self.scorers:
+            logger.warning(f"Similarity scorer {name!r} is not available, using tfidf")
+            return "tfidf"
+        return name
+    
+    def get_scorer(self, name: Optional[str] = None) -> SimilarityScorer:
+        """The named scorer, or the default one; ValueError if it is not loaded"""
+        scorer = self.scorers.get(name or self.default_scorer)
+        if scorer is None:
+            raise ValueError(
+                f"Unknown similarity scorer {name!r}, available: {sorted(self.scorers)}"
+            )
+        return scorer
+    
+    def scorer_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Version and observed latency of every loaded scorer"""
+        stats = {}
+        for name, scorer in self.scorers.items():
+            batches, seconds = STAGE_SECONDS.labels("nlp", f"{name}_similarity").totals()
+            stats[name] = {
+                "version": scorer.version,
+                "default": name == self.default_scorer,
+                "batches": batches,
+                "mean_ms": round(seconds / batches * 1000, 3) if batches else None,
+                **scorer.stats()
+            }
+        return stats
+    
     def _load_tech_skills(self) -> List[str]:
         return [
             "python", "java", "javascript", "typescript", "c++", "c#", "go", "rust",
@@ -52,36 +268,89 @@ class NLPProcessor:
             "project management", "analytical thinking", "collaboration"
         ]
     
-    def _preprocess_text(self, text: str) -> str:
-        text = re.sub(r'[^\w\s]', ' ', text)
-        text = re.sub(r'\s+', ' ', text)
-        return text.lower().strip()
+    def _preprocess_text(self, text: Union[str, AnalyzedDocument]) -> str:
+        return as_document(text).processed_text
     
-    def _find_skill_matches(self, text: str, skills_list: List[str]) -> List[str]:
-        found_skills = []
-        processed_text = self._preprocess_text(text)
+    def _find_skill_matches(self, text: Union[str, AnalyzedDocument],
+                            skills_list: List[str]) -> List[str]:
+        skill_index = self.skill_index
+        tokens = as_document(text).tokens
+        allowed = set(skills_list)
+        found_skills = {
+            skill for skill in skill_index.matcher.find(tokens) if skill in allowed
+        }
+        found_skills.update(allowed & skill_index.fuzzy_index.match_tokens(tokens))
+        return list(found_skills)
+    
+    def _skills_from_tokens(self, tokens: List[str],
+                            skill_index: SkillIndex) -> Tuple[List[str], List[str]]:
+        found = {TECH: set(), SOFT: set()}
+        with stage_timer("nlp", "exact_match"):
+            exact_matches = skill_index.matcher.find(tokens)
+        for skill, category in exact_matches.items():
+            found[category].add(skill)
+        with stage_timer("nlp", "fuzzy_match"):
+            fuzzy_matches = skill_index.fuzzy_index.match_categories(tokens)
+        for skill, category in fuzzy_matches.items():
+            found[category].add(skill)
+        
+        return list(found[TECH]), list(found[SOFT])
+    
+    def _extract_skills(self, text: Union[str, AnalyzedDocument]) -> Tuple[List[str], List[str]]:
+        """Return (tech skills, soft skills) found in text"""
+        return self._skills_from_tokens(as_document(text).tokens, self.skill_index)
+    
+    def analyze(self, text: str) -> DocumentAnalysis:
+        """Return the cached analysis of a document, computing it on a miss"""
+        skill_index = self.skill_index
+        tfidf_model = self.tfidf_model
+        key = (
+            document_key(text),
+            skill_index.version,
+            tfidf_model.version if tfidf_model is not None else None
+        )
         
-        for skill in skills_list:
-            if skill.lower() in processed_text:
-                found_skills.append(skill)
-            elif any(fuzz.ratio(skill.lower(), word) > 85 
-                    for word in processed_text.split()):
-                found_skills.append(skill)
+        def compute() -> DocumentAnalysis:
+            # The only pass over the raw text; every stage below reads the tokens
+            with stage_timer("nlp", "tokenize"):
+                document = AnalyzedDocument(text)
+            tech_skills, soft_skills = self._skills_from_tokens(document.tokens, skill_index)
+            with stage_timer("nlp", "preprocess"):
+                processed_text = document.processed_text
+            tfidf_vector = None
+            if tfidf_model is not None:
+                with stage_timer("nlp", "tfidf_transform"):
+                    tfidf_vector = tfidf_model.transform([processed_text])
+            return DocumentAnalysis(
+                processed_text, document.token_set, tech_skills, soft_skills, tfidf_vector,
+                key=key[0]
+            )
         
-        return list(set(found_skills))
+        return self.document_cache.get_or_compute(key, compute)
+    
+    def _pair_similarities(self, analyses: List[DocumentAnalysis], left: List[int],
+                           right: List[int], scorer: Optional[SimilarityScorer] = None
+                           ) -> Tuple["np.ndarray", Dict[str, Any]]:
+        """Similarity of analyses[left[i]] and analyses[right[i]] for every i"""
+        scorer = scorer or self.get_scorer()
+        # Each scorer is timed as its own stage, so backends can be compared
+        with stage_timer("nlp", f"{scorer.name}_similarity"):
+            try:
+                return scorer.similarities(analyses, left, right)
+            except Exception as e:
+                import numpy as np
+                
+                STAGE_ERRORS.labels("nlp").inc()
+                return np.zeros(len(left)), {"method": "fallback", "error": str(e)}
     
     def _calculate_similarity(self, resume_text: str, job_text: str) -> Tuple[float, Dict]:
-        try:
-            processed_resume = self._preprocess_text(resume_text)
-            processed_job = self._preprocess_text(job_text)
-            
-            tfidf_matrix = self.tfidf.fit_transform([processed_resume, processed_job])
-            similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-            score = float(similarity * 100)
-            
-            return max(0.0, min(100.0, score)), {"method": "tfidf", "score": score}
-        except Exception as e:
-            return 0.0, {"method": "fallback", "error": str(e)}
+        similarities, details = self._pair_similarities(
+            [self.analyze(resume_text), self.analyze(job_text)], [0], [1]
+        )
+        score = float(similarities[0] * 100)
+        if details["method"] != "fallback":
+            details["score"] = score
+        return max(0.0, min(100.0, score)), details
     
     def _generate_suggestions(self, missing_keywords: List[str]) -> List[str]:
         suggestions = []
@@ -100,14 +369,11 @@ class NLPProcessor:
         
         return suggestions[:5]
     
-    async def compare_resume_to_job(self, resume_text: str, job_description: str, 
-                                  db: Session) -> ComparisonResponse:
-        # Extract skills
-        resume_tech_skills = self._find_skill_matches(resume_text, self.tech_skills)
-        job_tech_skills = self._find_skill_matches(job_description, self.tech_skills)
-        
-        resume_soft_skills = self._find_skill_matches(resume_text, self.soft_skills)
-        job_soft_skills = self._find_skill_matches(job_description, self.soft_skills)
+    def _build_result(self, resume_skills: Tuple[List[str], List[str]],
+                      job_skills: Tuple[List[str], List[str]], match_score: float,
+                      similarity_details: Dict[str, Any]) -> Dict[str, Any]:
+        resume_tech_skills, resume_soft_skills = resume_skills
+        job_tech_skills, job_soft_skills = job_skills
         
         # Combine skills
         all_resume_skills = list(set(resume_tech_skills + resume_soft_skills))
@@ -117,11 +383,6 @@ class NLPProcessor:
         found_keywords = list(set(all_resume_skills) & set(all_job_skills))
         missing_keywords = list(set(all_job_skills) - set(all_resume_skills))
         
-        # Calculate similarity
-        match_score, similarity_details = self._calculate_similarity(
-            resume_text, job_description
-        )
-        
         # Create skill matches
         required_skills = []
         for skill in all_job_skills:
@@ -134,26 +395,334 @@ class NLPProcessor:
         # Generate suggestions
         suggestions = self._generate_suggestions(missing_keywords)
         
-        # Save to database
-        comparison_record = ComparisonHistory(
-            resume_text=resume_text[:1000],
-            job_description=job_description[:1000],
-            match_score=match_score,
-            found_keywords=found_keywords,
-            missing_keywords=missing_keywords,
-            suggestions=suggestions
+        return {
+            "match_score": match_score,
+            "required_skills": required_skills,
+            "found_keywords": found_keywords,
+            "missing_keywords": missing_keywords,
+            "suggestions": suggestions,
+            "similarity_details": similarity_details
+        }
+    
+    def score_texts(self, resume_text: str, job_description: str,
+                    scorer: Optional[str] = None) -> Dict[str, Any]:
+        """Run the CPU-bound scoring pipeline for one resume/job pair"""
+        return self.score_pairs([(resume_text, job_description)], scorer)[0]
+    
+    def score_pairs(self, pairs: List[Tuple[str, str]],
+                    scorer: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Score many resume/job pairs with one vectorization pass.
+        
+        Each distinct document is analysed once (or served from the document
+        cache), the scorer sees every document at once (one TF-IDF matrix, or
+        one embedding pass over the documents it has not cached), and all pair
+        similarities come from one row-wise product. A scorer that is not
+        batch_independent (ad-hoc TF-IDF) is called once per pair instead, so
+        a pair scores the same alone as in any batch.
+        """
+        documents: Dict[str, int] = {}
+        for resume_text, job_description in pairs:
+            documents.setdefault(resume_text, len(documents))
+            documents.setdefault(job_description, len(documents))
+        analyses = [self.analyze(text) for text in documents]
+        
+        left = [documents[resume_text] for resume_text, _ in pairs]
+        right = [documents[job_description] for _, job_description in pairs]
+        scorer = self.get_scorer(scorer)
+        if scorer.batch_independent:
+            similarities, details = self._pair_similarities(analyses, left, right, scorer)
+            scored = [(similarity, details) for similarity in similarities]
+        else:
+            scored = []
+            for i, j in zip(left, right):
+                pair = [analyses[i]] if i == j else [analyses[i], analyses[j]]
+                similarities, details = self._pair_similarities(pair, [0], [len(pair) - 1], scorer)
+                scored.append((similarities[0], details))
+        
+        results = []
+        with stage_timer("nlp", "suggestions"):
+            for pair_index, (similarity, details) in enumerate(scored):
+                score = float(similarity * 100)
+                pair_details = dict(details)
+                if details["method"] != "fallback":
+                    pair_details["score"] = score
+                results.append(self._build_result(
+                    analyses[left[pair_index]].skills,
+                    analyses[right[pair_index]].skills,
+                    max(0.0, min(100.0, score)),
+                    pair_details
+                ))
+        return results
+    
+    async def compare_texts(self, resume_text: str, job_description: str,
+                            scorer: Optional[str] = None) -> Dict[str, Any]:
+        """Score a pair on the configured execution backend"""
+        if isinstance(self.get_scorer(scorer), RemoteScorer):
+            return (await self.compare_batch([(resume_text, job_description)], scorer))[0]
+        profile = active_profile.get()
+        if profile is not None:
+            return await asyncio.to_thread(
+                profile.call, self.score_texts, resume_text, job_description, scorer
+            )
+        if self.executor is None:
+            return self.score_texts(resume_text, job_description, scorer)
+        
+        loop = asyncio.get_running_loop()
+        if isinstance(self.executor, ProcessPoolExecutor):
+            return await loop.run_in_executor(
+                self.executor, _score_in_worker, resume_text, job_description, scorer
+            )
+        return await loop.run_in_executor(
+            self.executor, self.score_texts, resume_text, job_description, scorer
+        )
+    
+    @property
+    def model_version(self) -> str:
+        """Identifies everything that can change a stored comparison's result"""
+        return self.scorer_model_version()
+    
+    def scorer_model_version(self, scorer: Optional[str] = None) -> str:
+        """model_version of results scored with the named scorer"""
+        return "{}-{}-{}".format(
+            SCORING_VERSION,
+            self.skill_index.version[:16],
+            self.get_scorer(scorer).version
+        )
+    
+    async def compare_resume_to_job(self, resume_text: str, job_description: str, 
+                                  db: AsyncSession, force_recompute: bool = False,
+                                  scorer: Optional[str] = None) -> ComparisonResponse:
+        results = await self.compare_batch_to_db(
+            [(resume_text, job_description)], db, force_recompute, scorer
+        )
+        return results[0]
+    
+    async def compare_batch(self, pairs: List[Tuple[str, str]],
+                            scorer: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Score many pairs on the configured execution backend"""
+        remote = self.get_scorer(scorer)
+        if isinstance(remote, RemoteScorer):
+            return await self._compare_batch_remote(pairs, remote)
+        # A profiled request is scored on its own thread, under its profiler
+        profile = active_profile.get()
+        if profile is not None:
+            return await asyncio.to_thread(profile.call, self.score_pairs, pairs, scorer)
+        if self.executor is None:
+            return self.score_pairs(pairs, scorer)
+        
+        loop = asyncio.get_running_loop()
+        if isinstance(self.executor, ProcessPoolExecutor):
+            return await loop.run_in_executor(
+                self.executor, _score_pairs_in_worker, pairs, scorer
+            )
+        return await loop.run_in_executor(self.executor, self.score_pairs, pairs, scorer)
+    
+    async def _remote_similarities(self, remote: RemoteScorer,
+                                   pairs: List[Tuple[str, str]]) -> "np.ndarray":
+        documents: Dict[str, int] = {}
+        for resume_text, job_description in pairs:
+            documents.setdefault(resume_text, len(documents))
+            documents.setdefault(job_description, len(documents))
+        with stage_timer("nlp", "remote_similarity"):
+            return await remote.remote_similarities(
+                list(documents),
+                [documents[resume_text] for resume_text, _ in pairs],
+                [documents[job_description] for _, job_description in pairs]
+            )
+    
+    async def _compare_batch_remote(self, pairs: List[Tuple[str, str]],
+                                    remote: RemoteScorer) -> List[Dict[str, Any]]:
+        """Remote similarities, with skills and the fallback scored locally meanwhile"""
+        results, similarities = await asyncio.gather(
+            self.compare_batch(pairs, "tfidf"),
+            self._remote_similarities(remote, pairs),
+            return_exceptions=True
+        )
+        if isinstance(results, BaseException):
+            raise results
+        
+        if isinstance(similarities, BaseException):
+            STAGE_ERRORS.labels("nlp").inc()
+            logger.warning(f"Remote scoring failed, using TF-IDF: {similarities}")
+            for result in results:
+                result["similarity_details"] = {
+                    **result["similarity_details"],
+                    "fallback_from": remote.name,
+                    "error": str(similarities)
+                }
+            return results
+        
+        for result, similarity in zip(results, similarities):
+            score = float(similarity * 100)
+            result["match_score"] = max(0.0, min(100.0, score))
+            result["similarity_details"] = {
+                "method": remote.name, "model_version": remote.version, "score": score
+            }
+        return results
+    
+    async def _score_pending(self, pairs: List[Tuple[str, str]],
+                             scorer: Optional[str]) -> List[Dict[str, Any]]:
+        # Profiled requests skip the micro-batcher so the profile shows their own work
+        if self.micro_batcher is not None and active_profile.get() is None:
+            return await self.micro_batcher.submit(pairs, scorer)
+        return await self.compare_batch(pairs, scorer)
+    
+    async def _stored_comparisons(self, db: AsyncSession,
+                                  pair_hashes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Stored results keyed by pair hash, including rows still queued for writing"""
+        columns = [ComparisonHistory.id, ComparisonHistory.pair_hash] + [
+            getattr(ComparisonHistory, column) for column in RESULT_COLUMNS
+        ]
+        rows = await db.execute(
+            select(*columns).where(ComparisonHistory.pair_hash.in_(set(pair_hashes)))
         )
+        stored = {row.pair_hash: dict(row._mapping) for row in rows}
         
-        db.add(comparison_record)
-        db.commit()
-        db.refresh(comparison_record)
-        
-        return ComparisonResponse(
-            id=comparison_record.id,
-            match_score=match_score,
-            required_skills=required_skills,
-            found_keywords=found_keywords,
-            missing_keywords=missing_keywords,
-            suggestions=suggestions,
-            similarity_details=similarity_details
-        )
\ No newline at end of file
+        if self.write_behind is not None:
+            for pair_hash in pair_hashes:
+                queued = self.write_behind.pending(pair_hash)
+                if queued is not None:
+                    stored[pair_hash] = queued
+        return stored
+    
+    def _result_values(self, result: Dict[str, Any], model_version: str) -> Dict[str, Any]:
+        return {
+            "match_score": result["match_score"],
+            "found_keywords": result["found_keywords"],
+            "missing_keywords": result["missing_keywords"],
+            "suggestions": result["suggestions"],
+            "found_count": len(result["found_keywords"]),
+            "missing_count": len(result["missing_keywords"]),
+            "required_skills": [skill.model_dump() for skill in result["required_skills"]],
+            "similarity_details": result["similarity_details"],
+            "model_version": model_version
+        }
+    
+    async def _save_rows(self, db: AsyncSession, inserts: List[Dict[str, Any]],
+                         updates: List[Dict[str, Any]]):
+        """Write new and rescored rows, filling in the ids of new rows"""
+        created_at = datetime.now(timezone.utc)
+        for row in inserts:
+            row["created_at"] = created_at
+        
+        if self.write_behind is not None:
+            ids = await self.write_behind.allocate_ids(len(inserts))
+            for row, row_id in zip(inserts, ids):
+                row["id"] = row_id
+            await self.write_behind.enqueue(inserts, updates)
+            return
+        
+        previous = await load_previous(db, [row["id"] for row in updates])
+        records = [ComparisonHistory(**row) for row in inserts]
+        db.add_all(records)
+        if updates:
+            await db.execute(update(ComparisonHistory), updates)
+        await db.flush()
+        for row, record in zip(inserts, records):
+            row["id"] = record.id
+        
+        added, removed = updated_rows(updates, previous)
+        await apply_rollups(db, inserts + added, removed)
+        await db.commit()
+    
+    async def compare_batch_to_db(self, pairs: List[Tuple[str, str]], db: AsyncSession,
+                                  force_recompute: bool = False,
+                                  scorer: Optional[str] = None) -> List[ComparisonResponse]:
+        """Score pairs and persist them, reusing stored results for known pairs.
+        
+        A pair already scored with the current model version is answered from
+        comparison_history without recomputing or inserting; new pairs are
+        written in a single flush and commit, or handed to the write-behind
+        queue when it is enabled.
+        """
+        model_version = self.scorer_model_version(scorer)
+        for resume_text, job_description in pairs:
+            INPUT_CHARS.labels("resume").observe(len(resume_text))
+            INPUT_CHARS.labels("job_description").observe(len(job_description))
+        pair_hashes = [pair_key(resume_text, job_description)
+                       for resume_text, job_description in pairs]
+        with stage_timer("nlp", "db_lookup"):
+            stored = await self._stored_comparisons(db, pair_hashes)
+        
+        pending: Dict[str, Tuple[str, str]] = {}
+        for pair_hash, pair in zip(pair_hashes, pairs):
+            row = stored.get(pair_hash)
+            if force_recompute or row is None or row["model_version"] != model_version:
+                pending.setdefault(pair_hash, pair)
+        
+        with stage_timer("nlp", "score"):
+            results = await self._score_pending(list(pending.values()), scorer) if pending else []
+        
+        rows: Dict[str, Dict[str, Any]] = {}
+        for (pair_hash, (resume_text, job_description)), result in zip(pending.items(), results):
+            # A fallback result is stored as what it is, so it gets rescored later
+            version = model_version
+            if result["similarity_details"].get("fallback_from"):
+                version = self.scorer_model_version("tfidf")
+            rows[pair_hash] = {
+                "pair_hash": pair_hash,
+                "resume_text": resume_text[:1000],
+                "job_description": job_description[:1000],
+                **self._result_values(result, version)
+            }
+        
+        return await self._persist_rows(db, pair_hashes, stored, rows)
+    
+    async def _persist_rows(self, db: AsyncSession, pair_hashes: List[str],
+                            stored: Dict[str, Dict[str, Any]],
+                            rows: Dict[str, Dict[str, Any]]) -> List[ComparisonResponse]:
+        """Insert or update the scored rows and answer every pair_hash"""
+        def split_rows():
+            inserts, updates = [], []
+            for pair_hash, row in rows.items():
+                if pair_hash in stored:
+                    row["id"] = stored[pair_hash]["id"]
+                    updates.append({key: row[key] for key in ("id",) + RESULT_COLUMNS})
+                else:
+                    row.pop("id", None)
+                    inserts.append(row)
+            return inserts, updates
+        
+        with stage_timer("nlp", "db_persist"):
+            try:
+                await self._save_rows(db, *split_rows())
+            except IntegrityError:
+                # A concurrent request stored one of these pairs first; update it instead
+                await db.rollback()
+                stored = await self._stored_comparisons(db, pair_hashes)
+                await self._save_rows(db, *split_rows())
+        
+        responses = []
+        for pair_hash in pair_hashes:
+            row = rows.get(pair_hash) or stored[pair_hash]
+            responses.append(ComparisonResponse(
+                id=row["id"],
+                match_score=row["match_score"],
+                required_skills=row["required_skills"] or [],
+                found_keywords=row["found_keywords"] or [],
+                missing_keywords=row["missing_keywords"] or [],
+                suggestions=row["suggestions"] or [],
+                similarity_details=row["similarity_details"] or {},
+                cached=pair_hash not in rows
+            ))
+        
+        return responses
+
+
+# Scoring state of a process-pool worker, built once by the pool initializer
+_worker_processor: Optional[NLPProcessor] = None
+
+
+def _init_worker(taxonomy_path: Optional[str]):
+    global _worker_processor
+    _worker_processor = NLPProcessor(taxonomy_path)
+
+
+def _score_in_worker(resume_text: str, job_description: str,
+                     scorer: Optional[str] = None) -> Dict[str, Any]:
+    return _worker_processor.score_texts(resume_text, job_description, scorer)
+
+
+def _score_pairs_in_worker(pairs: List[Tuple[str, str]],
+                           scorer: Optional[str] = None) -> List[Dict[str, Any]]:
+    return _worker_processor.score_pairs(pairs, scorer)
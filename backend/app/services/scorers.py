@@ -0,0 +1,313 @@
+import hashlib
+import logging
+import os
+import sys
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+from app.config import settings
+from .document_cache import DocumentAnalysis, DocumentCache
+from .tfidf_model import TfidfModel, build_vectorizer, preprocess_text, save_model_file
+
+if TYPE_CHECKING:
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+logger = logging.getLogger(__name__)
+
+
+class SimilarityScorer:
+    """Turns pairs of analysed documents into similarities in [0, 1]"""
+
+    name = ""
+
+    @property
+    def version(self) -> str:
+        """Identifies the model; part of the stored comparisons' model_version"""
+        raise NotImplementedError
+
+    @property
+    def batch_independent(self) -> bool:
+        """Whether a pair's similarity is the same whichever documents share its call"""
+        return True
+
+    def similarities(self, analyses: List[DocumentAnalysis], left: List[int],
+                     right: List[int]) -> Tuple["np.ndarray", Dict[str, Any]]:
+        """Similarity of analyses[left[i]] and analyses[right[i]] for every i"""
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        """Backend-specific state reported by /health"""
+        return {}
+
+
+class TfidfScorer(SimilarityScorer):
+    """Lexical cosine similarity of TF-IDF vectors"""
+
+    name = "tfidf"
+
+    def __init__(self, model: Optional[TfidfModel]):
+        self.model = model
+
+    @property
+    def version(self) -> str:
+        return self.model.version if self.model is not None else "adhoc"
+
+    @property
+    def batch_independent(self) -> bool:
+        # The ad-hoc vectorizer's vocabulary and IDF come from the whole call
+        return self.model is not None
+
+    def similarities(self, analyses, left, right):
+        import numpy as np
+        import scipy.sparse as sp
+
+        model = self.model
+        if model is not None and all(a.tfidf_vector is not None for a in analyses):
+            tfidf_matrix = sp.vstack([a.tfidf_vector for a in analyses], format="csr")
+            details = {"method": "tfidf_prefit", "model_version": model.version}
+        else:
+            # Fit a throwaway vectorizer so concurrent requests never share state
+            tfidf_matrix = build_vectorizer().fit_transform(
+                [a.processed_text for a in analyses]
+            )
+            details = {"method": "tfidf"}
+        # Rows are L2-normalised, so the row-wise dot product is the cosine
+        similarities = np.asarray(
+            tfidf_matrix[left].multiply(tfidf_matrix[right]).sum(axis=1)
+        ).ravel()
+        return similarities, details
+
+
+class _Embedding:
+    """A cached document embedding, sized for DocumentCache"""
+
+    __slots__ = ("vector", "size")
+
+    def __init__(self, vector: "np.ndarray"):
+        self.vector = vector
+        self.size = vector.nbytes + sys.getsizeof(self)
+
+
+class EmbeddingScorer(SimilarityScorer):
+    """Cosine similarity of dense document embeddings.
+
+    Embeddings are cached per document and scorer version; the documents
+    missing from the cache are embedded together in one embed() call.
+    """
+
+    def __init__(self, cache: DocumentCache):
+        self.cache = cache
+
+    def embed(self, analyses: List[DocumentAnalysis]) -> "np.ndarray":
+        """One L2-normalised row per analysis"""
+        raise NotImplementedError
+
+    def similarities(self, analyses, left, right):
+        import numpy as np
+
+        version = self.version
+        vectors: List[Optional["np.ndarray"]] = []
+        misses = []
+        for i, analysis in enumerate(analyses):
+            entry = self.cache.get((analysis.key, version)) if analysis.key else None
+            vectors.append(entry.vector if entry is not None else None)
+            if entry is None:
+                misses.append(i)
+
+        if misses:
+            embedded = self.embed([analyses[i] for i in misses])
+            for i, vector in zip(misses, embedded):
+                vectors[i] = vector
+                if analyses[i].key:
+                    self.cache.put((analyses[i].key, version), _Embedding(vector))
+
+        matrix = np.vstack(vectors)
+        similarities = np.einsum("ij,ij->i", matrix[left], matrix[right])
+        return similarities, {
+            "method": self.name, "model_version": version, "embedded": len(misses)
+        }
+
+
+def _normalize_rows(matrix: "np.ndarray") -> "np.ndarray":
+    import numpy as np
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    # Documents with nothing to embed stay zero vectors and score 0
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+class LsaModel:
+    """A TF-IDF vectorizer plus a truncated SVD projection fitted on one corpus"""
+
+    def __init__(self, vectorizer: "TfidfVectorizer", components: "np.ndarray", version: str,
+                 document_count: int, fitted_at: str):
+        self.vectorizer = vectorizer
+        self.components = components
+        self.version = version
+        self.document_count = document_count
+        self.fitted_at = fitted_at
+
+    @classmethod
+    def fit(cls, documents: Iterable[str], n_components: int = 100) -> "LsaModel":
+        from sklearn.decomposition import TruncatedSVD
+
+        processed = [preprocess_text(doc) for doc in documents if doc and doc.strip()]
+        if not processed:
+            raise ValueError("Cannot fit LSA model on an empty corpus")
+
+        vectorizer = build_vectorizer()
+        tfidf_matrix = vectorizer.fit_transform(processed)
+        n_components = max(1, min(n_components, tfidf_matrix.shape[1] - 1))
+        svd = TruncatedSVD(n_components=n_components, random_state=0)
+        svd.fit(tfidf_matrix)
+        components = svd.components_.astype("float32")
+
+        digest = hashlib.sha256()
+        for term in sorted(vectorizer.vocabulary_):
+            digest.update(term.encode("utf-8"))
+        digest.update(components.tobytes())
+
+        return cls(
+            vectorizer,
+            components,
+            version=digest.hexdigest()[:16],
+            document_count=len(processed),
+            fitted_at=datetime.now(timezone.utc).isoformat()
+        )
+
+    def save(self, path: str):
+        """Persist the model, replacing any existing file atomically"""
+        save_model_file(path, {
+            "vectorizer": self.vectorizer,
+            "components": self.components,
+            "version": self.version,
+            "document_count": self.document_count,
+            "fitted_at": self.fitted_at
+        })
+
+    @classmethod
+    def load(cls, path: str) -> "LsaModel":
+        import joblib
+
+        data = joblib.load(path)
+        return cls(
+            data["vectorizer"],
+            data["components"],
+            version=data["version"],
+            document_count=data["document_count"],
+            fitted_at=data["fitted_at"]
+        )
+
+
+class LsaScorer(EmbeddingScorer):
+    """Latent semantic similarity: terms that co-occur in the corpus share dimensions"""
+
+    name = "lsa"
+
+    def __init__(self, model: LsaModel, cache: DocumentCache):
+        super().__init__(cache)
+        self.model = model
+
+    @property
+    def version(self) -> str:
+        return f"lsa:{self.model.version}"
+
+    def embed(self, analyses):
+        import numpy as np
+
+        tfidf_matrix = self.model.vectorizer.transform([a.processed_text for a in analyses])
+        return _normalize_rows(np.asarray(tfidf_matrix @ self.model.components.T))
+
+
+class EmbeddingTable:
+    """Static word vectors read from a GloVe/word2vec style text file"""
+
+    def __init__(self, words: List[str], vectors: "np.ndarray", version: str):
+        self.index = {word: row for row, word in enumerate(words)}
+        self.vectors = vectors
+        self.version = version
+
+    @classmethod
+    def load(cls, path: str) -> "EmbeddingTable":
+        import numpy as np
+
+        words: List[str] = []
+        rows: List[List[float]] = []
+        digest = hashlib.sha256()
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                digest.update(line.encode("utf-8"))
+                fields = line.rstrip().split(" ")
+                # word2vec files start with a "<count> <dimensions>" header
+                if len(fields) <= 2:
+                    continue
+                words.append(fields[0].lower())
+                rows.append([float(value) for value in fields[1:]])
+        if not rows:
+            raise ValueError(f"No word vectors in {path}")
+        return cls(words, np.asarray(rows, dtype="float32"), digest.hexdigest()[:16])
+
+
+class StaticEmbeddingScorer(EmbeddingScorer):
+    """Mean of static word vectors, so related words score above zero"""
+
+    name = "embedding"
+
+    def __init__(self, table: EmbeddingTable, cache: DocumentCache):
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+        super().__init__(cache)
+        self.table = table
+        self.stop_words = ENGLISH_STOP_WORDS
+
+    @property
+    def version(self) -> str:
+        return f"emb:{self.table.version}"
+
+    def embed(self, analyses):
+        import numpy as np
+        import scipy.sparse as sp
+
+        index = self.table.index
+        rows, columns = [], []
+        for row, analysis in enumerate(analyses):
+            for word in analysis.processed_text.split():
+                column = index.get(word)
+                if column is not None and word not in self.stop_words:
+                    rows.append(row)
+                    columns.append(column)
+        # Word counts per document times the table sums every document at once
+        counts = sp.csr_matrix(
+            (np.ones(len(rows), dtype="float32"), (rows, columns)),
+            shape=(len(analyses), len(self.table.vectors))
+        )
+        return _normalize_rows(np.asarray(counts @ self.table.vectors))
+
+
+def build_scorers(tfidf_model: Optional[TfidfModel]) -> Dict[str, SimilarityScorer]:
+    """The TF-IDF scorer plus every semantic scorer whose model is configured"""
+    scorers: Dict[str, SimilarityScorer] = {"tfidf": TfidfScorer(tfidf_model)}
+    cache = DocumentCache(
+        max_bytes=settings.embedding_cache_max_bytes,
+        ttl_seconds=settings.document_cache_ttl_seconds
+    )
+
+    if settings.lsa_model_path:
+        if os.path.exists(settings.lsa_model_path):
+            model = LsaModel.load(settings.lsa_model_path)
+            scorers["lsa"] = LsaScorer(model, cache)
+            logger.info(f"Loaded LSA model version {model.version}")
+        else:
+            logger.warning(f"LSA model {settings.lsa_model_path} not found")
+
+    if settings.embedding_table_path:
+        if os.path.exists(settings.embedding_table_path):
+            table = EmbeddingTable.load(settings.embedding_table_path)
+            scorers["embedding"] = StaticEmbeddingScorer(table, cache)
+            logger.info(f"Loaded {len(table.index)} word vectors, version {table.version}")
+        else:
+            logger.warning(f"Embedding table {settings.embedding_table_path} not found")
+
+    return scorers
+
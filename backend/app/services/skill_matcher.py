@@ -0,0 +1,70 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.utils.document import tokenize
+
+
+class SkillMatcher:
+    """Token trie over a skill vocabulary.
+
+    Every skill (and any alias) is stored as a path of tokens, so a single
+    left-to-right walk over a document finds all exact hits, including
+    multi-word skills, and only ever matches on whole tokens.
+    """
+
+    _TERMINAL = "\0"
+
+    def __init__(self, terms: Iterable[Tuple[str, str, str]]):
+        """Build the trie from (term, skill, category) triples"""
+        self._root: Dict[str, dict] = {}
+        self._terms: List[Tuple[str, str, str]] = []
+        self.max_phrase_tokens = 0
+        for term, skill, category in terms:
+            tokens = tokenize(term)
+            if not tokens:
+                continue
+            self._terms.append((term, skill, category))
+            node = self._root
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node[self._TERMINAL] = (skill, category)
+            self.max_phrase_tokens = max(self.max_phrase_tokens, len(tokens))
+
+    @classmethod
+    def from_skill_lists(cls, skill_lists: Dict[str, List[str]]) -> "SkillMatcher":
+        """Build a matcher from {category: [skill, ...]}"""
+        return cls(
+            (skill, skill, category)
+            for category, skills in skill_lists.items()
+            for skill in skills
+        )
+
+    def iter_terms(self) -> Iterator[Tuple[str, str, str]]:
+        """Yield (term, skill, category) for every term in the trie"""
+        return iter(self._terms)
+
+    def lookup(self, phrase: str) -> Optional[Tuple[str, str]]:
+        """Return (skill, category) for an exact phrase, if known"""
+        node = self._root
+        for token in tokenize(phrase):
+            node = node.get(token)
+            if node is None:
+                return None
+        return node.get(self._TERMINAL)
+
+    def find(self, tokens: List[str]) -> Dict[str, str]:
+        """Return {skill: category} for every exact hit in the token list"""
+        found: Dict[str, str] = {}
+        root = self._root
+        terminal = self._TERMINAL
+        for start in range(len(tokens)):
+            node = root.get(tokens[start])
+            position = start + 1
+            while node is not None:
+                hit = node.get(terminal)
+                if hit is not None:
+                    found[hit[0]] = hit[1]
+                if position >= len(tokens):
+                    break
+                node = node.get(tokens[position])
+                position += 1
+        return found
@@ -0,0 +1,383 @@
+import argparse
+import csv
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .fuzzy_index import FuzzySkillIndex, _grams
+from .skill_matcher import SkillMatcher, tokenize
+
+TECH = "tech"
+SOFT = "soft"
+CATEGORIES = (TECH, SOFT)
+
+# Artifact layout (little-endian, every table of 4-byte fields):
+#   header    magic, format version, skill count, term count, max phrase
+#             tokens, phrase slots, gram slots, posting count, 16-byte
+#             content digest
+#   skills    (name offset, name length, category index) per skill
+#   terms     (term offset, term length, skill index, term characters,
+#             trigram count) per term
+#   phrases   open-addressing hash table (crc32, linear probing) of every
+#             term and every proper prefix of a multi-word term: (key
+#             offset, key length or 0 when empty, skill index or -1,
+#             1 if a longer term starts with the key)
+#   grams     hash table of character trigrams: (key offset, key length or
+#             0 when empty, first posting, posting count)
+#   postings  term ids per trigram, ordered by term length, followed by
+#             the matching term lengths
+#   blob      UTF-8 strings referenced by the tables
+MAGIC = b"RRSK"
+FORMAT_VERSION = 2
+_HEADER = struct.Struct("<4sIIIIIII16s")
+_SKILL = struct.Struct("<III")
+_TERM = struct.Struct("<IIIII")
+_PHRASE = struct.Struct("<IIiI")
+_GRAM = struct.Struct("<IIII")
+_UINT = struct.Struct("<I")
+
+# Phrase probes remembered per process by SkillTaxonomy.find
+PHRASE_CACHE_SIZE = 65536
+_MISSING = object()
+
+
+def _normalize(term: str) -> str:
+    return " ".join(tokenize(term))
+
+
+def load_taxonomy_source(path: str) -> List[Dict]:
+    """Read a taxonomy from JSON or CSV into [{skill, category, aliases}]"""
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)
+    elif path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            entries = [
+                {
+                    "skill": row["skill"],
+                    "category": row["category"],
+                    "aliases": [a for a in (row.get("aliases") or "").split("|") if a]
+                }
+                for row in csv.DictReader(f)
+            ]
+    else:
+        raise ValueError(f"Unsupported taxonomy format: {path}")
+
+    for entry in entries:
+        if entry.get("category") not in CATEGORIES:
+            raise ValueError(
+                f"Skill {entry.get('skill')!r} has unknown category {entry.get('category')!r}"
+            )
+    return entries
+
+
+def _slot_count(keys: int) -> int:
+    """Power-of-two table size keeping the load factor at or below one half"""
+    slots = 1
+    while slots < keys * 2:
+        slots *= 2
+    return slots
+
+
+def _hash_table(entries: Dict[bytes, Tuple], intern, slot: struct.Struct) -> Tuple[int, bytes]:
+    """Pack {key: fields} into an open-addressing table of slot structs"""
+    slots = _slot_count(len(entries))
+    table: List[Optional[bytes]] = [None] * slots
+    for key, fields in entries.items():
+        position = zlib.crc32(key) & (slots - 1)
+        while table[position] is not None:
+            position = (position + 1) & (slots - 1)
+        table[position] = slot.pack(*intern(key), *fields)
+    empty = bytes(slot.size)
+    return slots, b"".join(entry or empty for entry in table)
+
+
+def compile_taxonomy(entries: List[Dict], output_path: str) -> str:
+    """Compile taxonomy entries into a binary artifact, replacing it atomically"""
+    skills: List[Tuple[str, int]] = []
+    skill_ids: Dict[str, int] = {}
+    terms: Dict[str, int] = {}
+    max_phrase_tokens = 0
+
+    for entry in entries:
+        name = entry["skill"].strip().lower()
+        if name not in skill_ids:
+            skill_ids[name] = len(skills)
+            skills.append((name, CATEGORIES.index(entry["category"])))
+        for term in [name] + list(entry.get("aliases") or []):
+            normalized = _normalize(term)
+            if normalized:
+                terms.setdefault(normalized, skill_ids[name])
+                max_phrase_tokens = max(max_phrase_tokens, len(normalized.split(" ")))
+
+    blob = bytearray()
+    offsets: Dict[bytes, Tuple[int, int]] = {}
+
+    def intern(value: bytes) -> Tuple[int, int]:
+        if value not in offsets:
+            offsets[value] = (len(blob), len(value))
+            blob.extend(value)
+        return offsets[value]
+
+    skill_table = bytearray()
+    for name, category in skills:
+        skill_table += _SKILL.pack(*intern(name.encode("utf-8")), category)
+
+    term_list = sorted(terms, key=lambda t: t.encode("utf-8"))
+    term_table = bytearray()
+    phrases: Dict[bytes, List[int]] = {}
+    postings: Dict[bytes, List[int]] = defaultdict(list)
+    for term_id, term in enumerate(term_list):
+        grams = _grams(term)
+        term_table += _TERM.pack(
+            *intern(term.encode("utf-8")), terms[term], len(term), len(grams)
+        )
+        tokens = term.split(" ")
+        for length in range(1, len(tokens)):
+            prefix = phrases.setdefault(" ".join(tokens[:length]).encode("utf-8"), [-1, 0])
+            prefix[1] = 1
+        phrases.setdefault(term.encode("utf-8"), [-1, 0])[0] = terms[term]
+        for gram in grams:
+            postings[gram.encode("utf-8")].append(term_id)
+
+    phrase_slots, phrase_table = _hash_table(phrases, intern, _PHRASE)
+
+    posting_ids: List[int] = []
+    gram_entries: Dict[bytes, Tuple[int, int]] = {}
+    for gram, term_ids in postings.items():
+        # Ordered by length, so a lookup can bisect to the compatible terms
+        term_ids.sort(key=lambda term_id: len(term_list[term_id]))
+        gram_entries[gram] = (len(posting_ids), len(term_ids))
+        posting_ids.extend(term_ids)
+    gram_slots, gram_table = _hash_table(gram_entries, intern, _GRAM)
+    posting_lengths = [len(term_list[term_id]) for term_id in posting_ids]
+    posting_table = struct.pack(f"<{2 * len(posting_ids)}I", *posting_ids, *posting_lengths)
+
+    body = bytes(skill_table + term_table + phrase_table + gram_table + posting_table + blob)
+    digest = hashlib.sha256(body).digest()[:16]
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(skills), len(terms), max_phrase_tokens,
+                          phrase_slots, gram_slots, len(posting_ids), digest)
+
+    directory = os.path.dirname(os.path.abspath(output_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(body)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return digest.hex()
+
+
+class SkillTaxonomy:
+    """Read-only view of a compiled taxonomy artifact.
+
+    The file is memory-mapped, so every worker process shares the same page
+    cache instead of holding its own copy. Exact matching walks the phrase
+    hash table, one probe per token, and fuzzy matching reads the trigram
+    postings in place.
+    """
+
+    def __init__(self, path: str):
+        if sys.byteorder != "little":
+            raise ValueError("Compiled skill taxonomies can only be read on little-endian hosts")
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self._skill_count, self._term_count, self.max_phrase_tokens, \
+            self._phrase_slots, self._gram_slots, posting_count, digest = \
+            _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a compiled skill taxonomy (format {FORMAT_VERSION})")
+
+        self.version = digest.hex()
+        self._skills_start = _HEADER.size
+        self._terms_start = self._skills_start + self._skill_count * _SKILL.size
+        self._phrases_start = self._terms_start + self._term_count * _TERM.size
+        self._grams_start = self._phrases_start + self._phrase_slots * _PHRASE.size
+        postings_start = self._grams_start + self._gram_slots * _GRAM.size
+        self._blob_start = postings_start + 2 * posting_count * _UINT.size
+
+        self._phrase_cache: Dict[bytes, Optional[Tuple]] = {}
+        view = memoryview(self._map)
+        self._term_fields = view[self._terms_start:self._phrases_start].cast("I")
+        self._posting_ids = view[postings_start:postings_start + posting_count * 4].cast("I")
+        self._posting_lengths = view[
+            postings_start + posting_count * 4:self._blob_start
+        ].cast("I")
+
+    def __len__(self) -> int:
+        return self._skill_count
+
+    @property
+    def term_count(self) -> int:
+        return self._term_count
+
+    def _string(self, offset: int, length: int) -> bytes:
+        start = self._blob_start + offset
+        return self._map[start:start + length]
+
+    def _skill(self, skill_id: int) -> Tuple[str, str]:
+        offset, length, category = _SKILL.unpack_from(
+            self._map, self._skills_start + skill_id * _SKILL.size
+        )
+        return self._string(offset, length).decode("utf-8"), CATEGORIES[category]
+
+    def _term(self, term_id: int) -> Tuple[str, int]:
+        """(term, skill index)"""
+        offset, length, skill_id, _, _ = _TERM.unpack_from(
+            self._map, self._terms_start + term_id * _TERM.size
+        )
+        return self._string(offset, length).decode("utf-8"), skill_id
+
+    def term_shape(self, term_id: int) -> Tuple[int, int]:
+        """Characters and trigram count of a term"""
+        fields = self._term_fields
+        base = term_id * 5
+        return fields[base + 3], fields[base + 4]
+
+    def _probe(self, start: int, slots: int, slot: struct.Struct, key: bytes) -> Optional[Tuple]:
+        mask = slots - 1
+        position = zlib.crc32(key) & mask
+        while True:
+            entry = slot.unpack_from(self._map, start + position * slot.size)
+            if entry[1] == 0:
+                return None
+            if entry[1] == len(key) and self._string(entry[0], entry[1]) == key:
+                return entry
+            position = (position + 1) & mask
+
+    def gram_postings(self, gram: str) -> Optional[Tuple[Sequence[int], Sequence[int]]]:
+        """Term ids containing a trigram and their lengths, ordered by length"""
+        entry = self._probe(self._grams_start, self._gram_slots, _GRAM, gram.encode("utf-8"))
+        if entry is None:
+            return None
+        start, count = entry[2], entry[3]
+        return self._posting_ids[start:start + count], self._posting_lengths[start:start + count]
+
+    def lookup(self, phrase: str) -> Optional[Tuple[str, str]]:
+        """Return (canonical skill, category) for a skill name or alias"""
+        entry = self._phrase(_normalize(phrase).encode("utf-8"))
+        return entry[0] if entry is not None else None
+
+    def _phrase(self, key: bytes) -> Optional[Tuple[Optional[Tuple[str, str]], bool]]:
+        """(skill and category or None, whether a longer term starts here) for a key"""
+        entry = self._probe(self._phrases_start, self._phrase_slots, _PHRASE, key)
+        if entry is None:
+            return None
+        return (self._skill(entry[2]) if entry[2] >= 0 else None), bool(entry[3])
+
+    def find(self, tokens: List[str]) -> Dict[str, str]:
+        """Return {canonical skill: category} for every exact hit in tokens"""
+        found: Dict[str, str] = {}
+        # Probes are remembered per process: documents repeat their words,
+        # and most words are not skills at all
+        cache = self._phrase_cache
+        for start in range(len(tokens)):
+            key = tokens[start].encode("utf-8")
+            position = start + 1
+            while True:
+                phrase = cache.get(key, _MISSING)
+                if phrase is _MISSING:
+                    if len(cache) >= PHRASE_CACHE_SIZE:
+                        cache.clear()
+                    phrase = cache[key] = self._phrase(key)
+                if phrase is None:
+                    break
+                hit, has_longer = phrase
+                if hit is not None:
+                    found[hit[0]] = hit[1]
+                if not has_longer or position >= len(tokens):
+                    break
+                key += b" " + tokens[position].encode("utf-8")
+                position += 1
+        return found
+
+    def iter_terms(self) -> Iterator[Tuple[str, str, str]]:
+        """Yield (term, canonical skill, category) for every term"""
+        for term_id in range(self._term_count):
+            term, skill_id = self._term(term_id)
+            skill, category = self._skill(skill_id)
+            yield term, skill, category
+
+    def skills(self, category: str) -> List[str]:
+        """Return the canonical skills of a category"""
+        return [
+            name for name, skill_category in
+            (self._skill(skill_id) for skill_id in range(self._skill_count))
+            if skill_category == category
+        ]
+
+
+class MappedFuzzyIndex(FuzzySkillIndex):
+    """FuzzySkillIndex reading its trigram postings from a SkillTaxonomy"""
+
+    def __init__(self, taxonomy: SkillTaxonomy, threshold: int = 85, cache_size: int = 65536):
+        super().__init__((), threshold, cache_size)
+        self.taxonomy = taxonomy
+
+    def __len__(self) -> int:
+        return self.taxonomy.term_count
+
+    def _posting(self, gram):
+        return self.taxonomy.gram_postings(gram)
+
+    def _term_shape(self, term_id):
+        return self.taxonomy.term_shape(term_id)
+
+    def _term(self, term_id):
+        return self.taxonomy._term(term_id)[0]
+
+    def _skill(self, term_id):
+        return self.taxonomy._skill(self.taxonomy._term(term_id)[1])
+
+
+class SkillIndex:
+    """Everything skill extraction needs, swapped as a single reference"""
+
+    def __init__(self, matcher, tech_skills: List[str], soft_skills: List[str],
+                 version: str, fuzzy_index: Optional[FuzzySkillIndex] = None):
+        self.matcher = matcher
+        self.tech_skills = tech_skills
+        self.soft_skills = soft_skills
+        self.version = version
+        self.fuzzy_index = fuzzy_index or FuzzySkillIndex(matcher.iter_terms())
+
+    @classmethod
+    def from_skill_lists(cls, tech_skills: List[str], soft_skills: List[str]) -> "SkillIndex":
+        matcher = SkillMatcher.from_skill_lists({TECH: tech_skills, SOFT: soft_skills})
+        digest = hashlib.sha256(
+            "\n".join(tech_skills + ["--"] + soft_skills).encode("utf-8")
+        ).hexdigest()[:32]
+        return cls(matcher, tech_skills, soft_skills, digest)
+
+    @classmethod
+    def from_taxonomy(cls, path: str) -> "SkillIndex":
+        taxonomy = SkillTaxonomy(path)
+        return cls(taxonomy, taxonomy.skills(TECH), taxonomy.skills(SOFT),
+                   taxonomy.version, MappedFuzzyIndex(taxonomy))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Compile a skill taxonomy")
+    parser.add_argument("source", help="Taxonomy JSON or CSV file")
+    parser.add_argument("output", help="Path of the compiled artifact")
+    args = parser.parse_args(argv)
+
+    version = compile_taxonomy(load_taxonomy_source(args.source), args.output)
+    print(f"Compiled {args.source} -> {args.output} (version {version})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+import asyncio
+import codecs
+import hashlib
+from collections import Counter
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from app.utils.document import TOKEN_PATTERN, split_words
+from .skill_taxonomy import SkillIndex, TECH, SOFT
+from .tfidf_model import TfidfModel, build_vectorizer
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Matches build_vectorizer(): terms of at least two word characters
+MIN_TERM_LENGTH = 2
+MAX_FEATURES = 1000
+
+# Text without whitespace is cut here, so one huge "word" cannot grow the buffer
+MAX_CARRY_CHARS = 4096
+
+
+class StreamTooLarge(ValueError):
+    """A streamed document went past the configured length limit"""
+
+
+class IncrementalTokenizer:
+    """Splits text arriving in chunks into the same tokens as tokenize().
+
+    Tokens never contain whitespace, so everything up to the last
+    whitespace character of the buffer can be tokenized; only the tail
+    after it is carried into the next chunk.
+    """
+
+    def __init__(self):
+        self._carry = ""
+
+    def feed(self, chunk: str) -> List[str]:
+        text = self._carry + chunk.lower()
+        split = max(text.rfind(" "), text.rfind("\n"), text.rfind("\t"), text.rfind("\r"))
+        if split < 0 and len(text) > MAX_CARRY_CHARS:
+            split = len(text) - MAX_CARRY_CHARS // 2
+        self._carry = text[split + 1:]
+        return TOKEN_PATTERN.findall(text, 0, split + 1)
+
+    def close(self) -> List[str]:
+        tokens = TOKEN_PATTERN.findall(self._carry)
+        self._carry = ""
+        return tokens
+
+
+class StreamingSkillMatcher:
+    """Exact and fuzzy skill matching over a token stream.
+
+    Only the last max_phrase_tokens - 1 tokens are kept between chunks, so
+    multi-word skills split across a chunk boundary are still found.
+    """
+
+    def __init__(self, skill_index: SkillIndex):
+        self.skill_index = skill_index
+        self.overlap = max(0, getattr(skill_index.matcher, "max_phrase_tokens", 1) - 1)
+        self._tail: List[str] = []
+        self.found: Dict[str, Set[str]] = {TECH: set(), SOFT: set()}
+
+    def feed(self, tokens: List[str]):
+        if not tokens:
+            return
+        window = self._tail + tokens
+        for skill, category in self.skill_index.matcher.find(window).items():
+            self.found[category].add(skill)
+        for skill, category in self.skill_index.fuzzy_index.match_categories(tokens).items():
+            self.found[category].add(skill)
+        self._tail = window[len(window) - self.overlap:] if self.overlap else []
+
+    @property
+    def skills(self) -> Tuple[List[str], List[str]]:
+        return list(self.found[TECH]), list(self.found[SOFT])
+
+
+class TermFrequencyAccumulator:
+    """Running unigram and bigram counts, analysed like build_vectorizer().
+
+    With a vocabulary only its terms are counted, so memory is bounded by
+    the model; without one, new terms stop being added after max_terms.
+    """
+
+    def __init__(self, stop_words: FrozenSet[str], vocabulary: Optional[Dict[str, int]] = None,
+                 max_terms: int = 100000):
+        self.stop_words = stop_words
+        self.vocabulary = vocabulary
+        self.max_terms = max_terms
+        self.counts: Counter = Counter()
+        self._previous: Optional[str] = None
+
+    def _add(self, term: str):
+        counts = self.counts
+        if self.vocabulary is not None:
+            if term in self.vocabulary:
+                counts[term] += 1
+        elif term in counts or len(counts) < self.max_terms:
+            counts[term] += 1
+
+    def feed(self, tokens: List[str]):
+        previous = self._previous
+        for word in split_words(tokens):
+            if len(word) < MIN_TERM_LENGTH or word in self.stop_words:
+                continue
+            self._add(word)
+            if previous is not None:
+                self._add(f"{previous} {word}")
+            previous = word
+        self._previous = previous
+
+
+class _StreamingKey:
+    """document_key() computed over chunks of text"""
+
+    def __init__(self):
+        self._hash = hashlib.sha256()
+        self._started = False
+        self._in_word = False
+
+    def feed(self, chunk: str):
+        words = chunk.lower().split()
+        if not words:
+            if chunk:
+                self._in_word = False
+            return
+        for i, word in enumerate(words):
+            if i == 0 and self._in_word and not chunk[0].isspace():
+                self._hash.update(word.encode("utf-8"))
+                continue
+            if self._started:
+                self._hash.update(b" ")
+            self._hash.update(word.encode("utf-8"))
+            self._started = True
+        self._in_word = not chunk[-1].isspace()
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+class StreamingDocument:
+    """One document analysed as its bytes arrive, in memory independent of its length"""
+
+    def __init__(self, skill_index: SkillIndex, stop_words: FrozenSet[str],
+                 vocabulary: Optional[Dict[str, int]], max_chars: int, keep_chars: int = 1000):
+        self.max_chars = max_chars
+        self.keep_chars = keep_chars
+        self.characters = 0
+        self.head = ""
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._tokenizer = IncrementalTokenizer()
+        self._key = _StreamingKey()
+        self.skills = StreamingSkillMatcher(skill_index)
+        self.terms = TermFrequencyAccumulator(stop_words, vocabulary)
+
+    def _feed_text(self, text: str):
+        self.characters += len(text)
+        if self.characters > self.max_chars:
+            raise StreamTooLarge(f"Document is longer than {self.max_chars} characters")
+        if len(self.head) < self.keep_chars:
+            self.head += text[:self.keep_chars - len(self.head)]
+        self._key.feed(text)
+        tokens = self._tokenizer.feed(text)
+        self.skills.feed(tokens)
+        self.terms.feed(tokens)
+
+    def feed(self, data: bytes):
+        text = self._decoder.decode(data)
+        if text:
+            self._feed_text(text)
+
+    def close(self):
+        text = self._decoder.decode(b"", final=True)
+        if text:
+            self._feed_text(text)
+        tokens = self._tokenizer.close()
+        self.skills.feed(tokens)
+        self.terms.feed(tokens)
+
+    @property
+    def key(self) -> str:
+        """document_key of the full text"""
+        return self._key.hexdigest()
+
+
+def streaming_analyzer(tfidf_model: Optional[TfidfModel]) -> Tuple[FrozenSet[str], Optional[Dict[str, int]]]:
+    """Stop words and (for a pre-fitted model) the vocabulary to count terms with"""
+    vectorizer = tfidf_model.vectorizer if tfidf_model is not None else build_vectorizer()
+    vocabulary = tfidf_model.vectorizer.vocabulary_ if tfidf_model is not None else None
+    return frozenset(vectorizer.get_stop_words() or ()), vocabulary
+
+
+def streaming_similarity(left: TermFrequencyAccumulator, right: TermFrequencyAccumulator,
+                         tfidf_model: Optional[TfidfModel]) -> Tuple[float, Dict]:
+    """Cosine similarity of two accumulated documents, as the TF-IDF scorer computes it"""
+    import numpy as np
+
+    if tfidf_model is not None:
+        vocabulary = tfidf_model.vectorizer.vocabulary_
+        idf = tfidf_model.vectorizer.idf_
+        terms = sorted(set(left.counts) | set(right.counts))
+        columns = [vocabulary[term] for term in terms]
+        weights = idf[columns]
+        details = {"method": "tfidf_prefit", "model_version": tfidf_model.version}
+    else:
+        # The ad-hoc vectorizer keeps the max_features most frequent terms of
+        # the two documents and weighs them with smoothed IDF over n = 2
+        totals = left.counts + right.counts
+        terms = [term for term, _ in sorted(totals.items(), key=lambda item: (-item[1], item[0]))]
+        terms = terms[:MAX_FEATURES]
+        document_frequency = np.array(
+            [(term in left.counts) + (term in right.counts) for term in terms], dtype=float
+        )
+        weights = np.log(3 / (1 + document_frequency)) + 1
+        details = {"method": "tfidf"}
+
+    if not terms:
+        return 0.0, details
+    vectors = []
+    for accumulator in (left, right):
+        vector = np.array([accumulator.counts.get(term, 0) for term in terms], dtype=float) * weights
+        norm = np.linalg.norm(vector)
+        vectors.append(vector / norm if norm else vector)
+    return float(vectors[0] @ vectors[1]), details
+
+
+async def read_multipart(chunks: AsyncIterator[bytes], content_type: str,
+                         documents: Dict[str, Any]) -> Set[str]:
+    """Feed each part of a multipart/form-data body to the document named after it.
+
+    A document is anything with feed(bytes) and close(), such as a
+    StreamingDocument; parts with other names are skipped. Each chunk is parsed in a worker
+    thread, so analysing a large upload does not block the event loop.
+    Returns the names of the parts that were received.
+    """
+    from python_multipart.multipart import MultipartParser, parse_options_header
+
+    media_type, options = parse_options_header(content_type)
+    boundary = options.get(b"boundary")
+    if media_type != b"multipart/form-data" or not boundary:
+        raise ValueError("Expected a multipart/form-data body")
+
+    part: Dict[str, object] = {"headers": {}, "field": b"", "value": b"", "document": None}
+    received: Set[str] = set()
+
+    def on_part_begin():
+        part.update(headers={}, field=b"", value=b"", document=None)
+
+    def on_header_field(data: bytes, start: int, end: int):
+        part["field"] += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int):
+        part["value"] += data[start:end]
+
+    def on_header_end():
+        part["headers"][part["field"].lower()] = part["value"]
+        part.update(field=b"", value=b"")
+
+    def on_headers_finished():
+        _, params = parse_options_header(part["headers"].get(b"content-disposition", b""))
+        name = params.get(b"name", b"").decode("utf-8", "replace")
+        if name in documents:
+            if name in received:
+                raise ValueError(f"Part {name!r} was sent more than once")
+            received.add(name)
+            part["document"] = documents[name]
+
+    def on_part_data(data: bytes, start: int, end: int):
+        if part["document"] is not None:
+            part["document"].feed(data[start:end])
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data
+    })
+    async for chunk in chunks:
+        if chunk:
+            await asyncio.to_thread(parser.write, chunk)
+    parser.finalize()
+
+    for name in received:
+        documents[name].close()
+    return received
@@ -0,0 +1,170 @@
+import argparse
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+logger = logging.getLogger(__name__)
+
+
+def preprocess_text(text: str) -> str:
+    text = re.sub(r'[^\w\s]', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.lower().strip()
+
+
+def build_vectorizer() -> "TfidfVectorizer":
+    """Return an unfitted vectorizer with the scoring configuration"""
+    # Imported on first use; sklearn dominates the API's import time
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    
+    return TfidfVectorizer(
+        max_features=1000,
+        stop_words='english',
+        ngram_range=(1, 2)
+    )
+
+
+def save_model_file(path: str, data: Dict[str, Any]):
+    """joblib-dump data to path, replacing any existing file atomically"""
+    import joblib
+    
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(fd)
+    try:
+        joblib.dump(data, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class TfidfModel:
+    """A vectorizer fitted once on a corpus; requests only call transform"""
+
+    def __init__(self, vectorizer: "TfidfVectorizer", version: str,
+                 document_count: int, fitted_at: str):
+        self.vectorizer = vectorizer
+        self.version = version
+        self.document_count = document_count
+        self.fitted_at = fitted_at
+
+    @classmethod
+    def fit(cls, documents: Iterable[str]) -> "TfidfModel":
+        processed = [preprocess_text(doc) for doc in documents if doc and doc.strip()]
+        if not processed:
+            raise ValueError("Cannot fit TF-IDF model on an empty corpus")
+
+        vectorizer = build_vectorizer()
+        vectorizer.fit(processed)
+
+        digest = hashlib.sha256()
+        for term in sorted(vectorizer.vocabulary_):
+            digest.update(term.encode("utf-8"))
+        digest.update(vectorizer.idf_.tobytes())
+
+        return cls(
+            vectorizer,
+            version=digest.hexdigest()[:16],
+            document_count=len(processed),
+            fitted_at=datetime.now(timezone.utc).isoformat()
+        )
+
+    def transform(self, texts: List[str]):
+        """Vectorize already preprocessed texts"""
+        return self.vectorizer.transform(texts)
+
+    def save(self, path: str):
+        """Persist the model, replacing any existing file atomically"""
+        save_model_file(path, {
+            "vectorizer": self.vectorizer,
+            "version": self.version,
+            "document_count": self.document_count,
+            "fitted_at": self.fitted_at
+        })
+
+    @classmethod
+    def load(cls, path: str) -> "TfidfModel":
+        import joblib
+        
+        data = joblib.load(path)
+        return cls(
+            data["vectorizer"],
+            version=data["version"],
+            document_count=data["document_count"],
+            fitted_at=data["fitted_at"]
+        )
+
+
+def load_seed_corpus(path: str) -> List[str]:
+    """Read seed documents from a directory of .txt files or a file of
+    documents separated by blank lines"""
+    if os.path.isdir(path):
+        documents = []
+        for name in sorted(os.listdir(path)):
+            if name.endswith(".txt"):
+                with open(os.path.join(path, name), encoding="utf-8") as f:
+                    documents.append(f.read())
+        return documents
+
+    with open(path, encoding="utf-8") as f:
+        return [doc for doc in re.split(r'\n\s*\n', f.read()) if doc.strip()]
+
+
+def load_stored_job_descriptions() -> List[str]:
+    """Return the distinct job descriptions saved in comparison history"""
+    from database import SessionLocal, ComparisonHistory
+
+    db = SessionLocal()
+    try:
+        rows = db.query(ComparisonHistory.job_description).distinct().all()
+        return [row[0] for row in rows]
+    finally:
+        db.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Fit a similarity model on a seed corpus")
+    parser.add_argument("output", help="Where to write the fitted model")
+    parser.add_argument("--model", choices=("tfidf", "lsa"), default="tfidf",
+                        help="Which model to fit")
+    parser.add_argument("--seed", action="append", default=[],
+                        help="Seed corpus file or directory (repeatable)")
+    parser.add_argument("--no-db", action="store_true",
+                        help="Do not include stored job descriptions")
+    parser.add_argument("--components", type=int, default=100,
+                        help="Dimensions of the LSA projection")
+    args = parser.parse_args(argv)
+
+    documents: List[str] = []
+    for seed in args.seed:
+        documents.extend(load_seed_corpus(seed))
+    if not args.no_db:
+        documents.extend(load_stored_job_descriptions())
+
+    if args.model == "lsa":
+        from .scorers import LsaModel
+
+        model = LsaModel.fit(documents, args.components)
+        model.save(args.output)
+        print(
+            f"Fitted LSA model {model.version} with {model.components.shape[0]} components "
+            f"on {model.document_count} documents -> {args.output}"
+        )
+        return
+
+    model = TfidfModel.fit(documents)
+    model.save(args.output)
+    print(f"Fitted TF-IDF model {model.version} on {model.document_count} documents -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
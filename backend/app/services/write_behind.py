@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, insert, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from database import ComparisonHistory
+from .analytics import apply_rollups, load_previous, updated_rows
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class IdAllocator:
+    """Hands out comparison_history ids before their rows are written.
+
+    PostgreSQL draws them from the table's own sequence, so they never
+    collide with rows inserted elsewhere. Other databases fall back to an
+    in-process counter seeded from MAX(id), which is only safe with a
+    single writer process (local development and tests).
+    """
+
+    def __init__(self, session_factory: async_sessionmaker):
+        self.session_factory = session_factory
+        self._next_id: Optional[int] = None
+        self._lock = asyncio.Lock()
+
+    async def allocate(self, count: int) -> List[int]:
+        if count == 0:
+            return []
+        async with self.session_factory() as session:
+            if session.bind.dialect.name == "postgresql":
+                rows = await session.execute(
+                    text(
+                        "SELECT nextval(pg_get_serial_sequence('comparison_history', 'id')) "
+                        "FROM generate_series(1, :count)"
+                    ),
+                    {"count": count}
+                )
+                return [row[0] for row in rows]
+
+            async with self._lock:
+                if self._next_id is None:
+                    max_id = await session.scalar(select(func.max(ComparisonHistory.id)))
+                    self._next_id = (max_id or 0) + 1
+                start = self._next_id
+                self._next_id += count
+                return list(range(start, start + count))
+
+
+class WriteBehindQueue:
+    """Background writer that batches comparison_history writes.
+
+    Rows are flushed in bulk once max_rows are waiting or flush_interval_ms
+    has passed since the first of them arrived. Rows stay visible through
+    pending() until they are committed, and stop() drains the queue.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, max_rows: int = 100,
+                 flush_interval_ms: int = 50, max_queue: int = 10000):
+        self.session_factory = session_factory
+        self.max_rows = max_rows
+        self.flush_interval = flush_interval_ms / 1000
+        self.id_allocator = IdAllocator(session_factory)
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        # Rows accepted but not yet committed, including the batch being built
+        self._unwritten = 0
+
+        self.flushes = 0
+        self.rows_written = 0
+        self.failed_rows = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush everything still queued and stop the writer"""
+        if self._task is not None:
+            await self._queue.put(_STOP)
+            await self._task
+            self._task = None
+
+    async def allocate_ids(self, count: int) -> List[int]:
+        return await self.id_allocator.allocate(count)
+
+    def pending(self, pair_hash: str) -> Optional[Dict[str, Any]]:
+        """Return a queued row that has not been written yet"""
+        return self._pending.get(pair_hash)
+
+    async def enqueue(self, inserts: List[Dict[str, Any]], updates: List[Dict[str, Any]]):
+        """Queue new rows (with pre-allocated ids) and updates by primary key"""
+        for row in inserts:
+            if row.get("pair_hash"):
+                self._pending[row["pair_hash"]] = row
+            self._unwritten += 1
+            await self._queue.put(("insert", row))
+        for row in updates:
+            self._unwritten += 1
+            await self._queue.put(("update", row))
+
+    async def _next_batch(self) -> Tuple[List[Tuple[str, Dict[str, Any]]], bool]:
+        item = await self._queue.get()
+        if item is _STOP:
+            return [], True
+
+        loop = asyncio.get_running_loop()
+        batch = [item]
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.max_rows:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._next_batch()
+            if batch:
+                await self._flush(batch)
+        # Drain anything enqueued after the stop request
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                await self._flush([item])
+
+    async def _write(self, session: AsyncSession, batch: List[Tuple[str, Dict[str, Any]]]):
+        inserts = [row for kind, row in batch if kind == "insert"]
+        updates = [row for kind, row in batch if kind == "update"]
+        if inserts:
+            await session.execute(insert(ComparisonHistory), inserts)
+        previous = await load_previous(session, [row["id"] for row in updates])
+        if updates:
+            await session.execute(update(ComparisonHistory), updates)
+        
+        added, removed = updated_rows(updates, previous)
+        await apply_rollups(session, inserts + added, removed)
+
+    async def _flush(self, batch: List[Tuple[str, Dict[str, Any]]]):
+        started = time.perf_counter()
+        async with self.session_factory() as session:
+            try:
+                await self._write(session, batch)
+                await session.commit()
+                self.rows_written += len(batch)
+            except Exception as e:
+                await session.rollback()
+                logger.warning(f"Bulk write of {len(batch)} rows failed, retrying row by row: {e}")
+                for item in batch:
+                    try:
+                        await self._write(session, [item])
+                        await session.commit()
+                        self.rows_written += 1
+                    except Exception as row_error:
+                        await session.rollback()
+                        self.failed_rows += 1
+                        logger.error(f"Dropping comparison {item[1].get('id')}: {row_error}")
+
+        for kind, row in batch:
+            if kind == "insert" and self._pending.get(row.get("pair_hash")) is row:
+                del self._pending[row["pair_hash"]]
+
+        self._unwritten -= len(batch)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.flushes += 1
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self._total_flush_ms += elapsed_ms
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": self._unwritten,
+            "pending_rows": len(self._pending),
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "failed_rows": self.failed_rows,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "max_flush_ms": round(self.max_flush_ms, 3),
+            "avg_flush_ms": round(self._total_flush_ms / self.flushes, 3) if self.flushes else 0.0
+        }
@@ -1,3 +1,3 @@
 from .text_utils import validate_text_input, sanitize_text, extract_contact_info
 
-__all__ = ["validate_text_input", "sanitize_text", "extract_contact_info"]
\ No newline at end of file
+__all__ = ["validate_text_input", "sanitize_text", "extract_contact_info"]
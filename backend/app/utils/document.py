@@ -0,0 +1,101 @@
+import re
+from array import array
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# Tokens keep the symbols that are part of skill names ("c++", "c#", "node.js")
+# but never a trailing sentence dot, so "Python." still yields "python".
+TOKEN_PATTERN = re.compile(r"\w+(?:[.+#]\w+)*[+#]*")
+
+# Splits a token into its plain word runs ("node.js" -> "node", "js")
+_SYMBOLS = re.compile(r"[.+#]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase skill tokens"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def split_words(tokens: Iterable[str]) -> List[str]:
+    """Runs of word characters in tokens, the units preprocess_text keeps"""
+    words = []
+    for token in tokens:
+        if token.isalnum():
+            words.append(token)
+        else:
+            words.extend(word for word in _SYMBOLS.split(token) if word)
+    return words
+
+
+class AnalyzedDocument:
+    """A text tokenized once, for every stage that needs to read it.
+
+    Tokens come from a single regex pass over the lowercased text, and
+    offsets are (start, end) spans into normalized_text. The plain words,
+    the preprocessed text used for TF-IDF and the n-gram counts are all
+    derived from the tokens on first use.
+    """
+
+    __slots__ = ("text", "normalized_text", "tokens", "_spans", "_token_set",
+                 "_words", "_ngram_counts")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.normalized_text = text.lower()
+        self.tokens: List[str] = []
+        # Flat start/end pairs; far smaller than a list of tuples
+        self._spans = array("l")
+        for match in TOKEN_PATTERN.finditer(self.normalized_text):
+            self.tokens.append(match.group())
+            self._spans.extend(match.span())
+        self._token_set: Optional[FrozenSet[str]] = None
+        self._words: Optional[List[str]] = None
+        self._ngram_counts: Dict[int, Counter] = {}
+
+    @property
+    def offsets(self) -> List[Tuple[int, int]]:
+        spans = self._spans
+        return list(zip(spans[0::2], spans[1::2]))
+
+    @property
+    def token_set(self) -> FrozenSet[str]:
+        if self._token_set is None:
+            self._token_set = frozenset(self.tokens)
+        return self._token_set
+
+    @property
+    def words(self) -> List[str]:
+        """Runs of word characters, the units preprocess_text keeps"""
+        if self._words is None:
+            self._words = split_words(self.tokens)
+        return self._words
+
+    @property
+    def processed_text(self) -> str:
+        """Same result as tfidf_model.preprocess_text, without re-scanning the text"""
+        return " ".join(self.words)
+
+    def ngrams(self, n: int) -> List[str]:
+        """Space-joined runs of n consecutive tokens"""
+        tokens = self.tokens
+        if n == 1:
+            return list(tokens)
+        return [" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1)]
+
+    def ngram_counts(self, n: int) -> Counter:
+        counts = self._ngram_counts.get(n)
+        if counts is None:
+            counts = self._ngram_counts[n] = Counter(self.ngrams(n))
+        return counts
+
+    def count_phrase(self, phrase: str) -> int:
+        """Whole-token occurrences of phrase, which is tokenized the same way"""
+        phrase_tokens = tokenize(phrase)
+        if not phrase_tokens:
+            return 0
+        return self.ngram_counts(len(phrase_tokens))[" ".join(phrase_tokens)]
+
+
+def as_document(text) -> AnalyzedDocument:
+    """Accept either raw text or an already analyzed document"""
+    return text if isinstance(text, AnalyzedDocument) else AnalyzedDocument(text)
@@ -0,0 +1,170 @@
+import asyncio
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# The ProfileRun of the request being profiled; scoring calls it on a worker thread
+active_profile: ContextVar[Optional["ProfileRun"]] = ContextVar("active_profile", default=None)
+
+_PROFILE_ID = re.compile(r"^[0-9]{8}T[0-9]{12}-[0-9a-f]{8}$")
+
+
+class ProfileStore:
+    """Bounded ring of profiles on disk: <id>.prof stats plus <id>.json metadata"""
+
+    def __init__(self, directory: str, max_profiles: int = 50):
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+
+    def _path(self, profile_id: str, suffix: str) -> str:
+        if not _PROFILE_ID.match(profile_id):
+            raise KeyError(profile_id)
+        return os.path.join(self.directory, f"{profile_id}{suffix}")
+
+    def save(self, profiler: cProfile.Profile, metadata: Dict[str, Any]) -> str:
+        now = datetime.now(timezone.utc)
+        profile_id = f"{now.strftime('%Y%m%dT%H%M%S%f')}-{uuid.uuid4().hex[:8]}"
+        metadata = {"id": profile_id, "created_at": now.isoformat(), **metadata}
+
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            profiler.dump_stats(self._path(profile_id, ".prof"))
+            with open(self._path(profile_id, ".json"), "w", encoding="utf-8") as f:
+                json.dump(metadata, f)
+            self._trim()
+        return profile_id
+
+    def _ids(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        # Ids start with their timestamp, so name order is age order
+        return sorted(
+            name[:-5] for name in os.listdir(self.directory)
+            if name.endswith(".json") and _PROFILE_ID.match(name[:-5])
+        )
+
+    def _trim(self):
+        ids = self._ids()
+        for profile_id in ids[:max(0, len(ids) - self.max_profiles)]:
+            for suffix in (".prof", ".json"):
+                try:
+                    os.remove(self._path(profile_id, suffix))
+                except FileNotFoundError:
+                    pass
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Metadata of the stored profiles, newest first"""
+        profiles = []
+        for profile_id in reversed(self._ids()):
+            try:
+                with open(self._path(profile_id, ".json"), encoding="utf-8") as f:
+                    profiles.append(json.load(f))
+            except (FileNotFoundError, ValueError):
+                continue
+        return profiles
+
+    def stats_path(self, profile_id: str) -> str:
+        path = self._path(profile_id, ".prof")
+        if not os.path.exists(path):
+            raise KeyError(profile_id)
+        return path
+
+    def summary(self, profile_id: str, limit: int = 40) -> str:
+        """Top functions by cumulative time, as pstats prints them"""
+        output = io.StringIO()
+        stats = pstats.Stats(self.stats_path(profile_id), stream=output)
+        stats.sort_stats("cumulative").print_stats(limit)
+        return output.getvalue()
+
+
+class ProfileRun:
+    """One request's profiling decision; profile_id is set once a profile is kept"""
+
+    def __init__(self, profiler: "RequestProfiler", forced: bool, sampled: bool,
+                 metadata: Dict[str, Any]):
+        self.owner = profiler
+        self.forced = forced
+        self.active = forced or sampled
+        self.metadata = metadata
+        self.profile_id: Optional[str] = None
+        self._profiler: Optional[cProfile.Profile] = None
+        self._profiled = False
+        self._token = None
+        self._started = 0.0
+
+    async def __aenter__(self) -> "ProfileRun":
+        # Only one cProfile can run at a time; skip rather than wait
+        if self.active and self.owner._running.acquire(blocking=False):
+            self._profiler = cProfile.Profile()
+            self._token = active_profile.set(self)
+        self._started = time.perf_counter()
+        return self
+
+    def call(self, fn: Callable[..., Any], *args) -> Any:
+        """Run fn(*args) with the profiler enabled on the calling thread only.
+
+        Called from a worker thread, so the event loop keeps serving other
+        requests and they stay out of the profile.
+        """
+        self._profiler.enable()
+        try:
+            return fn(*args)
+        finally:
+            self._profiler.disable()
+            self._profiled = True
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        duration_ms = (time.perf_counter() - self._started) * 1000
+        if self._profiler is None:
+            return False
+
+        active_profile.reset(self._token)
+        self.owner._running.release()
+
+        # Nothing was profiled when the request needed no scoring
+        if self._profiled and (self.forced or duration_ms >= self.owner.threshold_ms):
+            # Dumping the stats is file I/O, so it stays off the event loop
+            try:
+                self.profile_id = await asyncio.to_thread(self.owner.store.save, self._profiler, {
+                    **self.metadata,
+                    "reason": "requested" if self.forced else "sampled",
+                    "duration_ms": round(duration_ms, 3),
+                    "error": repr(exc) if exc is not None else None
+                })
+            except OSError as e:
+                logger.warning(f"Could not save profile: {e}")
+        return False
+
+
+class RequestProfiler:
+    """Profiles requests on demand, and a sample of the rest.
+
+    A sampled request's profile is only kept when the request took at least
+    threshold_ms. The profile covers the request's scoring, which runs on a
+    worker thread with cProfile enabled there, not the event loop.
+    """
+
+    def __init__(self, store: ProfileStore, sample_rate: float = 0.0,
+                 threshold_ms: float = 1000.0):
+        self.store = store
+        self.sample_rate = sample_rate
+        self.threshold_ms = threshold_ms
+        self._running = threading.Lock()
+
+    def run(self, forced: bool = False, **metadata) -> ProfileRun:
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        return ProfileRun(self, forced, sampled, metadata)
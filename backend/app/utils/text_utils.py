@@ -1,12 +1,34 @@
 import re
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Union
 import logging
 
 from app.config import settings
+from .document import AnalyzedDocument, as_document, tokenize
 
 logger = logging.getLogger(__name__)
 
 
+# Compiled once at import instead of on every call
+_NON_WORD = re.compile(r'[^\w\s]')
+_TAG = re.compile(r'<[^>]+>')
+# Control characters that are not whitespace; whitespace ones collapse to a space
+_CONTROL_CHARS = {
+    code: None for code in (*range(0x00, 0x20), *range(0x7f, 0xa0)) if not chr(code).isspace()
+}
+# A sentence starts at the first visible character after a terminator
+_SENTENCE = re.compile(r'[^.!?\s][^.!?]*')
+_EMAIL = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+# The lookahead lets the scan skip letters without trying the optional prefix
+_PHONE = re.compile(r'(?=[+(\d])(?:\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+_LINKEDIN = re.compile(r'linkedin\.com/in/[\w-]+', re.IGNORECASE)
+
+TextLike = Union[str, AnalyzedDocument]
+
+
+def _raw_text(text: TextLike) -> str:
+    return text.text if isinstance(text, AnalyzedDocument) else text
+
+
 def validate_text_input(text: str, min_length: int = 500) -> bool:
     """Validate text input for minimum length and content quality"""
     if not text or not isinstance(text, str):
@@ -17,7 +39,7 @@ def validate_text_input(text: str, min_length: int = 500) -> bool:
     if len(cleaned_text) < min_length:
         return False
     
-    meaningful_chars = re.sub(r'[^\w\s]', '', cleaned_text)
+    meaningful_chars = _NON_WORD.sub('', cleaned_text)
     if len(meaningful_chars) < min_length * 0.7:
         return False
     
@@ -29,57 +51,71 @@ def sanitize_text(text: str) -> str:
     if not text:
         return ""
     
-    text = re.sub(r'<[^>]+>', '', text)
-    text = re.sub(r'\s+', ' ', text)
-    text = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', text)
+    if "<" in text:
+        text = _TAG.sub('', text)
+    text = " ".join(text.split()).translate(_CONTROL_CHARS)
     
     return text.strip()
 
 
-def extract_contact_info(text: str) -> Dict[str, Optional[str]]:
+def extract_contact_info(text: TextLike) -> Dict[str, Optional[str]]:
     """Extract basic contact information from resume text"""
+    text = _raw_text(text)
     contact_info = {
         "email": None,
         "phone": None,
         "linkedin": None
     }
     
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    email_match = re.search(email_pattern, text)
+    # Every email has an "@", so most documents skip that scan entirely
+    email_match = _EMAIL.search(text) if "@" in text else None
     if email_match:
         contact_info["email"] = email_match.group()
     
-    phone_pattern = r'(\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-    phone_match = re.search(phone_pattern, text)
+    phone_match = _PHONE.search(text)
     if phone_match:
         contact_info["phone"] = phone_match.group()
     
-    linkedin_pattern = r'linkedin\.com/in/[\w-]+'
-    linkedin_match = re.search(linkedin_pattern, text, re.IGNORECASE)
+    linkedin_match = _LINKEDIN.search(text)
     if linkedin_match:
         contact_info["linkedin"] = linkedin_match.group()
     
     return contact_info
 
 
-def calculate_keyword_density(text: str, keywords: list) -> Dict[str, float]:
-    """Calculate keyword density in text"""
-    if not text or not keywords:
-        return {}
-    
-    text_lower = text.lower()
-    word_count = len(text_lower.split())
+def _keyword_plan(keywords: Sequence[str]) -> Dict[int, List[Tuple[str, str]]]:
+    """Keywords grouped by their token count, each with its joined tokens"""
+    plan: Dict[int, List[Tuple[str, str]]] = {}
+    for keyword in keywords:
+        keyword_tokens = tokenize(keyword)
+        plan.setdefault(len(keyword_tokens), []).append((keyword, " ".join(keyword_tokens)))
+    return plan
+
+
+def _keyword_density(document: AnalyzedDocument,
+                     plan: Dict[int, List[Tuple[str, str]]]) -> Dict[str, float]:
+    word_count = len(document.tokens)
     
     keyword_density = {}
-    for keyword in keywords:
-        keyword_lower = keyword.lower()
-        count = text_lower.count(keyword_lower)
-        density = (count / word_count) * 100 if word_count > 0 else 0
-        keyword_density[keyword] = round(density, 2)
+    for length, entries in plan.items():
+        # One n-gram count per phrase length serves every keyword of that length
+        counts = document.ngram_counts(length) if length and word_count else {}
+        for keyword, phrase in entries:
+            count = counts.get(phrase, 0)
+            density = (count / word_count) * 100 if word_count > 0 else 0
+            keyword_density[keyword] = round(density, 2)
     
     return keyword_density
 
 
+def calculate_keyword_density(text: TextLike, keywords: list) -> Dict[str, float]:
+    """Calculate keyword density in text, counting whole-token occurrences"""
+    if not _raw_text(text) or not keywords:
+        return {}
+    
+    return _keyword_density(as_document(text), _keyword_plan(keywords))
+
+
 def format_suggestions(suggestions: list, max_length: int = 150) -> list:
     """Format suggestions to ensure they're concise and actionable"""
     formatted_suggestions = []
@@ -97,19 +133,17 @@ def format_suggestions(suggestions: list, max_length: int = 150) -> list:
     return formatted_suggestions
 
 
-def get_text_statistics(text: str) -> Dict[str, int]:
+def get_text_statistics(text: TextLike) -> Dict[str, int]:
     """Get basic statistics about the text"""
     if not text:
         return {"word_count": 0, "character_count": 0, "sentence_count": 0}
     
-    words = text.split()
-    sentences = re.split(r'[.!?]+', text)
-    sentences = [s.strip() for s in sentences if s.strip()]
+    document = as_document(text)
     
     return {
-        "word_count": len(words),
-        "character_count": len(text),
-        "sentence_count": len(sentences)
+        "word_count": len(document.tokens),
+        "character_count": len(document.text),
+        "sentence_count": sum(1 for _ in _SENTENCE.finditer(document.text))
     }
 
 
@@ -0,0 +1,9 @@
+"""Micro-benchmarks for the scoring pipeline.
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --baseline baseline.json --threshold 0.2
+
+The second form exits non-zero when a stage median regresses past the
+threshold, so a results file from a known-good build can serve as the
+baseline in CI.
+"""
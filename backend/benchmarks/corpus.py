@@ -0,0 +1,115 @@
+import random
+from typing import Dict, List, Sequence, Tuple
+
+# Real skills first, so small vocabularies still look like real documents
+BASE_TECH_SKILLS = [
+    "python", "java", "javascript", "typescript", "c++", "c#", "go", "rust",
+    "ruby", "php", "html", "css", "react", "angular", "vue", "node.js",
+    "django", "flask", "fastapi", "spring", "mysql", "postgresql", "mongodb",
+    "redis", "aws", "azure", "docker", "kubernetes", "git", "linux"
+]
+
+BASE_SOFT_SKILLS = [
+    "leadership", "communication", "teamwork", "problem solving",
+    "critical thinking", "creativity", "adaptability", "time management",
+    "project management", "analytical thinking", "collaboration"
+]
+
+SYLLABLES = [
+    "ka", "fo", "ri", "zen", "lum", "tra", "vex", "pol", "nix", "dra",
+    "mo", "sta", "qui", "ber", "tal", "gro", "phi", "ul", "cor", "den"
+]
+
+FILLER_WORDS = [
+    "the", "team", "worked", "on", "a", "platform", "with", "customers", "and",
+    "delivered", "features", "for", "our", "product", "using", "across", "several",
+    "projects", "in", "production", "experience", "building", "services", "that",
+    "scale", "to", "millions", "of", "users", "while", "improving", "reliability",
+    "responsible", "designing", "reviewing", "code", "mentoring", "engineers"
+]
+
+RESUME_OPENERS = ["Experienced engineer.", "Summary of experience.", "Professional profile."]
+JOB_OPENERS = ["We are hiring.", "Job requirements.", "About the role."]
+
+# Share of sentences that mention a skill, and of those the share misspelled
+SKILL_RATE = 0.4
+TYPO_RATE = 0.1
+
+
+def _synthetic_skill(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def build_vocabulary(size: int, seed: int = 0) -> Tuple[List[str], List[str]]:
+    """Return (tech, soft) skill lists with size skills in total.
+
+    The built-in skills come first; synthetic single- and two-word skills
+    fill the rest, roughly one in five of them soft skills.
+    """
+    rng = random.Random(seed)
+    tech = BASE_TECH_SKILLS[:max(0, size - len(BASE_SOFT_SKILLS))]
+    soft = BASE_SOFT_SKILLS[:size - len(tech)]
+    seen = set(tech) | set(soft)
+
+    while len(tech) + len(soft) < size:
+        skill = _synthetic_skill(rng)
+        if rng.random() < 0.3:
+            skill = f"{skill} {_synthetic_skill(rng)}"
+        if skill in seen:
+            continue
+        seen.add(skill)
+        (soft if rng.random() < 0.2 else tech).append(skill)
+    return tech, soft
+
+
+def _typo(rng: random.Random, skill: str) -> str:
+    if len(skill) < 6:
+        return skill
+    i = rng.randrange(1, len(skill) - 2)
+    return skill[:i] + skill[i + 1] + skill[i] + skill[i + 2:]
+
+
+def generate_document(rng: random.Random, target_chars: int, skills: Sequence[str],
+                      opener: str) -> str:
+    """Sentences of filler words with skills (some misspelled) mixed in"""
+    parts = [opener]
+    length = len(opener)
+    while length < target_chars:
+        words = rng.choices(FILLER_WORDS, k=rng.randint(6, 14))
+        if skills and rng.random() < SKILL_RATE:
+            skill = rng.choice(skills)
+            if rng.random() < TYPO_RATE:
+                skill = _typo(rng, skill)
+            words.insert(rng.randrange(len(words)), skill)
+        sentence = " ".join(words).capitalize() + "."
+        parts.append(sentence)
+        length += len(sentence) + 1
+
+    text = " ".join(parts)
+    return text[:target_chars].rsplit(" ", 1)[0]
+
+
+def generate_corpus(sizes: Sequence[int], vocabulary_size: int, pairs_per_size: int = 1,
+                    seed: int = 0) -> Dict:
+    """Deterministic resume/job pairs at each size, plus the skill vocabulary.
+
+    Each job draws from a random slice of the vocabulary and its resume
+    covers part of that slice, so pairs have both found and missing skills.
+    """
+    tech, soft = build_vocabulary(vocabulary_size, seed)
+    vocabulary = tech + soft
+    rng = random.Random(seed)
+
+    pairs = []
+    for size in sizes:
+        for _ in range(pairs_per_size):
+            job_skills = rng.sample(vocabulary, min(len(vocabulary), rng.randint(10, 40)))
+            resume_skills = job_skills[:len(job_skills) // 2] + rng.sample(
+                vocabulary, min(len(vocabulary), 10)
+            )
+            pairs.append({
+                "size": size,
+                "resume": generate_document(rng, size, resume_skills, rng.choice(RESUME_OPENERS)),
+                "job": generate_document(rng, size, job_skills, rng.choice(JOB_OPENERS))
+            })
+    return {"tech_skills": tech, "soft_skills": soft, "pairs": pairs}
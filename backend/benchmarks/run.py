@@ -0,0 +1,228 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence
+
+from app.services.document_cache import DocumentCache, pair_key
+from app.services.nlp_service import NLPProcessor
+from app.services.skill_matcher import tokenize
+from app.services.skill_taxonomy import SkillIndex
+from app.utils.text_utils import (
+    calculate_keyword_density, extract_contact_info, get_text_statistics, sanitize_text
+)
+from .corpus import generate_corpus
+
+STAGES = (
+    "preprocess", "exact_match", "fuzzy_match", "tfidf", "suggestions",
+    "text_utils", "db_persist"
+)
+
+DEFAULT_SIZES = (500, 2000, 5000, 20000)
+
+# Stages faster than this are too noisy to flag as regressions
+MIN_REGRESSION_MS = 0.05
+
+
+def _summarize(durations: List[float]) -> Dict[str, float]:
+    ordered = sorted(durations)
+    return {
+        "median_ms": round(statistics.median(ordered) * 1000, 4),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 4),
+        "min_ms": round(ordered[0] * 1000, 4),
+        "runs": len(ordered)
+    }
+
+
+def _time(fn: Callable[[], object], repeat: int,
+          setup: Optional[Callable[[], None]] = None) -> List[float]:
+    durations = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def _build_processor(tech_skills: List[str], soft_skills: List[str]) -> NLPProcessor:
+    processor = NLPProcessor()
+    processor.skill_index = SkillIndex.from_skill_lists(tech_skills, soft_skills)
+    # Nothing fits in a zero-byte cache, so every stage does its full work
+    processor.document_cache = DocumentCache(max_bytes=0, ttl_seconds=0)
+    return processor
+
+
+async def _time_db_persist(processor: NLPProcessor, rows: List[Dict],
+                           repeat: int) -> List[float]:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from database import Base
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{directory}/bench.db")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+        durations = []
+        try:
+            for run in range(repeat):
+                # Every run inserts new pairs, so give them fresh hashes
+                inserts = [{**row, "pair_hash": f"{row['pair_hash'][:56]}{run:08d}"} for row in rows]
+                async with session_factory() as db:
+                    started = time.perf_counter()
+                    await processor._save_rows(db, inserts, [])
+                    durations.append(time.perf_counter() - started)
+        finally:
+            await engine.dispose()
+        return durations
+
+
+def _bench_size(processor: NLPProcessor, pairs: List[Dict], repeat: int) -> Dict[str, List[float]]:
+    skill_index = processor.skill_index
+    texts = [text for pair in pairs for text in (pair["resume"], pair["job"])]
+    tokens = [tokenize(text) for text in texts]
+    analyses = [processor.analyze(text) for text in texts]
+    left = list(range(0, len(texts), 2))
+    right = list(range(1, len(texts), 2))
+    skills = [analysis.tech_skills + analysis.soft_skills for analysis in analyses]
+
+    timings = {
+        "preprocess": _time(lambda: [processor._preprocess_text(text) for text in texts], repeat),
+        "exact_match": _time(
+            lambda: [skill_index.matcher.find(tokenize(text)) for text in texts], repeat
+        ),
+        # Clear the per-token cache so every run pays for the full lookup
+        "fuzzy_match": _time(
+            lambda: [skill_index.fuzzy_index.match_tokens(doc_tokens) for doc_tokens in tokens],
+            repeat, setup=skill_index.fuzzy_index.lookup.cache_clear
+        ),
+        "tfidf": _time(lambda: processor._pair_similarities(analyses, left, right), repeat),
+        "suggestions": _time(lambda: [
+            processor._build_result(analyses[i].skills, analyses[j].skills, 50.0, {})
+            for i, j in zip(left, right)
+        ], repeat),
+        "text_utils": _time(lambda: [
+            (
+                sanitize_text(text),
+                extract_contact_info(text),
+                get_text_statistics(text),
+                calculate_keyword_density(text, text_skills)
+            )
+            for text, text_skills in zip(texts, skills)
+        ], repeat)
+    }
+
+    rows = []
+    for pair, i, j in zip(pairs, left, right):
+        result = processor._build_result(analyses[i].skills, analyses[j].skills, 50.0, {})
+        rows.append({
+            "pair_hash": pair_key(pair["resume"], pair["job"]),
+            "resume_text": pair["resume"][:1000],
+            "job_description": pair["job"][:1000],
+            **processor._result_values(result, processor.model_version)
+        })
+    timings["db_persist"] = asyncio.run(_time_db_persist(processor, rows, repeat))
+    return timings
+
+
+def run_benchmarks(sizes: Sequence[int] = DEFAULT_SIZES, vocabulary_size: int = 500,
+                   pairs_per_size: int = 5, repeat: int = 5, seed: int = 0) -> Dict:
+    """Time every stage at every document size and return the results document"""
+    corpus = generate_corpus(sizes, vocabulary_size, pairs_per_size, seed)
+    processor = _build_processor(corpus["tech_skills"], corpus["soft_skills"])
+
+    results: Dict[str, Dict[str, Dict[str, float]]] = {stage: {} for stage in STAGES}
+    for size in sizes:
+        pairs = [pair for pair in corpus["pairs"] if pair["size"] == size]
+        for stage, durations in _bench_size(processor, pairs, repeat).items():
+            results[stage][str(size)] = _summarize(durations)
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "config": {
+            "sizes": list(sizes),
+            "vocabulary_size": vocabulary_size,
+            "pairs_per_size": pairs_per_size,
+            "repeat": repeat,
+            "seed": seed
+        },
+        "results": results
+    }
+
+
+def compare_to_baseline(current: Dict, baseline: Dict, threshold: float) -> List[Dict]:
+    """Stages whose median slowed down by more than threshold (0.2 = 20%)"""
+    regressions = []
+    for stage, by_size in current["results"].items():
+        for size, stats in by_size.items():
+            previous = baseline.get("results", {}).get(stage, {}).get(size)
+            if previous is None:
+                continue
+            limit = previous["median_ms"] * (1 + threshold)
+            if stats["median_ms"] > limit and stats["median_ms"] - previous["median_ms"] > MIN_REGRESSION_MS:
+                regressions.append({
+                    "stage": stage,
+                    "size": int(size),
+                    "baseline_ms": previous["median_ms"],
+                    "current_ms": stats["median_ms"],
+                    "change": round(stats["median_ms"] / previous["median_ms"] - 1, 4)
+                })
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the NLP scoring stages")
+    parser.add_argument("--output", default="benchmark_results.json",
+                        help="Where to write the results JSON")
+    parser.add_argument("--baseline", help="Results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed slowdown of a stage median before failing (0.2 = 20%%)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="Document sizes in characters")
+    parser.add_argument("--vocabulary", type=int, default=500, help="Skill vocabulary size")
+    parser.add_argument("--pairs", type=int, default=5, help="Resume/job pairs per size")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per stage")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.vocabulary, args.pairs, args.repeat, args.seed)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    for stage in STAGES:
+        medians = ", ".join(
+            f"{size}: {stats['median_ms']:.3f}ms" for size, stats in results["results"][stage].items()
+        )
+        print(f"{stage:<16} {medians}")
+
+    if not args.baseline:
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"Baseline {args.baseline} not found", file=sys.stderr)
+        return 2
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressions = compare_to_baseline(results, baseline, args.threshold)
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression['stage']} @ {regression['size']} chars: "
+            f"{regression['baseline_ms']:.3f}ms -> {regression['current_ms']:.3f}ms "
+            f"(+{regression['change']:.0%})",
+            file=sys.stderr
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
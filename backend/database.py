@@ -1,16 +1,46 @@
-from sqlalchemy import create_engine, Column, Integer, Text, Float, DateTime, JSON
+from sqlalchemy import create_engine, Column, Date, Index, Integer, String, Text, Float, DateTime, JSON
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.sql import func
 from app.config.settings import Settings
 
 settings = Settings()
 
+def _pool_options(url: str) -> dict:
+    options = {"pool_pre_ping": settings.db_pool_pre_ping}
+    if not url.startswith("sqlite"):
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout
+        )
+    return options
+
+def get_async_database_url(url: str) -> str:
+    """Map a sync database URL onto its async driver (asyncpg / aiosqlite)"""
+    scheme, _, rest = url.partition("://")
+    if scheme.startswith("postgresql"):
+        return f"postgresql+asyncpg://{rest}"
+    if scheme.startswith("sqlite"):
+        return f"sqlite+aiosqlite://{rest}"
+    return url
+
 # Database setup
-engine = create_engine(settings.get_database_url)
+engine = create_engine(settings.get_database_url, **_pool_options(settings.get_database_url))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+async_database_url = get_async_database_url(settings.get_database_url)
+async_engine = create_async_engine(async_database_url, **_pool_options(async_database_url))
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
 Base = declarative_base()
 
+def _keyword_count(context, column: str) -> int:
+    """Insert default deriving a stored count from its keyword list"""
+    return len(context.get_current_parameters().get(column) or [])
+
 # Database model
 class ComparisonHistory(Base):
     __tablename__ = "comparison_history"
@@ -22,7 +52,41 @@ class ComparisonHistory(Base):
     found_keywords = Column(JSON, default=list)
     missing_keywords = Column(JSON, default=list)
     suggestions = Column(JSON, default=list)
+    found_count = Column(Integer, default=lambda ctx: _keyword_count(ctx, "found_keywords"))
+    missing_count = Column(Integer, default=lambda ctx: _keyword_count(ctx, "missing_keywords"))
+    required_skills = Column(JSON, default=list)
+    similarity_details = Column(JSON, default=dict)
+    # sha256 of the normalised (resume, job description) pair
+    pair_hash = Column(String(64), unique=True, index=True, nullable=True)
+    model_version = Column(String(64), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        # Newest-first history pages, with id breaking created_at ties
+        Index("ix_comparison_history_created_at_id", "created_at", "id"),
+    )
+
+# Analytics rollups, kept in step with comparison_history by app.services.analytics
+class DailyRollup(Base):
+    __tablename__ = "analytics_daily"
+    
+    day = Column(Date, primary_key=True)
+    comparisons = Column(Integer, nullable=False, default=0)
+    score_total = Column(Float, nullable=False, default=0.0)
+
+class ScoreBucketRollup(Base):
+    __tablename__ = "analytics_score_buckets"
+    
+    # Lower bound of the bucket, a multiple of the bucket width
+    bucket = Column(Integer, primary_key=True)
+    comparisons = Column(Integer, nullable=False, default=0)
+
+class SkillRollup(Base):
+    __tablename__ = "analytics_skills"
+    
+    skill = Column(String(255), primary_key=True)
+    found_count = Column(Integer, nullable=False, default=0, index=True)
+    missing_count = Column(Integer, nullable=False, default=0, index=True)
 
 def create_tables():
     Base.metadata.create_all(bind=engine)
@@ -32,4 +96,8 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
@@ -1,35 +1,131 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from contextlib import asynccontextmanager
 import uvicorn
-from sqlalchemy.orm import Session
+import asyncio
+import logging
+import secrets
+import time
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config.settings import Settings
-from database import create_tables, get_db, ComparisonHistory
+from database import (
+    create_tables, get_async_db, SessionLocal, AsyncSessionLocal, async_engine
+)
 from app.models.schemas import (
     ComparisonRequest, 
     ComparisonResponse, 
+    BatchComparisonRequest,
+    BatchComparisonResponse,
     ComparisonHistoryResponse,
-    HealthResponse
+    HealthResponse,
+    TaxonomyReloadResponse,
+    JobMatchRequest,
+    JobMatchResponse,
+    AnalyticsResponse,
+    ProfileInfo,
+    ProbeResponse
 )
+from app.exceptions import ValidationException
 from app.services.nlp_service import NLPProcessor
+from app.services.job_index import JobIndex
+from app.services.analytics import fetch_analytics
+from app.services.comparison_service import encode_history_cursor, fetch_history_page
+from app.services.history_export import EXPORT_MEDIA_TYPES, export_history
+from app.services.write_behind import WriteBehindQueue
+from app.services.micro_batcher import MicroBatcher
+from app.services.streaming import StreamTooLarge, read_multipart
+from app.services.file_extraction import (
+    ExtractionError, ExtractionTimeout, SpooledUpload, TextExtractor, TextPart
+)
+from app.utils.metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY, REQUEST_ERRORS, REQUEST_SECONDS,
+    Gauge, pool_gauge_values
+)
+from app.utils.profiling import ProfileStore, RequestProfiler
 
 settings = Settings()
+logger = logging.getLogger(__name__)
+
+REGISTRY.register(Gauge(
+    "db_pool_connections", "Connections of the async database pool by state", ("state",),
+    callback=lambda: pool_gauge_values(async_engine.sync_engine.pool)
+))
+
+profiler = RequestProfiler(
+    ProfileStore(settings.profile_dir, settings.profile_max_profiles),
+    sample_rate=settings.profile_sample_rate,
+    threshold_ms=settings.profile_threshold_ms
+)
 
 # Global NLP processor
 nlp_processor = None
+job_index = None
+text_extractor = None
+
+# Reported by /readyz; the pod only takes traffic once warm_up has run
+startup_state = {"phase": "starting", "warmup_ms": None, "error": None}
+
+def build_job_index(processor: NLPProcessor) -> JobIndex:
+    index = JobIndex(processor)
+    db = SessionLocal()
+    try:
+        index.build(db)
+    finally:
+        db.close()
+    return index
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    global nlp_processor
+    global nlp_processor, job_index, text_extractor
+    startup_state.update(phase="starting", warmup_ms=None, error=None)
     create_tables()
-    nlp_processor = NLPProcessor()
+    nlp_processor = await asyncio.to_thread(NLPProcessor)
     await nlp_processor.initialize()
+    if settings.write_behind_enabled:
+        nlp_processor.write_behind = WriteBehindQueue(
+            AsyncSessionLocal,
+            max_rows=settings.write_behind_max_rows,
+            flush_interval_ms=settings.write_behind_flush_ms,
+            max_queue=settings.write_behind_max_queue
+        )
+        nlp_processor.write_behind.start()
+    if settings.micro_batch_enabled:
+        nlp_processor.micro_batcher = MicroBatcher(
+            nlp_processor,
+            window_ms=settings.micro_batch_window_ms,
+            max_batch_size=settings.micro_batch_max_size
+        )
+    job_index = await asyncio.to_thread(build_job_index, nlp_processor)
+    text_extractor = TextExtractor(
+        workers=settings.extraction_workers,
+        cache_max_bytes=settings.extraction_cache_max_bytes,
+        ttl_seconds=settings.document_cache_ttl_seconds,
+        timeout_seconds=settings.extraction_timeout_seconds
+    )
+    try:
+        startup_state["warmup_ms"] = round(await nlp_processor.warm_up(), 3)
+        startup_state["phase"] = "ready"
+    except Exception as e:
+        # Stay alive but unready, so the failure is visible instead of a restart loop
+        logger.exception("Warm-up comparison failed")
+        startup_state.update(phase="failed", error=str(e))
     yield
     # Shutdown
+    startup_state["phase"] = "stopping"
     if nlp_processor:
+        if nlp_processor.micro_batcher:
+            await nlp_processor.micro_batcher.stop()
+        if nlp_processor.write_behind:
+            await nlp_processor.write_behind.stop()
         await nlp_processor.close()
+    if text_extractor:
+        text_extractor.shutdown()
+    await async_engine.dispose()
 
 app = FastAPI(
     title=settings.api_title,
@@ -44,54 +140,336 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template, not raw path, to keep cardinality bounded
+        route = request.scope.get("route")
+        route_path = route.path if route is not None else "unmatched"
+        REQUEST_SECONDS.labels(request.method, route_path, status).observe(
+            time.perf_counter() - started
+        )
+        if status >= 400:
+            REQUEST_ERRORS.labels(request.method, route_path, status).inc()
+
+def verify_admin_token(x_admin_token: Optional[str] = Header(None)):
+    if not settings.admin_token or not x_admin_token or \
+            not secrets.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+def verify_scorer(scorer: Optional[str]):
+    """400 unless the requested similarity scorer is loaded"""
+    if scorer is not None and scorer not in nlp_processor.scorers:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown scorer {scorer!r}, available: {sorted(nlp_processor.scorers)}"
+        )
+
+async def index_jobs(comparisons: list):
+    """Add newly stored (comparison id, job description) pairs to the job index"""
+    if job_index is None:
+        return
+    # Index the same truncated text that comparison_history stores
+    await asyncio.to_thread(job_index.add_many, [
+        (comparison_id, job_description[:1000])
+        for comparison_id, job_description in comparisons
+    ])
+
+@app.get("/livez", response_model=ProbeResponse)
+async def liveness():
+    return ProbeResponse(status="alive")
+
+@app.get("/readyz", response_model=ProbeResponse)
+async def readiness(response: Response):
+    ready = startup_state["phase"] == "ready" and nlp_processor is not None \
+        and nlp_processor.initialized
+    if not ready:
+        response.status_code = 503
+    return ProbeResponse(status="ready" if ready else "not ready", checks=dict(startup_state))
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     return HealthResponse(
         status="healthy",
         nlp_ready=nlp_processor is not None and nlp_processor.initialized,
-        version=settings.api_version
+        version=settings.api_version,
+        document_cache=nlp_processor.document_cache.stats() if nlp_processor else None,
+        write_behind=nlp_processor.write_behind.stats()
+        if nlp_processor and nlp_processor.write_behind else None,
+        micro_batch=nlp_processor.micro_batcher.stats()
+        if nlp_processor and nlp_processor.micro_batcher else None,
+        extraction=text_extractor.stats() if text_extractor else None,
+        scorers=nlp_processor.scorer_stats() if nlp_processor else None
     )
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
 @app.post("/compare", response_model=ComparisonResponse)
 async def compare_resume(
     request: ComparisonRequest,
-    db: Session = Depends(get_db)
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    x_profile: Optional[str] = Header(None),
+    x_admin_token: Optional[str] = Header(None)
+):
+    if not nlp_processor or not nlp_processor.initialized:
+        raise HTTPException(status_code=503, detail="NLP processor not ready")
+    if x_profile:
+        verify_admin_token(x_admin_token)
+    verify_scorer(request.scorer)
+    
+    try:
+        async with profiler.run(
+            forced=bool(x_profile),
+            route="/compare",
+            resume_chars=len(request.resume_text),
+            job_chars=len(request.job_description)
+        ) as profile:
+            result = await nlp_processor.compare_resume_to_job(
+                resume_text=request.resume_text,
+                job_description=request.job_description,
+                db=db,
+                force_recompute=request.force_recompute,
+                scorer=request.scorer
+            )
+        if profile.profile_id:
+            response.headers["X-Profile-Id"] = profile.profile_id
+        await index_jobs([(result.id, request.job_description)])
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/compare/batch", response_model=BatchComparisonResponse)
+async def compare_batch(
+    request: BatchComparisonRequest,
+    db: AsyncSession = Depends(get_async_db)
 ):
     if not nlp_processor or not nlp_processor.initialized:
         raise HTTPException(status_code=503, detail="NLP processor not ready")
+    verify_scorer(request.scorer)
+    
+    try:
+        pairs = request.pairs()
+        results = await nlp_processor.compare_batch_to_db(
+            pairs, db, force_recompute=request.force_recompute, scorer=request.scorer
+        )
+        await index_jobs([
+            (result.id, job_description)
+            for result, (_, job_description) in zip(results, pairs)
+        ])
+        return BatchComparisonResponse(results=results)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/compare/stream", response_model=ComparisonResponse)
+async def compare_stream(
+    request: Request,
+    force_recompute: bool = Query(False),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Compare a multipart upload with "resume" and "job_description" parts.
+    
+    The parts are analysed as they arrive instead of being read into memory,
+    so documents may be up to max_stream_text_length characters long.
+    """
+    if not nlp_processor or not nlp_processor.initialized:
+        raise HTTPException(status_code=503, detail="NLP processor not ready")
+    
+    documents = {
+        "resume": nlp_processor.streaming_document(),
+        "job_description": nlp_processor.streaming_document()
+    }
+    try:
+        received = await read_multipart(
+            request.stream(), request.headers.get("content-type", ""), documents
+        )
+    except StreamTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    for name, document in documents.items():
+        if name not in received:
+            raise HTTPException(status_code=400, detail=f"Missing {name} part")
+        if document.characters < settings.min_text_length:
+            raise HTTPException(
+                status_code=400,
+                detail=f"{name} must be at least {settings.min_text_length} characters"
+            )
+    
+    try:
+        job = documents["job_description"]
+        result = await nlp_processor.compare_streamed(
+            documents["resume"], job, db, force_recompute=force_recompute
+        )
+        await index_jobs([(result.id, job.head)])
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/compare/upload", response_model=ComparisonResponse)
+async def compare_upload(
+    request: Request,
+    response: Response,
+    force_recompute: bool = Query(False),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Compare an uploaded PDF, DOCX or text resume with a job description.
+    
+    The multipart body has a "resume" file and a "job_description" field.
+    The file is spooled to disk as it arrives and extracted off the event
+    loop; the text of a file seen before comes from the extraction cache.
+    """
+    if not nlp_processor or not nlp_processor.initialized or not text_extractor:
+        raise HTTPException(status_code=503, detail="NLP processor not ready")
+    
+    resume = SpooledUpload(settings.upload_max_bytes, settings.upload_spool_dir)
+    # A UTF-8 character is at most four bytes
+    job = TextPart(settings.max_text_length * 4)
+    try:
+        received = await read_multipart(
+            request.stream(), request.headers.get("content-type", ""),
+            {"resume": resume, "job_description": job}
+        )
+        for name in ("resume", "job_description"):
+            if name not in received:
+                raise ValueError(f"Missing {name} part")
+    except BaseException as e:
+        resume.discard()
+        if isinstance(e, StreamTooLarge):
+            raise HTTPException(status_code=413, detail=str(e))
+        if isinstance(e, ValueError):
+            raise HTTPException(status_code=400, detail=str(e))
+        raise
+    
+    # The extractor owns the spooled file from here on
+    try:
+        resume_text, cached = await text_extractor.extract(resume)
+    except ExtractionTimeout as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ExtractionError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    
+    try:
+        comparison = ComparisonRequest(
+            resume_text=resume_text.strip(), job_description=job.text.strip()
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     try:
         result = await nlp_processor.compare_resume_to_job(
-            resume_text=request.resume_text,
-            job_description=request.job_description,
-            db=db
+            resume_text=comparison.resume_text,
+            job_description=comparison.job_description,
+            db=db,
+            force_recompute=force_recompute
         )
+        response.headers["X-Extraction-Cache"] = "hit" if cached else "miss"
+        await index_jobs([(result.id, comparison.job_description)])
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/history", response_model=list[ComparisonHistoryResponse])
 async def get_comparison_history(
-    limit: int = 10,
-    db: Session = Depends(get_db)
+    response: Response,
+    limit: int = Query(10, ge=1, le=100),
+    before: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    history = db.query(ComparisonHistory)\
-        .order_by(ComparisonHistory.created_at.desc())\
-        .limit(limit)\
-        .all()
-    
-    return [
-        ComparisonHistoryResponse(
-            id=item.id,
-            match_score=item.match_score,
-            created_at=item.created_at,
-            missing_keywords_count=len(item.missing_keywords or []),
-            found_keywords_count=len(item.found_keywords or [])
+    try:
+        history = await fetch_history_page(db, limit, before=before)
+    except ValidationException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if len(history) == limit:
+        response.headers["X-Next-Cursor"] = encode_history_cursor(history[-1])
+    return history
+
+@app.get("/history/export")
+async def export_comparison_history(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    if start and end and start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    
+    # The session stays open until the response has been fully streamed
+    return StreamingResponse(
+        export_history(db, format, start, end),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="comparison_history.{format}"'}
+    )
+
+@app.get("/analytics", response_model=AnalyticsResponse)
+async def get_analytics(
+    days: int = Query(30, ge=1, le=366),
+    top_skills: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await fetch_analytics(db, days=days, top_skills=top_skills)
+
+@app.post("/jobs/match", response_model=JobMatchResponse)
+async def match_jobs(request: JobMatchRequest, top_k: int = Query(10, ge=1, le=100)):
+    if not nlp_processor or job_index is None:
+        raise HTTPException(status_code=503, detail="Job index not ready")
+    
+    matches = await asyncio.to_thread(job_index.search, request.resume_text, top_k)
+    return JobMatchResponse(matches=matches, indexed_jobs=len(job_index))
+
+@app.post(
+    "/admin/taxonomy/reload",
+    response_model=TaxonomyReloadResponse,
+    dependencies=[Depends(verify_admin_token)]
+)
+async def reload_taxonomy():
+    if not nlp_processor:
+        raise HTTPException(status_code=503, detail="NLP processor not ready")
+    
+    try:
+        skill_index = await asyncio.to_thread(nlp_processor.reload_taxonomy)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load taxonomy: {e}")
+    
+    return TaxonomyReloadResponse(
+        version=skill_index.version,
+        tech_skills=len(skill_index.tech_skills),
+        soft_skills=len(skill_index.soft_skills)
+    )
+
+@app.get(
+    "/admin/profiles",
+    response_model=list[ProfileInfo],
+    dependencies=[Depends(verify_admin_token)]
+)
+async def list_profiles():
+    return await asyncio.to_thread(profiler.store.list)
+
+@app.get("/admin/profiles/{profile_id}", dependencies=[Depends(verify_admin_token)])
+async def download_profile(profile_id: str, format: str = Query("prof", pattern="^(prof|text)$")):
+    try:
+        if format == "text":
+            return PlainTextResponse(await asyncio.to_thread(profiler.store.summary, profile_id))
+        return FileResponse(
+            profiler.store.stats_path(profile_id),
+            media_type="application/octet-stream",
+            filename=f"{profile_id}.prof"
         )
-        for item in history
-    ]
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Profile not found")
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
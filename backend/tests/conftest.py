@@ -4,13 +4,15 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 import pytest
 import asyncio
+import pytest_asyncio
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool, StaticPool
 
 from main import app
-from database import get_db, Base
+from database import get_db, get_async_db, Base
 from app.services.nlp_service import NLPProcessor
 
 # Create test database
@@ -29,7 +31,19 @@ def override_get_db():
     finally:
         db.close()
 
+# Each TestClient runs the app on its own event loop, so async connections
+# must not be pooled across tests
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
 
 @pytest.fixture(scope="session")
 def event_loop():
@@ -57,4 +71,49 @@ async def nlp_processor():
     await processor.initialize()
     yield processor
     if processor.session:
-        await processor.session.close()
\ No newline at end of file
+        await processor.session.close()
+
+SAMPLE_RESUME = (
+    "Senior software engineer with eight years of experience building web "
+    "platforms in Python, Django, Flask and FastAPI. Designed PostgreSQL and "
+    "Redis backed services deployed with Docker and Kubernetes on AWS. Led a "
+    "team of five engineers, mentoring juniors and driving code reviews. "
+    "Known for strong communication, problem solving and time management. "
+    "Built CI pipelines with git and Linux tooling, improved API latency by "
+    "forty percent and reduced infrastructure cost by moving batch jobs to "
+    "spot instances. Comfortable collaborating with product and design."
+)
+
+SAMPLE_JOB_DESCRIPTION = (
+    "We are hiring a backend engineer to own Python services written in "
+    "Django and FastAPI. You will design PostgreSQL schemas, operate Docker "
+    "containers on Kubernetes, and work with cloud infrastructure on AWS or "
+    "Azure. Experience with Java or Go is a plus. The role requires excellent "
+    "communication and collaboration with frontend engineers who use React "
+    "and TypeScript. You should show leadership in design discussions, "
+    "critical thinking when debugging production issues, and adaptability "
+    "as priorities change in a fast moving startup environment."
+)
+
+
+@pytest.fixture
+def sample_resume():
+    return SAMPLE_RESUME
+
+
+@pytest.fixture
+def sample_job_description():
+    return SAMPLE_JOB_DESCRIPTION
+
+
+@pytest_asyncio.fixture
+async def async_db_session(db_session):
+    """Async session on the same fresh database as db_session"""
+    async with TestingAsyncSessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+def async_session_factory(db_session):
+    """Async session factory bound to the fresh test database"""
+    return TestingAsyncSessionLocal
@@ -0,0 +1,44 @@
+import pytest
+from app.models.schemas import ComparisonRequest
+from app.services.analytics import fetch_analytics, rebuild_rollups, score_bucket
+from app.services.comparison_service import ComparisonService
+from app.services.nlp_service import NLPProcessor
+
+
+def test_score_bucket():
+    """Test scores land in 10-point buckets with 100 in the top one"""
+    assert score_bucket(0) == 0
+    assert score_bucket(39.9) == 30
+    assert score_bucket(90) == 90
+    assert score_bucket(100) == 90
+
+
+@pytest.mark.asyncio
+async def test_rollups_follow_inserts_rescores_and_deletes(async_db_session, sample_resume,
+                                                           sample_job_description):
+    """Test rollups maintained on each write match a full rebuild"""
+    processor = NLPProcessor()
+    service = ComparisonService(processor)
+    other_job = sample_job_description.replace("Django", "Rails").replace("Python", "Ruby")
+    
+    first = await service.compare_resume_job(ComparisonRequest(
+        resume_text=sample_resume, job_description=other_job
+    ), async_db_session)
+    await processor.compare_batch_to_db([(sample_resume, sample_job_description)], async_db_session)
+    await processor.compare_batch_to_db(
+        [(sample_resume, sample_job_description)], async_db_session, force_recompute=True
+    )
+    
+    analytics = await fetch_analytics(async_db_session)
+    assert analytics["total_comparisons"] == 2
+    assert analytics["daily"][-1]["comparisons"] == 2
+    assert sum(bucket["comparisons"] for bucket in analytics["score_histogram"]) == 2
+    missing = {item["skill"]: item["missing"] for item in analytics["most_missing_skills"]}
+    assert all(missing[skill] >= 1 for skill in first.missing_keywords)
+    
+    await service.delete_comparison(first.id, async_db_session)
+    incremental = await fetch_analytics(async_db_session)
+    assert incremental["total_comparisons"] == 1
+    
+    assert await rebuild_rollups(async_db_session) == 1
+    assert await fetch_analytics(async_db_session) == incremental
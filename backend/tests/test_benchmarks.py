@@ -0,0 +1,33 @@
+import copy
+from benchmarks.corpus import build_vocabulary, generate_corpus
+from benchmarks.run import STAGES, compare_to_baseline, run_benchmarks
+
+
+def test_corpus_is_deterministic():
+    """Test the same seed yields the same corpus at the requested sizes"""
+    first = generate_corpus([500, 20000], vocabulary_size=300, seed=7)
+    assert first == generate_corpus([500, 20000], vocabulary_size=300, seed=7)
+    assert first != generate_corpus([500, 20000], vocabulary_size=300, seed=8)
+    
+    for pair in first["pairs"]:
+        for text in (pair["resume"], pair["job"]):
+            assert pair["size"] - 50 <= len(text) <= pair["size"]
+
+
+def test_vocabulary_size():
+    """Test the vocabulary has exactly the requested number of distinct skills"""
+    for size in (5, 41, 1000):
+        tech, soft = build_vocabulary(size)
+        assert len(set(tech) | set(soft)) == len(tech) + len(soft) == size
+
+
+def test_run_and_compare_to_baseline():
+    """Test every stage is timed and slowdowns past the threshold are reported"""
+    results = run_benchmarks(sizes=[500], vocabulary_size=50, pairs_per_size=1, repeat=1)
+    assert set(results["results"]) == set(STAGES)
+    assert compare_to_baseline(results, results, threshold=0.2) == []
+    
+    baseline = copy.deepcopy(results)
+    baseline["results"]["tfidf"]["500"]["median_ms"] = results["results"]["tfidf"]["500"]["median_ms"] / 2 - 0.1
+    regressions = compare_to_baseline(results, baseline, threshold=0.2)
+    assert [(r["stage"], r["size"]) for r in regressions] == [("tfidf", 500)]
@@ -0,0 +1,51 @@
+import pytest
+from database import ComparisonHistory
+from app.services.comparison_service import ComparisonService
+from app.services.nlp_service import NLPProcessor
+from app.models.schemas import ComparisonRequest
+from app.exceptions import ComparisonException
+
+
+@pytest.mark.asyncio
+async def test_compare_resume_job(async_db_session, sample_resume, sample_job_description):
+    """Test the service stores comparisons with a pair hash and deduplicates them"""
+    service = ComparisonService(NLPProcessor())
+    request = ComparisonRequest(
+        resume_text=sample_resume,
+        job_description=sample_job_description
+    )
+    
+    result = await service.compare_resume_job(request, async_db_session)
+    details = await service.get_comparison_details(result.id, async_db_session)
+    
+    assert details.match_score == result.match_score
+    assert sorted(details.found_keywords) == sorted(result.found_keywords)
+    
+    repeat = await service.compare_resume_job(request, async_db_session)
+    stored = await async_db_session.get(ComparisonHistory, result.id)
+    assert repeat.cached and repeat.id == result.id
+    assert stored.pair_hash and stored.model_version
+
+
+@pytest.mark.asyncio
+async def test_history_and_delete(async_db_session):
+    """Test history listing and deletion through an async session"""
+    service = ComparisonService(NLPProcessor())
+    for score in (40.0, 60.0):
+        async_db_session.add(ComparisonHistory(
+            resume_text="resume",
+            job_description="job",
+            match_score=score,
+            found_keywords=["python"],
+            missing_keywords=["java", "go"],
+            suggestions=[]
+        ))
+    await async_db_session.commit()
+    
+    history = await service.get_comparison_history(async_db_session, limit=10)
+    assert len(history) == 2
+    assert history[0].missing_keywords_count == 2
+    
+    assert await service.delete_comparison(history[0].id, async_db_session)
+    with pytest.raises(ComparisonException):
+        await service.get_comparison_details(history[0].id, async_db_session)
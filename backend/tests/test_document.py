@@ -0,0 +1,70 @@
+from benchmarks.corpus import generate_corpus
+from app.services.tfidf_model import preprocess_text
+from app.utils.document import AnalyzedDocument
+from app.utils.text_utils import (
+    calculate_keyword_density, extract_contact_info, get_text_statistics, sanitize_text,
+    validate_text_input
+)
+
+
+def test_document_matches_preprocess_text():
+    """Test the derived preprocessed text equals the regex-based one"""
+    corpus = generate_corpus([500, 5000], vocabulary_size=200, seed=3)
+    texts = [pair[key] for pair in corpus["pairs"] for key in ("resume", "job")]
+    texts.append("Built C++/C# tools, node.js APIs & snake_case scripts -- 10+ years!")
+    
+    for text in texts:
+        assert AnalyzedDocument(text).processed_text == preprocess_text(text)
+
+
+def test_document_tokens_offsets_and_ngrams():
+    """Test tokens carry their spans and phrases are counted on whole tokens"""
+    document = AnalyzedDocument("Node.js and Java; JavaScript. Machine learning, machine learning!")
+    
+    assert document.tokens[:3] == ["node.js", "and", "java"]
+    for token, (start, end) in zip(document.tokens, document.offsets):
+        assert document.normalized_text[start:end] == token
+    assert document.ngrams(2)[0] == "node.js and"
+    assert document.count_phrase("Java") == 1
+    assert document.count_phrase("machine learning") == 2
+    assert document.token_set == frozenset(document.tokens)
+
+
+def test_text_utils_accept_documents():
+    """Test text_utils give the same answer for a document and its raw text"""
+    text = "Python developer. Knows Java, not JavaScript! Python again?"
+    document = AnalyzedDocument(text)
+    
+    assert get_text_statistics(document) == get_text_statistics(text)
+    assert get_text_statistics(text)["sentence_count"] == 3
+    density = calculate_keyword_density(document, ["python", "java"])
+    assert density == calculate_keyword_density(text, ["python", "java"])
+    assert density["java"] == round(100 / len(document.tokens), 2)
+
+
+def test_text_utils_on_documents_match_text():
+    """Test analyzed documents give the same results as their plain text"""
+    texts = [
+        "Reach me at jane.doe@example.com, (555) 123-4567 or linkedin.com/in/jane-doe.",
+        "<p>Senior\tPython\x00 engineer</p>\n\nKnows machine learning; machine learning!",
+        ""
+    ]
+    documents = [AnalyzedDocument(text) for text in texts]
+    keywords = ["python", "machine learning", "java"]
+    
+    assert sanitize_text(texts[1]) == "Senior Python engineer Knows machine learning; machine learning!"
+    assert [extract_contact_info(document) for document in documents] == [
+        extract_contact_info(text) for text in texts
+    ]
+    assert extract_contact_info(texts[0]) == {
+        "email": "jane.doe@example.com",
+        "phone": "(555) 123-4567",
+        "linkedin": "linkedin.com/in/jane-doe"
+    }
+    assert [get_text_statistics(document) for document in documents] == [
+        get_text_statistics(text) for text in texts
+    ]
+    assert [calculate_keyword_density(document, keywords) for document in documents] == [
+        calculate_keyword_density(text, keywords) for text in texts
+    ]
+    assert [validate_text_input(text, min_length=20) for text in texts] == [True, True, False]
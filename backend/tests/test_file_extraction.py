@@ -0,0 +1,181 @@
+import asyncio
+import io
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from app.services.file_extraction import ExtractionError, SpooledUpload, TextExtractor, extract_text
+
+
+def _pdf(text):
+    """A one-page PDF showing text, built by hand so the test needs no PDF writer"""
+    stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode("latin-1")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        b"/Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+              % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def _docx(paragraphs):
+    import docx
+    
+    document = docx.Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def _spool(data, tmp_path):
+    upload = SpooledUpload(max_bytes=len(data) + 1, directory=str(tmp_path))
+    upload.feed(data)
+    upload.close()
+    return upload
+
+
+def test_extract_text_formats(tmp_path):
+    """Test PDF, DOCX and text files are recognised by their content"""
+    files = {
+        "resume.pdf": _pdf("Python developer with Django"),
+        "resume.docx": _docx(["Python developer", "Django and Docker"]),
+        "resume.txt": "Python developer, café".encode("utf-8"),
+        "resume.bin": b"\x00\x01\x02 binary",
+    }
+    for name, data in files.items():
+        (tmp_path / name).write_bytes(data)
+    
+    assert "Python developer with Django" in extract_text(str(tmp_path / "resume.pdf"))
+    assert extract_text(str(tmp_path / "resume.docx")) == "Python developer\nDjango and Docker"
+    assert extract_text(str(tmp_path / "resume.txt")) == "Python developer, café"
+    with pytest.raises(ExtractionError):
+        extract_text(str(tmp_path / "resume.bin"))
+
+
+@pytest.mark.asyncio
+async def test_text_extractor_caches_by_content_hash(tmp_path):
+    """Test the same bytes are extracted once, even when uploaded concurrently"""
+    extractor = TextExtractor(workers=0, cache_max_bytes=1024 * 1024, ttl_seconds=60,
+                              timeout_seconds=10)
+    data = _docx(["Python developer"])
+    
+    first, second = await asyncio.gather(
+        extractor.extract(_spool(data, tmp_path)),
+        extractor.extract(_spool(data, tmp_path))
+    )
+    again = await extractor.extract(_spool(data, tmp_path))
+    
+    assert first == second == ("Python developer", False)
+    assert again == ("Python developer", True)
+    assert extractor.stats()["entries"] == 1 and extractor.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_text_extractor_survives_cancelled_uploader(tmp_path, monkeypatch):
+    """Test a shared extraction completes for the others when its first caller goes away"""
+    import time
+    from app.services import file_extraction
+    
+    def slow_extract(path):
+        time.sleep(0.2)
+        return "Python developer"
+    
+    monkeypatch.setattr(file_extraction, "extract_text", slow_extract)
+    extractor = TextExtractor(workers=0, cache_max_bytes=1024 * 1024, ttl_seconds=60,
+                              timeout_seconds=10)
+    first_upload, second_upload = _spool(b"resume", tmp_path), _spool(b"resume", tmp_path)
+    
+    first = asyncio.ensure_future(extractor.extract(first_upload))
+    await asyncio.sleep(0.05)
+    second = asyncio.ensure_future(extractor.extract(second_upload))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    
+    assert await asyncio.wait_for(second, timeout=5) == ("Python developer", False)
+    assert extractor.stats()["in_flight"] == 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_extraction_is_bounded_inside_the_worker(tmp_path, monkeypatch):
+    """Test a worker stops parsing once the extraction timeout has passed"""
+    import time
+    from app.services import file_extraction
+    
+    monkeypatch.setattr(file_extraction, "extract_text", lambda path: time.sleep(5))
+    started = time.monotonic()
+    
+    with pytest.raises(file_extraction.ExtractionTimeout):
+        file_extraction._extract_in_worker(str(tmp_path / "resume.pdf"), 0.05)
+    assert time.monotonic() - started < 1
+
+
+@pytest.mark.asyncio
+async def test_queued_extractions_are_not_timed_out(tmp_path, monkeypatch):
+    """Test uploads waiting for a busy worker do not count against its grace timer"""
+    import time
+    from app.services import file_extraction
+    
+    def slow_extract(path):
+        time.sleep(0.4)
+        return "Python developer"
+    
+    # Pool workers are forked on first use, so they inherit the patched function
+    monkeypatch.setattr(file_extraction, "extract_text", slow_extract)
+    monkeypatch.setattr(TextExtractor, "GRACE_SECONDS", 0.1)
+    extractor = TextExtractor(workers=1, cache_max_bytes=1024 * 1024, ttl_seconds=60,
+                              timeout_seconds=1)
+    executor = extractor.executor
+    try:
+        results = await asyncio.gather(*(
+            extractor.extract(_spool(f"resume {n}".encode(), tmp_path)) for n in range(4)
+        ))
+    finally:
+        extractor.shutdown()
+    
+    assert results == [("Python developer", False)] * 4
+    assert extractor.executor is executor
+
+
+def test_compare_upload_endpoint(db_session, sample_resume, sample_job_description):
+    """Test an uploaded DOCX resume is compared, cached and deduplicated on re-upload"""
+    resume = _docx(sample_resume.split(". "))
+    data = {"job_description": sample_job_description}
+    with TestClient(app) as client:
+        first = client.post(
+            "/compare/upload", data=data, files={"resume": ("resume.docx", resume)}
+        )
+        repeat = client.post(
+            "/compare/upload", data=data, files={"resume": ("cv.docx", resume)}
+        )
+        unsupported = client.post(
+            "/compare/upload", data=data, files={"resume": ("cv.bin", b"\x00" * 600)}
+        )
+        missing = client.post("/compare/upload", files={"resume": ("resume.docx", resume)})
+        too_short = client.post(
+            "/compare/upload", data=data, files={"resume": ("cv.txt", b"Python developer")}
+        )
+    
+    assert first.status_code == 200, first.text
+    assert "python" in first.json()["found_keywords"]
+    assert first.headers["X-Extraction-Cache"] == "miss"
+    assert repeat.headers["X-Extraction-Cache"] == "hit"
+    assert repeat.json()["cached"] is True and repeat.json()["id"] == first.json()["id"]
+    assert unsupported.status_code == 415
+    assert missing.status_code == 400
+    assert too_short.status_code == 400
@@ -0,0 +1,112 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from app.config import settings
+from app.services.inference_client import (
+    CircuitBreaker, CircuitOpenError, InferenceClient, InferenceError, create_session
+)
+from app.services.nlp_service import NLPProcessor
+
+
+def _vector(text: str):
+    """Letter counts, so texts sharing letters point the same way"""
+    return [text.lower().count(letter) for letter in "aeioupst"]
+
+
+@pytest_asyncio.fixture
+async def stub_server():
+    """Local feature-extraction endpoint recording every batch it receives"""
+    state = {"batches": [], "status": 200}
+    
+    async def embed(request):
+        payload = await request.json()
+        state["batches"].append(payload["inputs"])
+        state["authorization"] = request.headers.get("Authorization")
+        if state["status"] != 200:
+            return web.Response(status=state["status"], text="model loading")
+        return web.json_response([_vector(text) for text in payload["inputs"]])
+    
+    app = web.Application()
+    app.router.add_post("/embed", embed)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    state["url"] = f"http://127.0.0.1:{port}/embed"
+    yield state
+    await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_embeds_are_coalesced_and_deduplicated(stub_server):
+    """Test concurrent callers share one HTTP call and identical texts are sent once"""
+    session = create_session()
+    try:
+        client = InferenceClient(session, stub_server["url"], token="secret", batch_wait_ms=20)
+        results = await asyncio.gather(
+            client.embed(["python developer", "go developer"]),
+            client.embed(["python developer"]),
+            client.embed(["rust developer", "Python  Developer"])
+        )
+    finally:
+        await session.close()
+    
+    assert len(stub_server["batches"]) == 1
+    assert sorted(stub_server["batches"][0]) == ["go developer", "python developer", "rust developer"]
+    assert stub_server["authorization"] == "Bearer secret"
+    assert list(results[0][0]) == list(results[1][0]) == list(results[2][1])
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_opens_and_recovers(stub_server):
+    """Test failures open the breaker, which rejects calls until a trial succeeds"""
+    stub_server["status"] = 503
+    session = create_session()
+    try:
+        client = InferenceClient(
+            session, stub_server["url"], batch_wait_ms=0,
+            breaker=CircuitBreaker(failure_threshold=2, reset_seconds=0.05)
+        )
+        for text in ("first", "second"):
+            with pytest.raises(InferenceError):
+                await client.embed([text])
+        assert client.breaker.state == "open"
+        
+        with pytest.raises(CircuitOpenError):
+            await client.embed(["third"])
+        assert len(stub_server["batches"]) == 2
+        
+        stub_server["status"] = 200
+        await asyncio.sleep(0.06)
+        assert len(await client.embed(["fourth"])) == 1
+        assert client.breaker.state == "closed"
+    finally:
+        await session.close()
+
+
+@pytest.mark.asyncio
+async def test_remote_scorer_falls_back_to_tfidf(stub_server, monkeypatch, sample_resume,
+                                                 sample_job_description):
+    """Test the remote scorer's score and its TF-IDF fallback when the service fails"""
+    monkeypatch.setattr(settings, "inference_url", stub_server["url"])
+    monkeypatch.setattr(settings, "inference_breaker_failures", 1)
+    monkeypatch.setattr(settings, "similarity_scorer", "remote")
+    processor = NLPProcessor()
+    await processor.initialize()
+    try:
+        assert processor.default_scorer == "remote"
+        pair = [(sample_resume, sample_job_description)]
+        remote = (await processor.compare_batch(pair))[0]
+        assert remote["similarity_details"]["method"] == "remote"
+        assert 0 < remote["match_score"] <= 100
+        
+        stub_server["status"] = 500
+        fallback = (await processor.compare_batch(pair))[0]
+        assert fallback["similarity_details"]["fallback_from"] == "remote"
+        assert fallback["similarity_details"]["method"] == "tfidf"
+        assert fallback["found_keywords"] == remote["found_keywords"]
+        assert processor.scorer_stats()["remote"]["circuit"] == "open"
+    finally:
+        await processor.close()
@@ -0,0 +1,93 @@
+from database import ComparisonHistory
+from app.services.nlp_service import NLPProcessor
+from app.services.job_index import JobIndex
+from app.services.tfidf_model import TfidfModel
+
+PYTHON_JOB = "Backend role building Python services with Django, PostgreSQL and Docker."
+FRONTEND_JOB = "Frontend role building React and TypeScript interfaces with CSS."
+DEVOPS_JOB = "Platform role running Kubernetes, Docker and Linux on AWS."
+
+
+def _store(db_session, job_description):
+    record = ComparisonHistory(
+        resume_text="resume",
+        job_description=job_description,
+        match_score=50.0,
+        found_keywords=[],
+        missing_keywords=[],
+        suggestions=[]
+    )
+    db_session.add(record)
+    db_session.commit()
+    return record.id
+
+
+def test_job_index_build_and_search(db_session):
+    """Test stored job descriptions are indexed once and ranked by similarity"""
+    for job in [PYTHON_JOB, FRONTEND_JOB, PYTHON_JOB]:
+        _store(db_session, job)
+    
+    index = JobIndex(NLPProcessor())
+    index.build(db_session)
+    
+    assert len(index) == 2
+    
+    matches = index.search("Python developer who knows Django and PostgreSQL", top_k=2)
+    assert matches[0]["job_description"] == PYTHON_JOB
+    assert matches[0]["comparison_id"] == 3
+    assert "django" in matches[0]["matched_skills"]
+
+
+def test_job_index_incremental_add(db_session):
+    """Test jobs added after the build are searchable"""
+    _store(db_session, PYTHON_JOB)
+    index = JobIndex(NLPProcessor())
+    index.build(db_session)
+    index.search("Python developer", top_k=1)
+    
+    index.add(_store(db_session, DEVOPS_JOB), DEVOPS_JOB)
+    
+    matches = index.search("Kubernetes and Docker on AWS", top_k=1)
+    assert matches[0]["job_description"] == DEVOPS_JOB
+    
+    # The job doubled the index, so the model was refitted with its terms
+    matches = index.search("Platform Kubernetes Linux", top_k=1)
+    assert matches[0]["job_description"] == DEVOPS_JOB and matches[0]["score"] > 0
+
+
+def test_job_index_appends_rows_with_prefit_model(tmp_path, monkeypatch, db_session):
+    """Test jobs added after a search are stacked onto the existing matrix"""
+    from app.config import settings
+    
+    model_path = tmp_path / "tfidf.joblib"
+    TfidfModel.fit([PYTHON_JOB, FRONTEND_JOB, DEVOPS_JOB]).save(str(model_path))
+    monkeypatch.setattr(settings, "tfidf_model_path", str(model_path))
+    index = JobIndex(NLPProcessor())
+    index.add(1, PYTHON_JOB)
+    _, first = index._ensure_matrix()
+    
+    index.add(2, DEVOPS_JOB)
+    _, matrix = index._ensure_matrix()
+    
+    assert matrix.shape[0] == 2
+    assert (matrix[0] != first[0]).nnz == 0
+    assert index.search("Kubernetes Linux", top_k=1)[0]["comparison_id"] == 2
+
+
+def test_job_index_refits_adhoc_model_on_growth(db_session):
+    """Test jobs added below the refit threshold are appended under the current model"""
+    index = JobIndex(NLPProcessor(), refit_growth=2.0)
+    index.add_many([(1, PYTHON_JOB), (2, FRONTEND_JOB)])
+    model, first = index._ensure_matrix()
+    
+    index.add(3, DEVOPS_JOB)
+    same_model, matrix = index._ensure_matrix()
+    
+    assert same_model is model and matrix.shape[0] == 3
+    assert (matrix[:2] != first).nnz == 0
+    
+    index.add(4, "Data role using Spark, Airflow and Python for pipelines.")
+    refitted, matrix = index._ensure_matrix()
+    
+    assert refitted is not model and matrix.shape[0] == 4
+    assert index.search("Spark Airflow pipelines", top_k=1)[0]["comparison_id"] == 4
@@ -47,4 +47,147 @@ def test_history_endpoint(client, db_session):
     response = client.get("/history")
     assert response.status_code == 200
     data = response.json()
-    assert isinstance(data, list)
\ No newline at end of file
+    assert isinstance(data, list)
+
+
+def test_compare_batch_endpoint(db_session, sample_resume, sample_job_description):
+    """Test one resume scored against several job descriptions"""
+    other_job = sample_job_description.replace("Django", "Rails").replace("Python", "Ruby")
+    
+    with TestClient(app) as client:
+        response = client.post("/compare/batch", json={
+            "resume_texts": [sample_resume],
+            "job_descriptions": [sample_job_description, other_job, sample_job_description]
+        })
+    
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == 3
+    assert len({result["id"] for result in results}) == 2
+    assert results[0]["id"] == results[2]["id"]
+    assert results[0]["match_score"] == results[2]["match_score"]
+    assert "django" in results[0]["found_keywords"]
+    assert "django" not in results[1]["found_keywords"]
+
+
+def test_compare_batch_endpoint_rejects_many_to_many(client, sample_resume, sample_job_description):
+    """Test a batch must have exactly one resume or one job description"""
+    response = client.post("/compare/batch", json={
+        "resume_texts": [sample_resume, sample_resume],
+        "job_descriptions": [sample_job_description, sample_job_description]
+    })
+    assert response.status_code == 422
+
+
+def test_jobs_match_endpoint(db_session, sample_resume, sample_job_description):
+    """Test compared job descriptions become searchable by resume"""
+    with TestClient(app) as client:
+        client.post("/compare", json={
+            "resume_text": sample_resume,
+            "job_description": sample_job_description
+        })
+        response = client.post("/jobs/match?top_k=5", json={"resume_text": sample_resume})
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["indexed_jobs"] >= 1
+    assert data["matches"][0]["job_description"] == sample_job_description[:200]
+
+
+def test_compare_endpoint_deduplicates_pairs(db_session, sample_resume, sample_job_description):
+    """Test a repeated pair returns the stored comparison instead of a new row"""
+    from database import ComparisonHistory
+    
+    payload = {"resume_text": sample_resume, "job_description": sample_job_description}
+    with TestClient(app) as client:
+        first = client.post("/compare", json=payload).json()
+        retry = client.post("/compare", json={
+            **payload, "resume_text": "  " + sample_resume.upper()
+        }).json()
+        forced = client.post("/compare", json={**payload, "force_recompute": True}).json()
+    
+    assert first["cached"] is False
+    assert retry["cached"] is True
+    assert forced["cached"] is False
+    assert first["id"] == retry["id"] == forced["id"]
+    assert retry["required_skills"] == first["required_skills"]
+    assert db_session.query(ComparisonHistory).count() == 1
+
+
+def test_history_keyset_pagination(db_session):
+    """Test history pages follow the cursor without gaps or repeats"""
+    from datetime import datetime
+    from database import ComparisonHistory
+    
+    tied = datetime(2024, 1, 2, 9, 30)
+    db_session.add_all([
+        ComparisonHistory(
+            resume_text="resume", job_description="job", match_score=float(i),
+            found_keywords=["python"] * i, missing_keywords=["aws"],
+            found_count=i, missing_count=1,
+            created_at=tied if i % 2 else datetime(2024, 1, 1 + i // 2)
+        )
+        for i in range(7)
+    ])
+    db_session.commit()
+    
+    client = TestClient(app)
+    seen, cursor = [], None
+    while True:
+        response = client.get("/history", params={"limit": 3, "before": cursor} if cursor else {"limit": 3})
+        assert response.status_code == 200
+        seen.extend(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    
+    expected = db_session.query(ComparisonHistory.id).order_by(
+        ComparisonHistory.created_at.desc(), ComparisonHistory.id.desc()
+    ).all()
+    assert [item["id"] for item in seen] == [row[0] for row in expected]
+    assert all(item["found_keywords_count"] == int(item["match_score"]) for item in seen)
+    assert all(item["missing_keywords_count"] == 1 for item in seen)
+    
+    assert client.get("/history", params={"before": "not-a-cursor"}).status_code == 400
+
+
+def test_history_export_streams_date_range(db_session):
+    """Test NDJSON and CSV exports cover exactly the requested date range"""
+    import csv
+    import io
+    import json
+    from datetime import datetime
+    from database import ComparisonHistory
+    
+    db_session.add_all([
+        ComparisonHistory(
+            resume_text="resume, with a comma", job_description="job", match_score=float(day),
+            found_keywords=["python"], missing_keywords=["aws", "docker"],
+            created_at=datetime(2024, 3, day)
+        )
+        for day in range(1, 6)
+    ])
+    db_session.commit()
+    
+    client = TestClient(app)
+    params = {"start": "2024-03-02T00:00:00", "end": "2024-03-05T00:00:00"}
+    
+    response = client.get("/history/export", params=params)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["match_score"] for record in records] == [2.0, 3.0, 4.0]
+    assert records[0]["missing_keywords"] == ["aws", "docker"]
+    assert records[0]["missing_count"] == 2
+    
+    response = client.get("/history/export", params={**params, "format": "csv"})
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [float(row["match_score"]) for row in rows] == [2.0, 3.0, 4.0]
+    assert rows[0]["resume_text"] == "resume, with a comma"
+    assert json.loads(rows[0]["found_keywords"]) == ["python"]
+    
+    assert client.get("/history/export", params={"format": "xml"}).status_code == 422
+    assert client.get("/history/export", params={
+        "start": params["end"], "end": params["start"]
+    }).status_code == 400
@@ -0,0 +1,41 @@
+from fastapi.testclient import TestClient
+from main import app
+from app.utils.metrics import Counter, Histogram, MetricsRegistry
+
+
+def test_registry_renders_text_exposition():
+    """Test histograms render cumulative buckets and labels are escaped"""
+    registry = MetricsRegistry()
+    latency = registry.register(Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0)))
+    errors = registry.register(Counter("errors_total", "Errors", ("route",)))
+    
+    for value in (0.05, 0.5, 5.0):
+        latency.labels("/a").observe(value)
+    errors.labels('/b"c').inc()
+    
+    lines = registry.render().splitlines()
+    assert "# TYPE latency_seconds histogram" in lines
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{route="/a"} 3' in lines
+    assert 'errors_total{route="/b\\"c"} 1' in lines
+
+
+def test_metrics_endpoint_reports_routes_and_stages(db_session, sample_resume, sample_job_description):
+    """Test /metrics exposes route latency, comparison stages and input sizes"""
+    with TestClient(app) as client:
+        client.post("/compare", json={
+            "resume_text": sample_resume, "job_description": sample_job_description
+        })
+        client.get("/history/12345")
+        response = client.get("/metrics")
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'http_request_duration_seconds_count{method="POST",route="/compare",status="200"}' in body
+    assert 'http_request_errors_total{method="GET",route="unmatched",status="404"}' in body
+    for stage in ("exact_match", "fuzzy_match", "tfidf_similarity", "db_persist"):
+        assert f'comparison_stage_duration_seconds_count{{component="nlp",stage="{stage}"}}' in body
+    assert 'comparison_input_chars_count{document="resume"}' in body
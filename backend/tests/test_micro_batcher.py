@@ -0,0 +1,118 @@
+import asyncio
+import pytest
+from app.services.micro_batcher import MicroBatcher
+from app.services.nlp_service import NLPProcessor
+
+
+@pytest.fixture
+def prefit_model(tmp_path, monkeypatch, sample_resume, sample_job_description):
+    """Point settings at a pre-fitted TF-IDF model so batches are fixed-model"""
+    from app.config import settings
+    from app.services.tfidf_model import TfidfModel
+    
+    model_path = tmp_path / "tfidf.joblib"
+    TfidfModel.fit([sample_resume, sample_job_description, "Java developer"]).save(str(model_path))
+    monkeypatch.setattr(settings, "tfidf_model_path", str(model_path))
+
+
+def _counting_processor():
+    processor = NLPProcessor()
+    calls = []
+    compare_batch = processor.compare_batch
+    
+    async def counted(pairs, scorer=None):
+        calls.append(len(pairs))
+        return await compare_batch(pairs, scorer)
+    
+    processor.compare_batch = counted
+    return processor, calls
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submissions_share_one_batch(prefit_model, sample_resume,
+                                                      sample_job_description):
+    """Test submissions inside the window are scored together and split back in order"""
+    processor, calls = _counting_processor()
+    batcher = MicroBatcher(processor, window_ms=20, max_batch_size=64)
+    jobs = [sample_job_description.replace("Django", name) for name in ("Rails", "Spring", "Flask")]
+    
+    results = await asyncio.gather(
+        batcher.submit([(sample_resume, jobs[0])]),
+        batcher.submit([(sample_resume, jobs[1]), (sample_resume, jobs[2])]),
+        batcher.submit([(sample_resume, sample_job_description)])
+    )
+    
+    assert calls == [4]
+    assert [len(result) for result in results] == [1, 2, 1]
+    expected = processor.score_texts(sample_resume, jobs[2])
+    assert sorted(results[1][1]["found_keywords"]) == sorted(expected["found_keywords"])
+    assert results[1][1]["match_score"] == pytest.approx(expected["match_score"])
+    assert batcher.stats()["batches"] == 1 and batcher.stats()["max_batch_size"] == 4
+
+
+@pytest.mark.asyncio
+async def test_full_batch_flushes_without_waiting(prefit_model, sample_resume,
+                                                  sample_job_description):
+    """Test reaching max_batch_size starts the batch before the window ends"""
+    processor, calls = _counting_processor()
+    batcher = MicroBatcher(processor, window_ms=10000, max_batch_size=2)
+    
+    results = await asyncio.wait_for(asyncio.gather(
+        batcher.submit([(sample_resume, sample_job_description)]),
+        batcher.submit([(sample_job_description, sample_resume)])
+    ), timeout=5)
+    
+    assert calls == [2] and len(results) == 2
+    with pytest.raises(ValueError):
+        await batcher.submit([(sample_resume, sample_job_description)], scorer="missing")
+
+
+@pytest.mark.asyncio
+async def test_compare_batch_to_db_uses_micro_batcher(prefit_model, async_session_factory,
+                                                      sample_resume, sample_job_description):
+    """Test concurrent single comparisons are persisted from one scoring batch"""
+    processor, calls = _counting_processor()
+    processor.micro_batcher = MicroBatcher(processor, window_ms=20)
+    other_job = sample_job_description.replace("Django", "Rails")
+    
+    async def compare(job):
+        async with async_session_factory() as db:
+            return await processor.compare_resume_to_job(sample_resume, job, db)
+    
+    first, second = await asyncio.gather(compare(sample_job_description), compare(other_job))
+    
+    assert calls == [2]
+    assert first.id != second.id and not first.cached and not second.cached
+
+
+@pytest.mark.asyncio
+async def test_adhoc_tfidf_is_not_micro_batched(sample_resume, sample_job_description):
+    """Test ad-hoc TF-IDF requests are scored alone so batch-mates cannot change them"""
+    processor, calls = _counting_processor()
+    batcher = MicroBatcher(processor, window_ms=20, max_batch_size=64)
+    other_job = sample_job_description.replace("Django", "Rails")
+    
+    first, second = await asyncio.gather(
+        batcher.submit([(sample_resume, sample_job_description)]),
+        batcher.submit([(sample_resume, other_job)])
+    )
+    
+    assert calls == [1, 1]
+    expected = processor.score_texts(sample_resume, sample_job_description)
+    assert first[0]["match_score"] == pytest.approx(expected["match_score"])
+    assert batcher.stats()["batches"] == 0 and batcher.stats()["unbatched_requests"] == 2
+
+
+def test_micro_batcher_warns_without_fixed_model(caplog, monkeypatch, prefit_model):
+    """Test enabling the batcher for an ad-hoc default scorer is logged"""
+    import logging
+    from app.config import settings
+    
+    with caplog.at_level(logging.WARNING, logger="app.services.micro_batcher"):
+        MicroBatcher(NLPProcessor())
+    assert not caplog.records
+    
+    monkeypatch.setattr(settings, "tfidf_model_path", None)
+    with caplog.at_level(logging.WARNING, logger="app.services.micro_batcher"):
+        MicroBatcher(NLPProcessor())
+    assert "no fixed model" in caplog.text
@@ -63,4 +63,224 @@ async def test_compare_resume_to_job(nlp_processor, db_session):
     assert isinstance(result.found_keywords, list)
     assert isinstance(result.missing_keywords, list)
     assert isinstance(result.suggestions, list)
-    assert len(result.suggestions) > 0
\ No newline at end of file
+    assert len(result.suggestions) > 0
+
+def test_skill_matcher_word_boundaries():
+    """Test exact skill hits only match whole tokens"""
+    processor = NLPProcessor()
+    
+    tech_skills = processor._find_skill_matches(
+        "A good engineer who knows Node.js and C++.", processor.tech_skills
+    )
+    
+    assert "go" not in tech_skills
+    assert "node.js" in tech_skills
+    assert "c++" in tech_skills
+
+
+def test_skill_matcher_multi_word_skills():
+    """Test multi-word skills are found in a single pass"""
+    processor = NLPProcessor()
+    
+    tech_skills, soft_skills = processor._extract_skills(
+        "Strong problem-solving and time management, shipped Go services."
+    )
+    
+    assert "problem solving" in soft_skills
+    assert "time management" in soft_skills
+    assert "go" in tech_skills
+
+
+def test_fuzzy_skill_index():
+    """Test fuzzy lookups agree with a brute-force fuzz.ratio scan"""
+    from fuzzywuzzy import fuzz
+    from app.services.fuzzy_index import FuzzySkillIndex
+    
+    skills = ["kubernetes", "postgresql", "javascript", "leadership", "go"]
+    index = FuzzySkillIndex((skill, skill, "tech") for skill in skills)
+    tokens = ["kubernets", "postgressql", "javscript", "leader", "goo", "java"]
+    
+    expected = {
+        skill for skill in skills for token in tokens
+        if fuzz.ratio(skill, token) > 85
+    }
+    
+    assert index.match_tokens(tokens) == expected
+    assert "kubernetes" in expected
+    assert "go" not in expected
+
+
+def test_compiled_taxonomy_aliases(tmp_path):
+    """Test a compiled taxonomy resolves aliases and multi-word skills"""
+    from app.services.skill_taxonomy import SkillTaxonomy, compile_taxonomy
+    
+    artifact = tmp_path / "skills.bin"
+    compile_taxonomy([
+        {"skill": "Kubernetes", "category": "tech", "aliases": ["k8s"]},
+        {"skill": "PostgreSQL", "category": "tech", "aliases": ["postgres"]},
+        {"skill": "problem solving", "category": "soft", "aliases": []},
+    ], str(artifact))
+    
+    taxonomy = SkillTaxonomy(str(artifact))
+    
+    assert taxonomy.lookup("K8s") == ("kubernetes", "tech")
+    assert taxonomy.find(["postgres", "and", "problem", "solving"]) == {
+        "postgresql": "tech",
+        "problem solving": "soft"
+    }
+    assert taxonomy.skills("soft") == ["problem solving"]
+
+
+def test_compiled_taxonomy_matches_in_memory_index(tmp_path):
+    """Test the artifact's phrase table and trigram postings agree with the trie and fuzzy index"""
+    from app.services.fuzzy_index import FuzzySkillIndex
+    from app.services.skill_matcher import SkillMatcher
+    from app.services.skill_taxonomy import MappedFuzzyIndex, SkillTaxonomy, compile_taxonomy
+    
+    artifact = tmp_path / "skills.bin"
+    compile_taxonomy([
+        {"skill": "machine learning", "category": "tech", "aliases": ["ml"]},
+        {"skill": "machine learning ops", "category": "tech", "aliases": ["mlops"]},
+        {"skill": "kubernetes", "category": "tech", "aliases": ["k8s"]},
+        {"skill": "project management", "category": "soft", "aliases": []},
+        {"skill": "communication", "category": "soft", "aliases": []},
+    ], str(artifact))
+    taxonomy = SkillTaxonomy(str(artifact))
+    tokens = ("we use machine learning ops and machine vision on kubernets with k8s "
+              "plus project managment and comunication").split()
+    
+    assert taxonomy.find(tokens) == SkillMatcher(taxonomy.iter_terms()).find(tokens)
+    assert MappedFuzzyIndex(taxonomy).match_categories(tokens) == \
+        FuzzySkillIndex(taxonomy.iter_terms()).match_categories(tokens)
+    assert MappedFuzzyIndex(taxonomy).match_categories(["kubernets"]) == {"kubernetes": "tech"}
+
+
+def test_reload_taxonomy_swaps_index(tmp_path):
+    """Test hot reload replaces the skill index used for extraction"""
+    from app.services.skill_taxonomy import compile_taxonomy
+    
+    artifact = tmp_path / "skills.bin"
+    compile_taxonomy([
+        {"skill": "terraform", "category": "tech", "aliases": ["tf"]},
+    ], str(artifact))
+    
+    processor = NLPProcessor()
+    previous = processor.skill_index
+    processor.reload_taxonomy(str(artifact))
+    
+    assert processor.skill_index is not previous
+    assert processor._extract_skills("Wrote TF modules") == (["terraform"], [])
+    
+    # A missing artifact fails the reload instead of swapping in the built-in skills
+    reloaded = processor.skill_index
+    artifact.unlink()
+    with pytest.raises(FileNotFoundError):
+        processor.reload_taxonomy()
+    assert processor.skill_index is reloaded
+    with pytest.raises(FileNotFoundError):
+        processor.reload_taxonomy(str(tmp_path / "missing.bin"))
+    assert processor.taxonomy_path == str(artifact)
+
+
+def test_prefit_tfidf_model(tmp_path, monkeypatch):
+    """Test a persisted TF-IDF model is loaded and only used to transform"""
+    from app.config import settings
+    from app.services.tfidf_model import TfidfModel
+    
+    corpus = [
+        "Senior Python developer with Django and PostgreSQL experience",
+        "Frontend engineer skilled in React, TypeScript and CSS",
+        "DevOps engineer running Kubernetes and Docker on AWS",
+    ]
+    model_path = tmp_path / "tfidf.joblib"
+    TfidfModel.fit(corpus).save(str(model_path))
+    monkeypatch.setattr(settings, "tfidf_model_path", str(model_path))
+    
+    processor = NLPProcessor()
+    vocabulary = dict(processor.tfidf_model.vectorizer.vocabulary_)
+    score, details = processor._calculate_similarity(
+        "Python developer who uses Django", "Looking for a Django and Python developer"
+    )
+    
+    assert details["method"] == "tfidf_prefit"
+    assert details["model_version"] == processor.tfidf_model.version
+    assert 0 < score <= 100
+    assert processor.tfidf_model.vectorizer.vocabulary_ == vocabulary
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["thread", "process"])
+async def test_compare_texts_executor_backends(backend, monkeypatch):
+    """Test pooled scoring returns the same result as inline scoring"""
+    from app.config import settings
+    
+    resume_text = "Python developer with Django, Docker and AWS. Strong leadership."
+    job_description = "Hiring a Python engineer who knows Django and Kubernetes."
+    
+    monkeypatch.setattr(settings, "nlp_executor", backend)
+    monkeypatch.setattr(settings, "nlp_workers", 1)
+    processor = NLPProcessor()
+    await processor.initialize()
+    try:
+        pooled = await processor.compare_texts(resume_text, job_description)
+    finally:
+        await processor.close()
+    
+    inline = processor.score_texts(resume_text, job_description)
+    
+    assert pooled["match_score"] == pytest.approx(inline["match_score"])
+    assert sorted(pooled["found_keywords"]) == sorted(inline["found_keywords"])
+    assert sorted(pooled["missing_keywords"]) == sorted(inline["missing_keywords"])
+
+
+def test_score_pairs_matches_single_scoring():
+    """Test batch scoring gives the same skills and ad-hoc scores as per-pair scoring"""
+    processor = NLPProcessor()
+    resume_text = "Python developer with Django, Docker and AWS. Strong leadership."
+    jobs = [
+        "Hiring a Python engineer who knows Django and Kubernetes.",
+        "Looking for a React and TypeScript frontend developer.",
+    ]
+    
+    batch = processor.score_pairs([(resume_text, job) for job in jobs])
+    
+    assert len(batch) == 2
+    for job, result in zip(jobs, batch):
+        single = processor.score_texts(resume_text, job)
+        assert sorted(result["found_keywords"]) == sorted(single["found_keywords"])
+        assert sorted(result["missing_keywords"]) == sorted(single["missing_keywords"])
+        assert result["match_score"] == pytest.approx(single["match_score"])
+    assert batch[0]["match_score"] > batch[1]["match_score"]
+
+
+def test_document_cache_reuses_analysis():
+    """Test repeated documents are analysed once and counted as hits"""
+    processor = NLPProcessor()
+    job_description = "Hiring a Python engineer who knows Django and Kubernetes."
+    
+    processor.score_texts("Python and Django developer", job_description)
+    processor.score_texts("React developer", "  hiring a PYTHON engineer who knows django and kubernetes.")
+    
+    stats = processor.document_cache.stats()
+    assert stats["misses"] == 3
+    assert stats["hits"] == 1
+    assert stats["entries"] == 3
+
+
+def test_document_cache_evicts_least_recently_used():
+    """Test the cache stays within its byte budget"""
+    from app.services.document_cache import DocumentAnalysis, DocumentCache
+    
+    def analysis(text):
+        return DocumentAnalysis(text, frozenset(text.split()), [], [])
+    
+    first, second, third = analysis("a " * 50), analysis("b " * 50), analysis("c " * 50)
+    cache = DocumentCache(max_bytes=first.size + second.size, ttl_seconds=60)
+    cache.put("first", first)
+    cache.put("second", second)
+    assert cache.get("first") is first
+    cache.put("third", third)
+    
+    assert cache.get("second") is None
+    assert cache.get("first") is first
+    assert cache.stats()["evictions"] == 1
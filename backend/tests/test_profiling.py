@@ -0,0 +1,92 @@
+import asyncio
+import cProfile
+import pytest
+from fastapi.testclient import TestClient
+import main
+from app.utils.profiling import ProfileStore, RequestProfiler
+
+
+def test_profile_store_keeps_newest(tmp_path):
+    """Test the store drops the oldest profiles beyond its capacity"""
+    store = ProfileStore(str(tmp_path), max_profiles=2)
+    ids = []
+    for n in range(3):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        sum(range(1000))
+        profiler.disable()
+        ids.append(store.save(profiler, {"n": n}))
+    
+    assert [profile["id"] for profile in store.list()] == [ids[2], ids[1]]
+    assert "function calls" in store.summary(ids[2])
+    with pytest.raises(KeyError):
+        store.stats_path(ids[0])
+    with pytest.raises(KeyError):
+        store.stats_path("../../etc/passwd")
+
+
+@pytest.mark.asyncio
+async def test_sampled_profiles_kept_only_when_slow(tmp_path):
+    """Test a sampled request is only stored when it crosses the threshold"""
+    store = ProfileStore(str(tmp_path))
+    
+    async with RequestProfiler(store, sample_rate=1.0, threshold_ms=60_000).run() as fast:
+        await asyncio.to_thread(fast.call, sum, range(1000))
+    async with RequestProfiler(store, sample_rate=1.0, threshold_ms=0).run(route="/compare") as slow:
+        await asyncio.to_thread(slow.call, sum, range(1000))
+    
+    assert fast.profile_id is None
+    assert [profile["id"] for profile in store.list()] == [slow.profile_id]
+    assert store.list()[0]["reason"] == "sampled"
+
+
+def test_compare_profile_header(db_session, tmp_path, monkeypatch, sample_resume,
+                                sample_job_description):
+    """Test admins can profile a comparison and download the result"""
+    monkeypatch.setattr(main.settings, "admin_token", "secret")
+    monkeypatch.setattr(main, "profiler", RequestProfiler(ProfileStore(str(tmp_path))))
+    payload = {"resume_text": sample_resume, "job_description": sample_job_description}
+    
+    with TestClient(main.app) as client:
+        assert client.post("/compare", json=payload, headers={"X-Profile": "1"}).status_code == 403
+        
+        response = client.post("/compare", json=payload, headers={
+            "X-Profile": "1", "X-Admin-Token": "secret"
+        })
+        assert response.status_code == 200
+        profile_id = response.headers["X-Profile-Id"]
+        
+        admin = {"X-Admin-Token": "secret"}
+        profiles = client.get("/admin/profiles", headers=admin).json()
+        assert profiles[0]["id"] == profile_id
+        assert profiles[0]["resume_chars"] == len(sample_resume)
+        
+        download = client.get(f"/admin/profiles/{profile_id}", headers=admin)
+        assert download.status_code == 200 and download.content
+        summary = client.get(f"/admin/profiles/{profile_id}?format=text", headers=admin)
+        assert "score_pairs" in summary.text
+        assert client.get("/admin/profiles/missing", headers=admin).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_profiled_scoring_runs_off_the_event_loop(tmp_path, sample_resume,
+                                                        sample_job_description):
+    """Test a profiled comparison is scored on a worker thread, not the loop's"""
+    import threading
+    from app.services.nlp_service import NLPProcessor
+    
+    processor = NLPProcessor()
+    score_pairs = processor.score_pairs
+    threads = []
+    
+    def recorded(pairs, scorer=None):
+        threads.append(threading.current_thread())
+        return score_pairs(pairs, scorer)
+    
+    processor.score_pairs = recorded
+    profiler = RequestProfiler(ProfileStore(str(tmp_path)))
+    async with profiler.run(forced=True) as profile:
+        await processor.compare_batch([(sample_resume, sample_job_description)])
+    
+    assert threads and threads[0] is not threading.current_thread()
+    assert "recorded" in profiler.store.summary(profile.profile_id)
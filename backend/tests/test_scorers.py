@@ -0,0 +1,73 @@
+import pytest
+from app.config import settings
+from app.services.nlp_service import NLPProcessor
+from app.services.scorers import LsaModel
+
+RESUME = "Tuned Postgres queries and led a team"
+JOB = "PostgreSQL tuning and leadership"
+
+
+def test_lsa_scorer_relates_cooccurring_terms(tmp_path, monkeypatch):
+    """Test the LSA scorer scores related wording that TF-IDF scores as zero"""
+    corpus = [
+        "postgres postgresql database tuning queries",
+        "postgresql database replication tuning",
+        "postgres database indexes queries",
+        "react typescript frontend components css",
+        "kubernetes docker containers cloud aws",
+    ]
+    model_path = tmp_path / "lsa.joblib"
+    LsaModel.fit(corpus, n_components=2).save(str(model_path))
+    monkeypatch.setattr(settings, "lsa_model_path", str(model_path))
+    
+    processor = NLPProcessor()
+    pairs = [("Postgres expert", "PostgreSQL expert wanted")]
+    lexical = processor.score_pairs([("Postgres", "PostgreSQL")])[0]
+    first = processor.score_pairs(pairs, scorer="lsa")[0]
+    second = processor.score_pairs(pairs, scorer="lsa")[0]
+    
+    assert lexical["match_score"] == 0
+    assert first["match_score"] > 50
+    assert first["similarity_details"]["method"] == "lsa"
+    assert first["similarity_details"]["embedded"] == 2
+    assert second["similarity_details"]["embedded"] == 0
+    assert second["match_score"] == first["match_score"]
+
+
+def test_static_embedding_scorer(tmp_path, monkeypatch):
+    """Test word vectors are averaged per document and selectable per request"""
+    table = tmp_path / "vectors.txt"
+    table.write_text(
+        "4 3\n"
+        "postgres 1.0 0.1 0.0\n"
+        "postgresql 0.9 0.2 0.0\n"
+        "led 0.0 1.0 0.1\n"
+        "leadership 0.1 0.9 0.0\n",
+        encoding="utf-8"
+    )
+    monkeypatch.setattr(settings, "embedding_table_path", str(table))
+    monkeypatch.setattr(settings, "similarity_scorer", "embedding")
+    
+    processor = NLPProcessor()
+    semantic = processor.score_pairs([(RESUME, JOB)])[0]
+    lexical = processor.score_pairs([(RESUME, JOB)], scorer="tfidf")[0]
+    
+    assert semantic["similarity_details"]["method"] == "embedding"
+    assert semantic["match_score"] > 90
+    assert semantic["match_score"] > lexical["match_score"]
+    assert processor.model_version != processor.scorer_model_version("tfidf")
+    
+    stats = processor.scorer_stats()
+    assert stats["embedding"]["default"] and stats["embedding"]["batches"] >= 1
+    with pytest.raises(ValueError):
+        processor.get_scorer("lsa")
+
+
+def test_unavailable_default_scorer_falls_back(monkeypatch):
+    """Test a configured scorer without its model file falls back to TF-IDF"""
+    monkeypatch.setattr(settings, "similarity_scorer", "lsa")
+    monkeypatch.setattr(settings, "lsa_model_path", "/nonexistent/lsa.joblib")
+    
+    processor = NLPProcessor()
+    assert processor.default_scorer == "tfidf"
+    assert processor.score_texts(RESUME, JOB)["similarity_details"]["method"] == "tfidf"
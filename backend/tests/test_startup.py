@@ -0,0 +1,47 @@
+import json
+import os
+import subprocess
+import sys
+from fastapi.testclient import TestClient
+from main import app
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+HEAVY_MODULES = ("sklearn", "numpy", "scipy", "fuzzywuzzy", "aiohttp", "joblib")
+
+MEASURE_IMPORT = """
+import json, sys, time
+started = time.perf_counter()
+import main
+print(json.dumps({
+    "seconds": time.perf_counter() - started,
+    "loaded": [name for name in %r if name in sys.modules]
+}))
+""" % (HEAVY_MODULES,)
+
+
+def test_import_main_defers_heavy_modules():
+    """Test importing the app stays cheap by leaving heavy libraries for later"""
+    env = {**os.environ, "TESTING": "true"}
+    output = subprocess.run(
+        [sys.executable, "-c", MEASURE_IMPORT], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    
+    assert result["loaded"] == []
+    assert result["seconds"] < 5, f"import main took {result['seconds'] * 1000:.0f}ms"
+
+
+def test_probes_follow_startup(db_session):
+    """Test readiness waits for the warm-up while liveness always answers"""
+    client = TestClient(app)
+    assert client.get("/livez").status_code == 200
+    assert client.get("/readyz").status_code == 503
+    
+    with TestClient(app) as started:
+        response = started.get("/readyz")
+        assert response.status_code == 200
+        assert response.json()["checks"]["warmup_ms"] > 0
+    
+    assert client.get("/readyz").json()["checks"]["phase"] == "stopping"
@@ -0,0 +1,100 @@
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from app.services.nlp_service import NLPProcessor
+from app.services.document_cache import document_key
+from app.services.streaming import IncrementalTokenizer, StreamTooLarge, streaming_similarity
+from app.utils.document import tokenize
+
+
+def _stream(processor, text, chunk_size):
+    document = processor.streaming_document()
+    data = text.encode("utf-8")
+    for start in range(0, len(data), chunk_size):
+        document.feed(data[start:start + chunk_size])
+    document.close()
+    return document
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 100000])
+def test_incremental_tokenizer_matches_tokenize(sample_resume, chunk_size):
+    """Test tokens are the same wherever the text is split into chunks"""
+    text = sample_resume + "\nC++ and C# with node.js  "
+    tokenizer = IncrementalTokenizer()
+    tokens = []
+    for start in range(0, len(text), chunk_size):
+        tokens.extend(tokenizer.feed(text[start:start + chunk_size]))
+    tokens.extend(tokenizer.close())
+    
+    assert tokens == tokenize(text)
+
+
+@pytest.mark.parametrize("chunk_size", [3, 50, 100000])
+def test_streaming_document_matches_batch_analysis(sample_resume, sample_job_description,
+                                                  chunk_size):
+    """Test streamed skills, key and similarity agree with the in-memory pipeline"""
+    processor = NLPProcessor()
+    # Multi-byte characters split across chunks must decode unchanged
+    resume_text = sample_resume + " Café résumé, machine learning."
+    resume = _stream(processor, resume_text, chunk_size)
+    job = _stream(processor, sample_job_description, chunk_size)
+    
+    assert resume.key == document_key(resume_text)
+    assert sorted(resume.skills.skills[0]) == sorted(processor._extract_skills(resume_text)[0])
+    assert sorted(job.skills.skills[1]) == sorted(processor._extract_skills(sample_job_description)[1])
+    
+    similarity, _ = streaming_similarity(resume.terms, job.terms, processor.tfidf_model)
+    expected = processor.score_texts(resume_text, sample_job_description)["similarity_details"]["score"]
+    assert similarity * 100 == pytest.approx(expected)
+
+
+def test_streaming_similarity_with_prefit_model(tmp_path, monkeypatch, sample_resume,
+                                                sample_job_description):
+    """Test streamed term counts are weighted with a pre-fitted model's IDF"""
+    from app.config import settings
+    from app.services.tfidf_model import TfidfModel
+    
+    model_path = tmp_path / "tfidf.joblib"
+    TfidfModel.fit([sample_resume, sample_job_description, "Java developer"]).save(str(model_path))
+    monkeypatch.setattr(settings, "tfidf_model_path", str(model_path))
+    processor = NLPProcessor()
+    
+    resume = _stream(processor, sample_resume, 40)
+    job = _stream(processor, sample_job_description, 40)
+    similarity, details = streaming_similarity(resume.terms, job.terms, processor.tfidf_model)
+    expected = processor.score_texts(sample_resume, sample_job_description)["similarity_details"]
+    
+    assert details["method"] == "tfidf_prefit"
+    assert similarity * 100 == pytest.approx(expected["score"])
+
+
+def test_streaming_document_length_limit(sample_resume):
+    """Test a document past max_chars is rejected while it streams"""
+    processor = NLPProcessor()
+    document = processor.streaming_document()
+    document.max_chars = 100
+    
+    with pytest.raises(StreamTooLarge):
+        document.feed(sample_resume.encode("utf-8"))
+
+
+def test_compare_stream_endpoint(db_session, sample_resume, sample_job_description):
+    """Test a multipart upload longer than the JSON limit is scored and deduplicated"""
+    long_resume = " ".join([sample_resume] * 60)
+    files = {
+        "resume": ("resume.txt", long_resume.encode("utf-8"), "text/plain"),
+        "job_description": ("job.txt", sample_job_description.encode("utf-8"), "text/plain")
+    }
+    with TestClient(app) as client:
+        first = client.post("/compare/stream", files=files)
+        repeat = client.post("/compare/stream", files=files)
+        missing = client.post("/compare/stream", files={"resume": files["resume"]})
+        not_multipart = client.post("/compare/stream", json={"resume": sample_resume})
+    
+    assert len(long_resume) > 20000
+    assert first.status_code == 200
+    assert first.json()["similarity_details"]["streamed"] is True
+    assert "python" in first.json()["found_keywords"]
+    assert repeat.json()["cached"] is True and repeat.json()["id"] == first.json()["id"]
+    assert missing.status_code == 400
+    assert not_multipart.status_code == 400
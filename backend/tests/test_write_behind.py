@@ -0,0 +1,43 @@
+import pytest
+from sqlalchemy import func, select
+from database import ComparisonHistory
+from app.services.analytics import fetch_analytics
+from app.services.nlp_service import NLPProcessor
+from app.services.write_behind import WriteBehindQueue
+
+
+@pytest.mark.asyncio
+async def test_write_behind_batches_and_drains(async_session_factory, sample_resume,
+                                               sample_job_description):
+    """Test queued comparisons get ids up front and are written on drain"""
+    processor = NLPProcessor()
+    queue = WriteBehindQueue(async_session_factory, max_rows=50, flush_interval_ms=10000)
+    processor.write_behind = queue
+    queue.start()
+    
+    jobs = [sample_job_description, sample_job_description.replace("Django", "Rails")]
+    async with async_session_factory() as db:
+        first = await processor.compare_batch_to_db(
+            [(sample_resume, job) for job in jobs], db
+        )
+        repeat = await processor.compare_resume_to_job(sample_resume, jobs[0], db)
+        
+        assert [result.id for result in first] == [1, 2]
+        assert repeat.cached is True
+        assert repeat.id == first[0].id
+        assert queue.stats()["depth"] == 2
+        assert await db.scalar(select(func.count(ComparisonHistory.id))) == 0
+    
+    await queue.stop()
+    
+    async with async_session_factory() as db:
+        stored = (await db.scalars(select(ComparisonHistory).order_by(ComparisonHistory.id))).all()
+    assert [row.id for row in stored] == [1, 2]
+    assert stored[0].match_score == first[0].match_score
+    assert queue.stats()["rows_written"] == 2
+    assert queue.stats()["pending_rows"] == 0
+    
+    async with async_session_factory() as db:
+        analytics = await fetch_analytics(db)
+    assert analytics["total_comparisons"] == 2
+    assert analytics["daily"][-1]["comparisons"] == 2